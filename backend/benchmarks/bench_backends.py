@@ -0,0 +1,79 @@
+"""
+추론 백엔드별(torch / onnx / openvino) 지연 시간과 처리량 비교
+
+모델과 백엔드 조합마다 별도 레지스트리로 모델을 로드(필요하면 .pt 에서 내보내기)한 뒤,
+이미지 한 장씩 추론한 지연 시간(평균/p50/p95)과 배치 추론 처리량(이미지/초), 감지 박스 수를 출력한다.
+기본 입력은 result 폴더의 샘플 이미지이다. backend 디렉토리에서 실행:
+    python -m benchmarks.bench_backends --models yolov11n helmet best5 --backends torch onnx openvino
+"""
+import argparse
+import glob
+import time
+
+import cv2
+import numpy as np
+
+from config import MODEL_BACKEND_CHOICES, MODEL_PATHS
+from model_registry import ModelRegistry
+
+
+def run(model_name: str, backend: str, images, repeat: int, batch_size: int):
+    registry = ModelRegistry({model_name: MODEL_PATHS[model_name]}, {model_name: backend})
+    model = registry.get(model_name)
+
+    started = time.perf_counter()
+    model(images[0])  # 로드(및 내보내기) + 워밍업
+    load_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    boxes = 0
+    for _ in range(repeat):
+        for img in images:
+            started = time.perf_counter()
+            result = model(img)[0]
+            latencies.append((time.perf_counter() - started) * 1000)
+            boxes += len(result.boxes)
+
+    batch = [images[i % len(images)] for i in range(batch_size)]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        model(batch)
+    throughput = batch_size * repeat / (time.perf_counter() - started)
+
+    status = registry.status()["models"][0]
+    return {
+        "active_backend": status["active_backend"],
+        "load_ms": load_ms,
+        "mean_ms": float(np.mean(latencies)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "throughput": throughput,
+        "boxes_per_image": boxes / (repeat * len(images)),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=["yolov11n", "helmet", "best5"])
+    parser.add_argument("--backends", nargs="+", default=list(MODEL_BACKEND_CHOICES), choices=MODEL_BACKEND_CHOICES)
+    parser.add_argument("--images", nargs="+", default=sorted(glob.glob("result/*.jpg")))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=8)
+    args = parser.parse_args()
+
+    images = [img for img in (cv2.imread(path) for path in args.images) if img is not None]
+    if not images:
+        raise SystemExit("샘플 이미지가 없습니다. --images 로 지정하세요.")
+
+    print(f"이미지 {len(images)}장, 반복 {args.repeat}회, 배치 {args.batch}")
+    print(f"{'model':>9} {'backend':>9} {'load ms':>9} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7} {'img/s':>7} {'boxes':>6}")
+    for model_name in args.models:
+        for backend in args.backends:
+            r = run(model_name, backend, images, args.repeat, args.batch)
+            label = backend if r["active_backend"] == backend else f"{backend}->{r['active_backend']}"
+            print(f"{model_name:>9} {label:>9} {r['load_ms']:>9.0f} {r['mean_ms']:>8.1f} {r['p50_ms']:>7.1f} "
+                  f"{r['p95_ms']:>7.1f} {r['throughput']:>7.1f} {r['boxes_per_image']:>6.2f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,79 @@
+"""
+초기 감지 결과 변환 비교: 박스별 dict 생성 (box.xyxy[0].tolist() 등) vs Detections 배열 (한 번의 전송 + 마스크)
+
+Ultralytics Boxes 에 무작위 박스 N 개를 넣고 process_detection 의 초기 감지 필터링을 두 방식으로 실행한다.
+backend 디렉토리에서 실행:
+    python -m benchmarks.bench_detections --boxes 10 100 300 --device cpu
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Boxes
+
+from config import CONFIDENCE_THRESHOLD
+from detections import Detections
+
+NAMES = {0: "person", 1: "bicycle", 2: "car", 3: "motorcycle"}
+
+
+def legacy_filter(boxes):
+    """기존 구현: 박스마다 텐서 → 파이썬 값 변환 후 dict 생성"""
+    detections = []
+    for box in boxes:
+        x1, y1, x2, y2 = box.xyxy[0].tolist()
+        conf = box.conf[0].item()
+        cls = box.cls[0].item()
+        class_name = NAMES[int(cls)]
+        if conf > CONFIDENCE_THRESHOLD * 0.8 and class_name in ["person", "motorcycle"]:
+            detections.append({
+                "bbox": [round(x, 2) for x in [x1, y1, x2, y2]],
+                "confidence": round(conf, 3),
+                "class": class_name,
+                "model": "yolov11n"
+            })
+    return detections
+
+
+def array_filter(boxes):
+    """새 구현: 한 번에 NumPy 로 옮긴 뒤 마스크로 필터링 (dict 변환은 응답 직전)"""
+    detections = Detections.from_boxes(boxes, NAMES, "yolov11n")
+    return detections[(detections.conf > CONFIDENCE_THRESHOLD * 0.8) & detections.class_mask("person", "motorcycle")]
+
+
+def random_boxes(count: int, device: str) -> Boxes:
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 1800, (count, 2))
+    wh = rng.uniform(20, 200, (count, 2))
+    data = np.column_stack([xy, xy + wh, rng.uniform(0, 1, count), rng.integers(0, len(NAMES), count)])
+    return Boxes(torch.tensor(data, dtype=torch.float32, device=device), (1080, 1920))
+
+
+def timed(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boxes", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'boxes':>6} {'legacy ms':>10} {'array ms':>9} {'+to_dicts ms':>13} {'same':>5}")
+    for count in args.boxes:
+        boxes = random_boxes(count, args.device)
+        same = legacy_filter(boxes) == array_filter(boxes).to_dicts()
+        legacy_ms = timed(lambda: legacy_filter(boxes), args.repeat)
+        array_ms = timed(lambda: array_filter(boxes), args.repeat)
+        serialized_ms = timed(lambda: array_filter(boxes).to_dicts(), args.repeat)
+        print(f"{count:>6} {legacy_ms:>10.3f} {array_ms:>9.3f} {serialized_ms:>13.3f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,103 @@
+"""
+프레임 경로 메모리 비교 (복사 방식 vs 읽기 전용 뷰 + 재사용 버퍼)
+
+모델 없이 process_detection / CCTV process_frame 의 프레임 처리(입력 복사, 시각화 복사, 라벨 그리기)만
+재현하여 tracemalloc 으로 다음을 측정한다.
+- 프레임당 일시 할당: 프레임 처리 중 추가로 잡힌 최대 메모리 (MB)
+- 스트림당 유지 메모리: 프레임 처리 후에도 스트림이 계속 잡고 있는 메모리 (MB)
+- 동시 스트림 최대 메모리: S 개 스트림의 프레임을 번갈아 처리할 때 최대 메모리 (MB)
+backend 디렉토리에서 실행:
+    python -m benchmarks.bench_frame_memory --size 1920x1080 --streams 1 4 8 --frames 50
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from config import LABEL_THICKNESS
+from frame_buffers import FrameBuffer, readonly_view, writable_copy
+from label_renderer import label_renderer
+
+MB = 1024 * 1024
+
+
+def draw(img: np.ndarray):
+    label_renderer.draw_box(img, (100, 100, 300, 400), (0, 0, 255), LABEL_THICKNESS * 2)
+    label_renderer.draw_label(img, "no-helmet", (100, 100), (0, 0, 255))
+
+
+def legacy_frame(frame: np.ndarray, stream) -> np.ndarray:
+    """기존 경로: 입력을 먼저 복사하고 시각화에서 다시 복사"""
+    input_img = frame.copy()
+    output = input_img.copy()
+    draw(output)
+    return output
+
+
+def zero_copy_frame(frame: np.ndarray, stream: FrameBuffer) -> np.ndarray:
+    """새 경로: 감지는 읽기 전용 뷰, 시각화만 스트림 버퍼에 복사"""
+    input_img = readonly_view(frame)
+    output = writable_copy(input_img, stream)
+    draw(output)
+    return output
+
+
+def run(process, streams: int, frames: int, shape):
+    rng = np.random.default_rng(0)
+    sources = [rng.integers(0, 255, shape, dtype=np.uint8) for _ in range(streams)]
+    label_renderer.sprite("no-helmet", (0, 0, 255))  # 스프라이트 캐시는 측정에서 제외
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    states = [FrameBuffer() for _ in range(streams)]
+    outputs = [None] * streams
+    transient = []
+    started = time.perf_counter()
+    for _ in range(frames):
+        for index in range(streams):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            # 직전 출력은 인코딩 뒤 버려진다고 보고, 새 출력이 나올 때까지 유지
+            outputs[index] = process(sources[index], states[index])
+            _, peak = tracemalloc.get_traced_memory()
+            transient.append(peak - before)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for index in range(streams):
+        outputs[index] = process(sources[index], states[index])
+    _, steady_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "transient_mb": float(np.mean(transient)) / MB,
+        "retained_per_stream_mb": (current - baseline) / streams / MB,
+        "peak_mb": (steady_peak - baseline) / MB,
+        "ms_per_frame": elapsed * 1000 / (frames * streams),
+        "allocations": sum(state.allocations for state in states),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--streams", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+
+    width, height = map(int, args.size.split("x"))
+    shape = (height, width, 3)
+    print(f"프레임 {args.size} ({height * width * 3 / MB:.1f} MB), 스트림당 {args.frames}프레임")
+    print(f"{'path':>10} {'streams':>7} {'transient MB/frame':>19} {'retained MB/stream':>19} {'peak MB':>8} "
+          f"{'ms/frame':>9} {'buffer allocs':>14}")
+    for streams in args.streams:
+        for name, process in (("legacy", legacy_frame), ("zero-copy", zero_copy_frame)):
+            r = run(process, streams, args.frames, shape)
+            allocations = r["allocations"] if process is zero_copy_frame else 2 * streams * (args.frames + 1)
+            print(f"{name:>10} {streams:>7} {r['transient_mb']:>19.2f} {r['retained_per_stream_mb']:>19.2f} "
+                  f"{r['peak_mb']:>8.1f} {r['ms_per_frame']:>9.2f} {allocations:>14}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,85 @@
+"""
+헬멧 모델 2단계 추론 벤치마크: 크롭별 개별 추론 vs 배치 추론
+
+두 경로의 결과가 허용 오차 (박스 BOX_TOLERANCE_PX 픽셀, 신뢰도 CONF_TOLERANCE) 안에서 같은지 확인하고, 다르면 AssertionError.
+
+backend 디렉토리에서 실행:
+    python -m benchmarks.bench_helmet_batch --image sample.jpg --riders 1 5 10 20
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+import main
+
+# 배치 경로는 개별 추론과 같은 레터박스/후처리를 쓰므로 배치 연산의 부동소수점 오차만 허용
+BOX_TOLERANCE_PX = 0.5
+CONF_TOLERANCE = 1e-3
+
+def synthetic_riders(img: np.ndarray, count: int):
+    """이미지 위에 격자 형태로 배치한 가상 라이더 박스 생성"""
+    height, width = img.shape[:2]
+    cols = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / cols))
+    cell_w, cell_h = width / cols, height / rows
+    riders = []
+    for i in range(count):
+        r, c = divmod(i, cols)
+        x1, y1 = c * cell_w + cell_w * 0.2, r * cell_h + cell_h * 0.1
+        x2, y2 = x1 + cell_w * 0.6, y1 + cell_h * 0.8
+        riders.append({"bbox": [x1, y1, x2, y2], "confidence": 0.9, "class": "person"})
+    return riders
+
+
+def run(crops, batched: bool, repeat: int):
+    main.HELMET_BATCH_INFERENCE = batched
+    main.helmet_inference(crops)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        boxes = main.helmet_inference(crops)
+    return (time.perf_counter() - start) / repeat * 1000, boxes
+
+
+def assert_equivalent(per_crop, batched):
+    """두 경로의 크롭별 박스 수가 같고 좌표/신뢰도 차이가 허용 오차 이내인지 확인, (최대 Δpx, 최대 Δconf) 반환"""
+    box_delta = conf_delta = 0.0
+    for index, (a, b) in enumerate(zip(per_crop, batched)):
+        assert len(a) == len(b), f"크롭 {index}: 박스 수 다름 (개별 {len(a)}, 배치 {len(b)})"
+        if not len(a):
+            continue
+        rows_a = np.column_stack([a.xyxy, a.conf])
+        rows_b = np.column_stack([b.xyxy, b.conf])
+        rows_a = rows_a[np.lexsort(rows_a.T[::-1])]
+        rows_b = rows_b[np.lexsort(rows_b.T[::-1])]
+        box_delta = max(box_delta, float(np.abs(rows_a[:, :4] - rows_b[:, :4]).max()))
+        conf_delta = max(conf_delta, float(np.abs(rows_a[:, 4] - rows_b[:, 4]).max()))
+    assert box_delta <= BOX_TOLERANCE_PX, f"박스 좌표 차이 {box_delta:.3f}px > {BOX_TOLERANCE_PX}px"
+    assert conf_delta <= CONF_TOLERANCE, f"신뢰도 차이 {conf_delta:.5f} > {CONF_TOLERANCE}"
+    return box_delta, conf_delta
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--riders", type=int, nargs="+", default=[1, 2, 5, 10, 15, 20])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    img = cv2.imread(args.image)
+    if img is None:
+        raise SystemExit(f"이미지를 열 수 없습니다: {args.image}")
+
+    print(f"{'riders':>6} {'per-crop ms':>12} {'batched ms':>11} {'speedup':>8} {'max Δpx':>8} {'max Δconf':>10}")
+    for count in args.riders:
+        crops = [main.rider_crop(img, rider)[0] for rider in synthetic_riders(img, count)]
+        per_crop_ms, per_crop_boxes = run(crops, False, args.repeat)
+        batched_ms, batched_boxes = run(crops, True, args.repeat)
+        box_delta, conf_delta = assert_equivalent(per_crop_boxes, batched_boxes)
+        print(f"{count:>6} {per_crop_ms:>12.1f} {batched_ms:>11.1f} {per_crop_ms / batched_ms:>7.2f}x "
+              f"{box_delta:>8.3f} {conf_delta:>10.5f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,114 @@
+"""
+헬멧 라벨 시각화 렌더링 시간 비교
+
+기존 구현(호출마다 글꼴 로드, 프레임 전체 BGR→RGB→PIL→BGR 변환 후 PIL 로 그리기)과
+LabelRenderer(글꼴 1회 로드, 캐시된 라벨 스프라이트를 NumPy 프레임에 직접 블릿)의 프레임당 시간을
+해상도와 라이더 수별로 출력한다. backend 디렉토리에서 실행:
+    python -m benchmarks.bench_label_render --sizes 1280x720 1920x1080 --riders 1 5 20
+"""
+import argparse
+import os
+import random
+import time
+
+import cv2
+import numpy as np
+
+from config import LABEL_THICKNESS
+from label_renderer import LabelRenderer
+
+
+def legacy_visualization(img, results):
+    """기존 helmet_label_visualization (비교 기준)"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    img_rgb = cv2.cvtColor(img.copy(), cv2.COLOR_BGR2RGB)
+    pil_img = Image.fromarray(img_rgb)
+    draw = ImageDraw.Draw(pil_img)
+    try:
+        font_path = os.path.join(os.environ['WINDIR'], 'Fonts', 'malgun.ttf')
+        if not os.path.exists(font_path):
+            font_path = os.path.join(os.environ['WINDIR'], 'Fonts', 'gulim.ttc')
+        ImageFont.truetype(font_path, 20)
+        warning_font = ImageFont.truetype(font_path, 16)
+        ImageFont.truetype(font_path, 28)
+    except Exception:
+        ImageFont.load_default()
+        warning_font = ImageFont.load_default()
+        ImageFont.load_default()
+
+    for pair in results["rider_pairs"]:
+        status = pair["helmet_result"]["status"]
+        x1, y1, x2, y2 = map(int, pair["rider"]["bbox"])
+        outline, text, text_color = (((255, 0, 0), "no-helmet", (255, 0, 0)) if status == "no_helmet"
+                                     else ((0, 255, 0), "helmet", (0, 155, 0)))
+        draw.rectangle([(x1, y1), (x2, y2)], outline=outline, width=LABEL_THICKNESS * 2)
+        text_bbox = draw.textbbox((0, 0), text, font=warning_font)
+        text_width = text_bbox[2] - text_bbox[0]
+        text_height = text_bbox[3] - text_bbox[1]
+        draw.rectangle([(x1, y1 - text_height - 5), (x1 + text_width, y1)], fill=text_color)
+        draw.text((x1, y1 - text_height - 5), text, font=warning_font, fill=(255, 255, 255))
+    return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+
+
+def renderer_visualization(renderer: LabelRenderer):
+    """main.helmet_label_visualization 과 같은 그리기 (모델 로드 없이 측정)"""
+    def visualize(img, results):
+        img_copy = img.copy()
+        for pair in results["rider_pairs"]:
+            x1, y1, x2, y2 = map(int, pair["rider"]["bbox"])
+            if pair["helmet_result"]["status"] == "no_helmet":
+                renderer.draw_box(img_copy, (x1, y1, x2, y2), (0, 0, 255), LABEL_THICKNESS * 2)
+                renderer.draw_label(img_copy, "no-helmet", (x1, y1), (0, 0, 255))
+            else:
+                renderer.draw_box(img_copy, (x1, y1, x2, y2), (0, 255, 0), LABEL_THICKNESS * 2)
+                renderer.draw_label(img_copy, "helmet", (x1, y1), (0, 155, 0))
+        return img_copy
+    return visualize
+
+
+def make_results(width: int, height: int, riders: int, seed: int = 0):
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(riders):
+        w, h = rng.randint(40, 200), rng.randint(80, 300)
+        x1, y1 = rng.randint(0, width - w), rng.randint(30, height - h)
+        pairs.append({"rider": {"bbox": [x1, y1, x1 + w, y1 + h]},
+                      "helmet_result": {"status": rng.choice(["helmet", "no_helmet"])}})
+    return {"rider_pairs": pairs}
+
+
+def measure(fn, img, results, repeat: int):
+    fn(img, results)  # 워밍업 (스프라이트 캐시 포함)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(img, results)
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.mean(timings)), float(np.percentile(timings, 95))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["1280x720", "1920x1080"])
+    parser.add_argument("--riders", nargs="+", type=int, default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    renderer = LabelRenderer()
+    new = renderer_visualization(renderer)
+    print(f"{'size':>10} {'riders':>6} {'legacy ms':>10} {'p95':>7} {'renderer ms':>12} {'p95':>7} {'speedup':>8}")
+    for size in args.sizes:
+        width, height = map(int, size.split("x"))
+        img = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+        for riders in args.riders:
+            results = make_results(width, height, riders)
+            legacy_mean, legacy_p95 = measure(legacy_visualization, img, results, args.repeat)
+            new_mean, new_p95 = measure(new, img, results, args.repeat)
+            print(f"{size:>10} {riders:>6} {legacy_mean:>10.2f} {legacy_p95:>7.2f} {new_mean:>12.2f} {new_p95:>7.2f} "
+                  f"{legacy_mean / new_mean:>7.1f}x")
+    print(f"스프라이트 캐시: {renderer.cache_info()}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,118 @@
+"""
+라이더-오토바이 페어링 마이크로벤치마크 및 기존 구현과의 회귀 비교
+
+backend 디렉토리에서 실행:
+    python -m benchmarks.bench_pairing --sizes 10 50 100 300
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import pairing
+from config import MOTORCYCLE_RIDER_CAPACITY, RIDER_MOTORCYCLE_PAIRING_THRESHOLD
+from detections import Detections
+
+
+def legacy_pairing(detections):
+    """기존 중첩 루프 + 탐욕적 할당 구현 (비교 기준)"""
+    riders = [d for d in detections if d["class"] == "person"]
+    motorcycles = [d for d in detections if d["class"] == "motorcycle"]
+    pairs = []
+    paired_rider_indices = set()
+    for motorcycle in motorcycles:
+        moto_center_x = (motorcycle["bbox"][0] + motorcycle["bbox"][2]) / 2
+        moto_center_y = (motorcycle["bbox"][1] + motorcycle["bbox"][3]) / 2
+        moto_width = motorcycle["bbox"][2] - motorcycle["bbox"][0]
+        moto_height = motorcycle["bbox"][3] - motorcycle["bbox"][1]
+        moto_threshold = RIDER_MOTORCYCLE_PAIRING_THRESHOLD * max(moto_width, moto_height)
+        potential_riders = []
+        for rider_idx, rider in enumerate(riders):
+            if rider_idx in paired_rider_indices:
+                continue
+            rider_center_x = (rider["bbox"][0] + rider["bbox"][2]) / 2
+            rider_center_y = (rider["bbox"][1] + rider["bbox"][3]) / 2
+            distance = ((rider_center_x - moto_center_x) ** 2 + (rider_center_y - moto_center_y) ** 2) ** 0.5
+            if distance < moto_threshold:
+                confidence = 1.0 - (distance / moto_width) if moto_width > 0 else 0.5
+                potential_riders.append((distance, rider_idx, rider, confidence))
+        potential_riders.sort(key=lambda x: x[0])
+        for distance, rider_idx, rider, confidence in potential_riders:
+            pairs.append({
+                "rider": rider,
+                "motorcycle": motorcycle,
+                "confidence": round(confidence, 3),
+                "distance": round(distance, 3)
+            })
+            paired_rider_indices.add(rider_idx)
+    return pairs
+
+
+def box(cx, cy, w, h, cls):
+    return {"bbox": [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], "confidence": 0.9, "class": cls, "model": "yolov11n"}
+
+
+def unambiguous_scene(rng: random.Random, motorcycles: int):
+    """각 라이더가 정확히 한 대의 오토바이에만 가까운 장면 (두 구현의 결과가 같아야 함)"""
+    detections = []
+    for i in range(motorcycles):
+        cx, cy = 400 * i + 200, rng.uniform(200, 800)
+        detections.append(box(cx, cy, rng.uniform(150, 250), rng.uniform(120, 200), "motorcycle"))
+        for _ in range(rng.randint(0, MOTORCYCLE_RIDER_CAPACITY)):
+            detections.append(box(cx + rng.uniform(-30, 30), cy - rng.uniform(20, 60), 80, 180, "person"))
+    rng.shuffle(detections)
+    return detections
+
+
+def random_scene(rng: random.Random, count: int):
+    """라이더와 오토바이가 섞인 무작위 장면"""
+    detections = []
+    for _ in range(count):
+        cls = "motorcycle" if rng.random() < 0.5 else "person"
+        w, h = (rng.uniform(40, 250), rng.uniform(40, 200)) if cls == "motorcycle" else (rng.uniform(20, 100), rng.uniform(60, 220))
+        detections.append(box(rng.uniform(0, 3840), rng.uniform(0, 2160), w, h, cls))
+    return detections
+
+
+def pair_keys(pairs):
+    return sorted((tuple(p["rider"]["bbox"]), tuple(p["motorcycle"]["bbox"]), p["distance"], p["confidence"]) for p in pairs)
+
+
+def timed(fn, detections, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(detections)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = fn(detections)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 300])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scenes", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    # 회귀 비교: 모호하지 않은 장면에서는 기존 구현과 결과가 동일해야 함
+    mismatches = 0
+    for _ in range(args.scenes):
+        detections = Detections.from_dicts(unambiguous_scene(rng, rng.randint(1, 8)))
+        with contextlib.redirect_stdout(io.StringIO()):
+            new_pairs = pairing.rider_motorcycle_pairing(detections)
+        if pair_keys(new_pairs) != pair_keys(legacy_pairing(detections.to_dicts())):
+            mismatches += 1
+    print(f"회귀 비교: {args.scenes}개 장면 중 불일치 {mismatches}개")
+
+    print(f"{'detections':>10} {'legacy ms':>10} {'vectorized ms':>14} {'legacy pairs':>13} {'optimal pairs':>14}")
+    for size in args.sizes:
+        detections = Detections.from_dicts(random_scene(rng, size))
+        legacy_ms, legacy_pairs = timed(legacy_pairing, detections.to_dicts(), args.repeat)
+        new_ms, new_pairs = timed(pairing.rider_motorcycle_pairing, detections, args.repeat)
+        print(f"{size:>10} {legacy_ms:>10.3f} {new_ms:>14.3f} {len(legacy_pairs):>13} {len(new_pairs):>14}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,83 @@
+"""
+비디오 업로드 저장 방식별 최대 RSS 비교
+
+파일 크기별로 기존 방식(file.read() 로 전체를 읽은 뒤 임시 파일에 쓰기)과 청크 단위 스트리밍 저장
+(save_upload)을 각각 별도 프로세스에서 실행하고, 실행 전후 최대 RSS 증가량을 출력한다.
+backend 디렉토리에서 실행:
+    python -m benchmarks.bench_upload_memory --sizes-mb 64 256 1024
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import tempfile
+
+from starlette.datastructures import UploadFile
+
+from config import VIDEO_UPLOAD_CHUNK_SIZE
+from gpt_video import save_upload
+
+
+async def legacy_save(file: UploadFile, path: str) -> int:
+    """기존 process_video 의 저장 방식"""
+    content = await file.read()
+    with open(path, "wb") as f:
+        f.write(content)
+    return len(content)
+
+
+def peak_rss_mb() -> float:
+    # Linux 에서 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(method: str, source: str, queue):
+    baseline = peak_rss_mb()
+    output = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+    output.close()
+    try:
+        with open(source, "rb") as f:
+            upload = UploadFile(f, size=os.path.getsize(source), filename="upload.mp4")
+            save = legacy_save if method == "legacy" else save_upload
+            asyncio.run(save(upload, output.name))
+    finally:
+        if os.path.exists(output.name):
+            os.unlink(output.name)
+    queue.put(peak_rss_mb() - baseline)
+
+
+def make_source(size_mb: int) -> str:
+    source = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+    block = os.urandom(1024 * 1024)
+    for _ in range(size_mb):
+        source.write(block)
+    source.close()
+    return source.name
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[64, 256, 1024])
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"청크 크기: {VIDEO_UPLOAD_CHUNK_SIZE / 1024 / 1024:.1f} MB")
+    print(f"{'size(MB)':>9} {'legacy peak +RSS(MB)':>21} {'streaming peak +RSS(MB)':>24}")
+    for size_mb in args.sizes_mb:
+        source = make_source(size_mb)
+        try:
+            peaks = {}
+            for method in ("legacy", "streaming"):
+                queue = context.Queue()
+                process = context.Process(target=measure, args=(method, source, queue))
+                process.start()
+                peaks[method] = queue.get()
+                process.join()
+        finally:
+            os.unlink(source)
+        print(f"{size_mb:>9} {peaks['legacy']:>21.1f} {peaks['streaming']:>24.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,72 @@
+"""
+비디오 샘플링 모드별 처리 시간과 감지 재현율 비교
+
+모든 프레임을 추론한 결과(all)를 기준으로, 각 모드가 프레임별로 그린 박스가 기준 박스를
+IoU 0.5 이상으로 얼마나 덮는지(재현율)를 처리 시간과 함께 출력한다.
+backend 디렉토리에서 실행:
+    python -m benchmarks.bench_video_sampling --video sample.mp4 --strides 2 3 5 --motion 0.01 0.02 0.05
+"""
+import argparse
+import os
+import tempfile
+
+from ultralytics import YOLO
+
+from gpt_video import FrameSampler, annotate_video, find_target_class_index
+
+
+def iou(a, b) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def recall(reference, candidate, threshold: float = 0.5) -> float:
+    total = matched = 0
+    for ref_boxes, boxes in zip(reference, candidate):
+        for ref in ref_boxes:
+            total += 1
+            if any(iou(ref, box) >= threshold for box in boxes):
+                matched += 1
+    return matched / total if total else 1.0
+
+
+def run(video: str, model, target_class_index: int, sampler: FrameSampler):
+    frame_boxes = []
+    output = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+    output.close()
+    try:
+        stats = annotate_video(video, output.name, model, target_class_index, sampler, frame_boxes)
+    finally:
+        os.unlink(output.name)
+    return stats, frame_boxes
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--model", default="models/best5.pt")
+    parser.add_argument("--strides", type=int, nargs="+", default=[2, 3, 5])
+    parser.add_argument("--motion", type=float, nargs="+", default=[0.01, 0.02, 0.05])
+    args = parser.parse_args()
+
+    model = YOLO(args.model)
+    target_class_index = find_target_class_index(model, "helmet")
+
+    reference_stats, reference_boxes = run(args.video, model, target_class_index, FrameSampler("all"))
+    samplers = [("all", FrameSampler("all"))]
+    samplers += [(f"stride={n}", FrameSampler("stride", stride=n)) for n in args.strides]
+    samplers += [(f"motion={t}", FrameSampler("motion", motion_threshold=t)) for t in args.motion]
+
+    print(f"{'mode':>14} {'inferred':>9} {'time s':>8} {'speedup':>8} {'recall':>7}")
+    for name, sampler in samplers:
+        stats, boxes = (reference_stats, reference_boxes) if name == "all" else run(args.video, model, target_class_index, sampler)
+        speedup = reference_stats["processing_time"] / stats["processing_time"]
+        print(f"{name:>14} {stats['inferred_frames']:>9} {stats['processing_time']:>8.2f} "
+              f"{speedup:>7.2f}x {recall(reference_boxes, boxes):>7.3f}")
+
+
+if __name__ == "__main__":
+    main_cli()
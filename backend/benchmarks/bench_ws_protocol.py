@@ -0,0 +1,75 @@
+"""
+WebSocket 텍스트(base64 data-URL + JSON) vs 바이너리(helmet.binary.v1) 프로토콜 비교
+
+프레임당 전송 바이트와 서버측 직렬화/역직렬화 CPU 시간을 측정한다 (모델 추론 제외).
+backend 디렉토리에서 실행:
+    python -m benchmarks.bench_ws_protocol --image sample.jpg
+"""
+import argparse
+import base64
+import json
+import time
+
+import cv2
+
+from ws_protocol import pack_message, unpack_message
+
+
+def sample_result() -> dict:
+    """/ws 응답과 비슷한 크기의 메타데이터"""
+    detection = {"bbox": [120.5, 80.25, 260.75, 410.0], "confidence": 0.912, "class": "person", "model": "yolov11n"}
+    return {
+        "timestamp": "2025-01-01T00:00:00",
+        "all_detections": [detection] * 6,
+        "rider_pairs": [],
+        "helmet_results": [],
+        "warning": "",
+    }
+
+
+def text_roundtrip(jpeg: bytes) -> tuple:
+    # 클라이언트 → 서버: data-URL 문자열
+    incoming = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode("utf-8")
+    start = time.process_time()
+    received = base64.b64decode(incoming.split(",")[1])
+    result = sample_result()
+    result["image"] = base64.b64encode(received).decode("utf-8")
+    outgoing = json.dumps(result)
+    cpu = time.process_time() - start
+    return len(incoming.encode("utf-8")), len(outgoing.encode("utf-8")), cpu
+
+
+def binary_roundtrip(jpeg: bytes) -> tuple:
+    incoming = pack_message({}, jpeg)
+    start = time.process_time()
+    _, received = unpack_message(incoming)
+    outgoing = pack_message(sample_result(), received)
+    cpu = time.process_time() - start
+    return len(incoming), len(outgoing), cpu
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--quality", type=int, default=90)
+    args = parser.parse_args()
+
+    img = cv2.imread(args.image)
+    if img is None:
+        raise SystemExit(f"이미지를 열 수 없습니다: {args.image}")
+    _, buffer = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, args.quality])
+    jpeg = buffer.tobytes()
+
+    print(f"JPEG 크기: {len(jpeg)} bytes")
+    print(f"{'mode':>7} {'in bytes':>10} {'out bytes':>10} {'cpu µs/frame':>13}")
+    for name, roundtrip in (("text", text_roundtrip), ("binary", binary_roundtrip)):
+        cpu_total = 0.0
+        for _ in range(args.repeat):
+            in_bytes, out_bytes, cpu = roundtrip(jpeg)
+            cpu_total += cpu
+        print(f"{name:>7} {in_bytes:>10} {out_bytes:>10} {cpu_total / args.repeat * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
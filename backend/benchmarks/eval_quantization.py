@@ -0,0 +1,144 @@
+"""
+양자화 변형별 정확도-속도 비교
+
+백엔드:정밀도 변형(예: torch:fp32 onnx:int8 openvino:fp16)마다 모델을 로드해 이미지 폴더를 추론하고,
+클래스별 정밀도/재현율(IoU 0.5)과 이미지당 지연 시간을 출력한다. --labels 에 YOLO 형식 라벨
+(이미지와 같은 이름의 .txt: "cls cx cy w h", 0~1 정규화)이 있으면 라벨 기준, 없으면 첫 번째 변형의
+예측을 기준으로 비교한다. 변형을 열 수 없어 torch 로 대체되면 오류로 종료한다.
+onnx/openvino 변형에는 pip install -r requirements-quantization.txt 가 필요하다. backend 디렉토리에서 실행:
+    python -m benchmarks.eval_quantization --model helmet --images data/images --labels data/labels \
+        --variants torch:fp32 onnx:fp32 onnx:int8 openvino:int8
+"""
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from config import CONFIDENCE_THRESHOLD, MODEL_PATHS
+from model_registry import ModelRegistry
+from rider_tracker import iou_matrix
+
+# 모델별 기본 평가 클래스
+DEFAULT_CLASSES = {
+    "helmet": ["helmet", "no_helmet"],
+    "yolov11n": ["person", "motorcycle"],
+    "best5": ["helmet"],
+}
+
+
+def predict(model, images, conf: float):
+    """이미지별 {클래스 이름: [(x1, y1, x2, y2, conf), ...]} 과 지연 시간(ms) 목록"""
+    predictions, latencies = [], []
+    model(images[0])  # 워밍업
+    for img in images:
+        started = time.perf_counter()
+        result = model(img)[0]
+        latencies.append((time.perf_counter() - started) * 1000)
+        boxes = {}
+        for box in result.boxes:
+            score = box.conf[0].item()
+            if score >= conf:
+                boxes.setdefault(model.names[int(box.cls[0].item())], []).append((*box.xyxy[0].tolist(), score))
+        predictions.append(boxes)
+    return predictions, latencies
+
+
+def load_labels(label_dir: str, image_paths, images, names):
+    """YOLO 형식 라벨을 이미지별 {클래스 이름: [(x1, y1, x2, y2, 1.0), ...]} 로 변환"""
+    ground_truth = []
+    for path, img in zip(image_paths, images):
+        height, width = img.shape[:2]
+        boxes = {}
+        label_path = os.path.join(label_dir, os.path.splitext(os.path.basename(path))[0] + ".txt")
+        if os.path.exists(label_path):
+            for line in open(label_path):
+                parts = line.split()
+                if len(parts) < 5:
+                    continue
+                cls, cx, cy, w, h = int(parts[0]), *map(float, parts[1:5])
+                box = ((cx - w / 2) * width, (cy - h / 2) * height, (cx + w / 2) * width, (cy + h / 2) * height, 1.0)
+                boxes.setdefault(names[cls], []).append(box)
+        ground_truth.append(boxes)
+    return ground_truth
+
+
+def precision_recall(predictions, ground_truth, class_name: str, iou_threshold: float = 0.5):
+    """신뢰도 순 탐욕 매칭으로 클래스의 정밀도/재현율 계산"""
+    tp = n_pred = n_gt = 0
+    for pred, gt in zip(predictions, ground_truth):
+        pred_boxes = sorted(pred.get(class_name, []), key=lambda b: -b[4])
+        gt_boxes = gt.get(class_name, [])
+        n_pred += len(pred_boxes)
+        n_gt += len(gt_boxes)
+        if not pred_boxes or not gt_boxes:
+            continue
+        iou = iou_matrix(np.array(pred_boxes)[:, :4], np.array(gt_boxes)[:, :4])
+        matched = np.zeros(len(gt_boxes), dtype=bool)
+        for row in iou:
+            candidates = np.where(~matched & (row >= iou_threshold))[0]
+            if len(candidates):
+                matched[candidates[np.argmax(row[candidates])]] = True
+                tp += 1
+    precision = tp / n_pred if n_pred else 1.0
+    recall = tp / n_gt if n_gt else 1.0
+    return precision, recall
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="helmet", choices=sorted(MODEL_PATHS))
+    parser.add_argument("--images", default="result")
+    parser.add_argument("--labels", default=None)
+    parser.add_argument("--variants", nargs="+", default=["torch:fp32", "onnx:fp32", "onnx:int8", "openvino:int8"])
+    parser.add_argument("--classes", nargs="+", default=None)
+    parser.add_argument("--conf", type=float, default=CONFIDENCE_THRESHOLD)
+    args = parser.parse_args()
+
+    image_paths = sorted(p for p in glob.glob(os.path.join(args.images, "*"))
+                         if p.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")))
+    images = [cv2.imread(p) for p in image_paths]
+    image_paths = [p for p, img in zip(image_paths, images) if img is not None]
+    images = [img for img in images if img is not None]
+    if not images:
+        raise SystemExit(f"이미지가 없습니다: {args.images}")
+    classes = args.classes or DEFAULT_CLASSES.get(args.model, [])
+
+    rows = []
+    for variant in args.variants:
+        backend, precision = variant.split(":")
+        registry = ModelRegistry({args.model: MODEL_PATHS[args.model]}, {args.model: backend}, {args.model: precision})
+        model = registry.get(args.model)
+        predictions, latencies = predict(model, images, args.conf)
+        status = registry.status()["models"][0]
+        if status["fallback_reason"]:
+            # torch 로 대체된 변형의 결과를 해당 변형으로 보고하지 않음
+            raise SystemExit(f"{variant} 를 열 수 없습니다: {status['fallback_reason']}")
+        rows.append((variant, f"{status['active_backend']}:{status['active_precision']}", predictions, latencies,
+                     model.names))
+
+    if args.labels:
+        ground_truth = load_labels(args.labels, image_paths, images, rows[0][4])
+        reference = "labels"
+    else:
+        ground_truth = rows[0][2]
+        reference = rows[0][0]
+
+    print(f"모델 {args.model}, 이미지 {len(images)}장, 기준: {reference}, conf >= {args.conf}")
+    header = f"{'variant':>15} {'active':>15} {'mean ms':>8} {'p95 ms':>7} {'speedup':>8}"
+    header += "".join(f" {c + ' P':>12} {c + ' R':>12}" for c in classes)
+    print(header)
+    base_ms = float(np.mean(rows[0][3]))
+    for variant, active, predictions, latencies, _ in rows:
+        mean_ms = float(np.mean(latencies))
+        line = f"{variant:>15} {active:>15} {mean_ms:>8.1f} {np.percentile(latencies, 95):>7.1f} {base_ms / mean_ms:>7.2f}x"
+        for class_name in classes:
+            precision, recall = precision_recall(predictions, ground_truth, class_name)
+            line += f" {precision:>12.3f} {recall:>12.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main_cli()
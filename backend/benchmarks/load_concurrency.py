@@ -0,0 +1,106 @@
+"""
+동시 /detect 요청과 /ws 스트림이 겹쳐서 처리되는지 확인하는 부하 테스트
+
+서버 실행 후 backend 디렉토리에서:
+    python -m benchmarks.load_concurrency --image sample.jpg --http 8 --ws 4
+
+두 가지를 측정한다.
+- 이벤트 루프 차단: 부하 중에 가벼운 GET / 요청을 주기적으로 보내 지연 시간을 잰다.
+  이벤트 루프가 추론에 막히면 프로브 지연이 요청 하나의 처리 시간 수준으로 커지고,
+  추론이 실행기에서 실행되면 유휴 상태와 비슷하게 유지된다.
+- 직렬화 정도: 경과 시간 / (동시 요청 수 × 단일 요청 지연). 요청이 하나씩 처리되면 1.0 에
+  가깝고, 겹쳐 처리될수록 작아진다 (완전히 병렬이면 1 / 요청 수).
+"""
+import argparse
+import asyncio
+import base64
+import time
+from typing import List
+
+import requests
+import websockets
+
+
+def detect_once(base_url: str, image_bytes: bytes) -> float:
+    start = time.perf_counter()
+    response = requests.post(f"{base_url}/detect", files={"file": ("frame.jpg", image_bytes, "image/jpeg")})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def ws_once(ws_url: str, image_bytes: bytes) -> float:
+    data_url = "data:image/jpeg;base64," + base64.b64encode(image_bytes).decode("utf-8")
+    start = time.perf_counter()
+    async with websockets.connect(f"{ws_url}/ws", max_size=None) as websocket:
+        await websocket.send(data_url)
+        await websocket.recv()
+    return time.perf_counter() - start
+
+
+def probe_once(base_url: str) -> float:
+    start = time.perf_counter()
+    requests.get(f"{base_url}/").raise_for_status()
+    return time.perf_counter() - start
+
+
+async def probe_loop(base_url: str, interval: float, stop: asyncio.Event) -> List[float]:
+    """stop 이 설정될 때까지 GET / 지연 시간을 주기적으로 측정"""
+    latencies = []
+    while not stop.is_set():
+        latencies.append(await asyncio.to_thread(probe_once, base_url))
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+    return latencies
+
+
+async def run(args, image_bytes: bytes):
+    http_tasks = [asyncio.to_thread(detect_once, args.base_url, image_bytes) for _ in range(args.http)]
+    ws_tasks = [ws_once(args.ws_url, image_bytes) for _ in range(args.ws)]
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop(args.base_url, args.probe_interval, stop))
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*http_tasks, *ws_tasks)
+    wall = time.perf_counter() - start
+    stop.set()
+    return wall, latencies, await probe
+
+
+def summary(latencies: List[float]) -> str:
+    values = sorted(latencies)
+    p50 = values[len(values) // 2]
+    return f"p50 {p50 * 1000:.1f} ms, 최대 {values[-1] * 1000:.1f} ms ({len(values)}회)"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--ws-url", default="ws://localhost:8000")
+    parser.add_argument("--http", type=int, default=8, help="동시 /detect 요청 수")
+    parser.add_argument("--ws", type=int, default=4, help="동시 /ws 스트림 수")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="GET / 프로브 간격(초)")
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        image_bytes = f.read()
+
+    # 기준값: 유휴 상태 프로브 지연과 단일 요청 지연 (첫 요청은 워밍업으로 제외)
+    idle_probe = [probe_once(args.base_url) for _ in range(10)]
+    detect_once(args.base_url, image_bytes)
+    single = min(detect_once(args.base_url, image_bytes) for _ in range(3))
+    wall, latencies, probe = asyncio.run(run(args, image_bytes))
+    count = len(latencies)
+
+    print(f"단일 /detect 지연 시간: {single * 1000:.1f} ms")
+    print(f"동시 요청 {count}개 (HTTP {args.http}, WS {args.ws})")
+    print(f"  경과 시간: {wall * 1000:.1f} ms, 요청 최대 지연: {max(latencies) * 1000:.1f} ms")
+    print(f"  직렬화 정도 (경과 / (요청 수 × 단일)): {wall / (count * single):.2f} "
+          f"(직렬 ≈ 1.00, 완전 병렬 ≈ {1 / count:.2f})")
+    print(f"  GET / 프로브 유휴: {summary(idle_probe)}")
+    print(f"  GET / 프로브 부하 중: {summary(probe)}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -7,6 +7,7 @@ BASE_DIR = Path(__file__).resolve().parent
 YOLO_WORLD_MODEL_PATH = str(BASE_DIR / "models" / "yolov8s-world.pt")  # YOLO-World 모델 경로
 YOLOV11N_MODEL_PATH = str(BASE_DIR / "models" / "yolo11n.pt")  # YOLO11n 모델 경로
 HELMET_MODEL_PATH = str(BASE_DIR / "models" / "helmet_model.pt")  # 헬멧 감지 모델 경로
+BEST5_MODEL_PATH = str(BASE_DIR / "models" / "best5.pt")  # 비디오/CCTV 스트림 헬멧 모델 경로
 CONFIDENCE_THRESHOLD = 0.5  # 감지 신뢰도 임계값
 
 # 클래스 설정
@@ -19,6 +20,9 @@ CLASSES = {
 
 # 표현식 설정
 RIDER_MOTORCYCLE_PAIRING_THRESHOLD = 0.6  # 라이더와 오토바이 페어링 임계값
+DISTANT_MOTORCYCLE_SIZE = 100  # 이 크기(픽셀) 미만의 오토바이는 멀리있는 것으로 판단
+DISTANT_MOTORCYCLE_SIZE_FACTOR = 1.5  # 멀리있는 작은 오토바이의 페어링 임계값 배율
+MOTORCYCLE_RIDER_CAPACITY = 2  # 오토바이 한 대에 페어링할 최대 라이더 수 (운전자 + 동승자)
 HELMET_RESULT_AGGREGATION_THRESHOLD = 0.5  # 헬멧 결과 집계 임계값
 
 # 동적 크롭 설정
@@ -33,6 +37,18 @@ LABEL_COLORS = {
 }
 LABEL_THICKNESS = 2
 LABEL_FONT_SCALE = 0.6
+# 라벨 글꼴 후보 (처음 존재하는 파일 사용, 환경 변수 확장, 모두 없으면 Pillow 기본 글꼴)
+LABEL_FONT_PATHS = (
+    "$WINDIR/Fonts/malgun.ttf",
+    "$WINDIR/Fonts/gulim.ttc",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+)
+LABEL_FONT_SIZE = 16  # 라벨 글꼴 크기
+LABEL_SPRITE_CACHE_SIZE = 256  # 캐시할 라벨 스프라이트 수 ((텍스트, 색, 크기)별)
+RENDER_MODES = ("none", "boxes", "full")  # none: 시각화/인코딩 생략, boxes: 박스만, full: 박스+라벨
+DEFAULT_RENDER_MODE = "full"
 
 # API 설정
 API_DESCRIPTION = """
@@ -43,3 +59,162 @@ API_VERSION = "1.0.0"
 
 # WebSocket 설정
 WS_PING_INTERVAL = 30  # WebSocket ping 간격(초)
+
+# 헬멧 모델 배치 추론 설정
+HELMET_BATCH_INFERENCE = True  # 라이더 크롭을 한 번의 배치로 추론
+HELMET_BATCH_IMGSZ = 640  # 헬멧 모델 입력 크기 (개별/배치 추론 공통, Ultralytics rect 레터박스의 긴 변)
+HELMET_BATCH_MAX_SIZE = 32  # 한 번에 추론할 최대 크롭 수
+LETTERBOX_COLOR = (114, 114, 114)  # 레터박스 패딩 색상 (Ultralytics 기본값)
+
+# CCTV 스트림 설정
+CCTV_STREAM_URL = "https://kbscctv-cache.loomex.net/lowStream/_definst_/9999_low.stream/chunklist.m3u8"
+CCTV_FRAME_INTERVAL = 0.2  # 클라이언트 전송 간격(초), 약 5 FPS
+STREAM_RECONNECT_INITIAL_DELAY = 0.5  # 재연결 초기 대기 시간(초)
+STREAM_RECONNECT_MAX_DELAY = 10.0  # 재연결 최대 대기 시간(초)
+STREAM_READ_TIMEOUT = 5.0  # 새 프레임 대기 시간(초)
+
+# 스트림 허브 설정
+STREAM_SUBSCRIBER_QUEUE_SIZE = 2  # 구독자별 전송 대기 프레임 수
+STREAM_SUBSCRIBER_DROP_POLICY = "drop_oldest"  # drop_oldest | drop_newest | disconnect
+
+# 추론 실행기 설정
+INFERENCE_EXECUTOR_KIND = "thread"  # thread | process
+INFERENCE_EXECUTOR_WORKERS = 4  # 디코딩/인코딩 등 공용 단계 워커 수
+INFERENCE_MODEL_WORKERS = {  # 모델별 전용 워커 수 (워커 어피니티)
+    "yolov11n": 1,   # YOLO11n 초기 감지 (마이크로 배치)
+    "detection": 2,  # process_detection (헬멧 모델 등 2단계, 모델 추론은 모델별 잠금으로 직렬화되고 크롭/페어링/시각화는 겹쳐 실행)
+    "stream": 1,     # CCTV 스트림 모델 (best5.pt)
+    "video": 1,      # /process-video 전체 비디오 처리 (긴 작업이 공용 풀의 디코딩/인코딩을 막지 않도록 분리)
+}
+
+# 마이크로 배치 설정 (YOLO11n 초기 감지)
+MICRO_BATCH_ENABLED = True  # 동시 요청을 묶어 한 번의 배치로 추론
+MICRO_BATCH_MAX_SIZE = 8  # 배치당 최대 이미지 수
+MICRO_BATCH_MAX_WAIT_MS = 10  # 첫 요청 이후 최대 대기 시간(ms)
+
+# 라이더 추적 설정 (스트림에서 헬멧 판정 재사용)
+WS_RIDER_TRACKING = True  # /ws 연결별 라이더 추적 (트랙 상태 때문에 프로세스 실행기에서도 스레드에서 실행)
+TRACK_IOU_THRESHOLD = 0.3  # 트랙-감지 매칭 최소 IoU
+TRACK_HIGH_CONFIDENCE = 0.5  # 1차 매칭에 사용할 감지 신뢰도 기준
+TRACK_MAX_MISSES = 15  # 이 프레임 수 이상 놓치면 트랙 종료
+HELMET_RECHECK_INTERVAL = 10  # K 프레임마다 헬멧 모델로 재판정
+HELMET_STABLE_VERDICTS = 2  # 최근 N 번의 판정이 모두 같아야 재사용 (다르거나 N 번 미만이면 다음 프레임에 재판정)
+HELMET_VOTE_WINDOW = 5  # 투표에 사용할 최근 판정 수
+
+# 비디오 프레임 샘플링 설정
+VIDEO_SAMPLING_MODES = ("all", "stride", "motion")  # all: 모든 프레임, stride: N 프레임마다, motion: 움직임 감지 시
+VIDEO_SAMPLING_MODE = "all"
+VIDEO_INFERENCE_STRIDE = 3  # stride 모드에서 추론 간격(프레임)
+VIDEO_MOTION_THRESHOLD = 0.02  # motion 모드에서 추론을 트리거하는 평균 프레임 차이 (0~1)
+VIDEO_MOTION_MAX_GAP = 30  # motion 모드에서도 이 프레임 수마다 한 번은 추론
+VIDEO_MOTION_SAMPLE_WIDTH = 160  # 움직임 점수를 계산할 축소 프레임 너비
+
+# 비디오 작업 큐 설정 (/jobs/video)
+VIDEO_JOB_WORKERS = 1  # 동시에 처리할 비디오 작업 수
+VIDEO_JOB_DIR = "jobs"  # 처리 대기 중인 업로드 파일 보관 디렉토리
+VIDEO_JOB_DB_PATH = "result/video_jobs.sqlite3"  # 작업 상태 저장소
+VIDEO_JOB_PROGRESS_INTERVAL = 0.5  # 진행률을 저장소에 기록하는 최소 간격(초)
+
+# 비디오 업로드 설정
+VIDEO_UPLOAD_CHUNK_SIZE = 1024 * 1024  # 업로드를 디스크에 쓰는 청크 크기 (요청당 업로드 메모리 상한)
+VIDEO_UPLOAD_MAX_BYTES = 4 * 1024 ** 3  # 업로드 최대 크기 (초과 시 413)
+VIDEO_UPLOAD_FORM_OVERHEAD = 64 * 1024  # Content-Length 사전 검사 시 멀티파트 경계/헤더 여유 바이트
+
+# 비디오 파이프라인 설정 (디코딩 → 추론 → 주석/인코딩)
+VIDEO_PIPELINE_QUEUE_SIZE = 8  # 단계 사이 큐에 쌓을 수 있는 최대 프레임 수
+
+# 비디오 세그먼트 병렬 처리 설정
+VIDEO_MODEL = "best5"  # 비디오 처리 모델 (레지스트리 이름)
+VIDEO_PARALLEL_ENABLED = False  # 기본으로 세그먼트 병렬 처리 사용 (요청의 parallel 파라미터로 변경 가능)
+VIDEO_PARALLEL_WORKERS = 4  # 세그먼트 워커 프로세스 수 (워커마다 모델을 한 번 로드)
+VIDEO_SEGMENT_MIN_FRAMES = 300  # 세그먼트당 최소 프레임 수 (짧은 비디오는 단일 프로세스로 처리)
+
+# 모델 레지스트리 설정 (이름 → 가중치 경로, 프로세스당 한 번 처음 사용할 때 로드)
+MODEL_PATHS = {
+    "yolo_world": YOLO_WORLD_MODEL_PATH,
+    "yolov11n": YOLOV11N_MODEL_PATH,
+    "helmet": HELMET_MODEL_PATH,
+    "best5": BEST5_MODEL_PATH,
+}
+MODEL_WARMUP = ("yolov11n", "helmet")  # 서버 시작 시 미리 로드하고 워밍업 추론할 모델
+MODEL_WARMUP_IMGSZ = 640  # 워밍업 입력 이미지 크기
+STREAM_MODEL = "best5"  # CCTV 스트림 모델 (레지스트리 이름)
+
+# 추론 백엔드 설정 (모델별 torch | onnx | openvino, CPU 서버에서는 onnx/openvino 가 더 빠름)
+MODEL_BACKEND_CHOICES = ("torch", "onnx", "openvino")
+MODEL_BACKENDS = {
+    "yolo_world": "torch",
+    "yolov11n": "torch",
+    "helmet": "torch",
+    "best5": "torch",
+}
+MODEL_EXPORT_ON_DEMAND = True  # 내보낸 파일(.onnx, _openvino_model)이 없으면 처음 로드할 때 .pt 에서 내보내기
+MODEL_BACKEND_STRICT = False  # True 면 설정한 백엔드/정밀도를 열 수 없을 때 torch 로 대체하지 않고 실패 (서버 시작 시 워밍업 포함)
+MODEL_EXPORT_IMGSZ = 640  # 내보내기 기준 입력 크기
+
+# 양자화 설정 (모델별 fp32 | fp16 | int8, onnx/openvino 백엔드에서만 적용)
+MODEL_PRECISION_CHOICES = ("fp32", "fp16", "int8")
+MODEL_PRECISIONS = {
+    "yolo_world": "fp32",
+    "yolov11n": "fp32",
+    "helmet": "fp32",
+    "best5": "fp32",
+}
+QUANT_INT8_MODE = "static"  # onnx INT8 방식 (static: 보정 이미지로 활성값 범위 계산, dynamic: 가중치만 양자화)
+QUANT_CALIBRATION_DIR = str(BASE_DIR / "calibration")  # INT8 보정 이미지 폴더
+QUANT_CALIBRATION_IMAGES = 200  # 보정에 사용할 최대 이미지 수
+
+# 감지 ROI / 입력 크기 설정 (소스별)
+# polygon: 감지기를 실행할 관심 영역 (0~1 정규화 좌표 다각형, None 이면 전체 프레임)
+# imgsz: 감지기 입력 크기 (None 이면 모델 기본값)
+# tiled: 겹치는 타일로 나눠 감지 (SAHI 방식, 고해상도 CCTV 의 멀리 있는 작은 객체용, 입력 크기는 TILE_SIZE)
+# 소스: "upload" (/detect, /ws), "video" (/process-video), "cctv" (CCTV 스트림 기본), 또는 스트림 URL/파일 경로
+ROI_SOURCES = {
+    "upload": {"polygon": None, "imgsz": None, "tiled": False},
+    "video": {"polygon": None, "imgsz": None, "tiled": False},
+    "cctv": {"polygon": None, "imgsz": None, "tiled": False},
+    # 예: 하늘/건물을 제외하고 도로 차선만 감지
+    # "http://cctv.example/stream.m3u8": {"polygon": [[0.0, 0.4], [1.0, 0.4], [1.0, 1.0], [0.0, 1.0]], "imgsz": 480},
+    # 예: 1080p 이상 CCTV 에서 멀리 있는 이륜차 탑승자 감지
+    # "rtsp://cctv.example/highway": {"polygon": None, "imgsz": None, "tiled": True},
+}
+ROI_MASK_OUTSIDE = True  # ROI 외접 사각형 안에서 다각형 밖은 레터박스 색으로 채움
+
+# 타일 감지 설정 (ROI_SOURCES 의 tiled 소스)
+TILE_SIZE = 640  # 타일 한 변 길이 (감지기 입력 크기, 이보다 작은 프레임은 타일 하나)
+TILE_OVERLAP = 0.2  # 이웃 타일 간 겹침 비율 (경계에 걸친 객체가 한 타일 안에 온전히 들어가도록)
+TILE_INCLUDE_FULL_FRAME = True  # 타일과 함께 축소한 전체 프레임도 감지 (타일보다 큰 가까운 객체용)
+TILE_NMS_METRIC = "ios"  # 타일 간 중복 제거 기준 (ios: 교집합/작은 박스 면적, iou: 교집합/합집합)
+TILE_NMS_THRESHOLD = 0.5  # 이 값 이상 겹치는 같은 클래스 박스는 신뢰도가 높은 것만 유지
+
+# /detect 결과 캐시 설정 (업로드 바이트 해시 + 설정/모델 버전 + render 모드가 키)
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_MAX_ENTRIES = 512  # 메모리 계층 최대 항목 수 (LRU)
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 메모리 계층 최대 크기 (직렬화된 JSON 기준)
+RESULT_CACHE_TTL = 3600  # 항목 유효 시간 (초, None 이면 무제한)
+RESULT_CACHE_STORE_IMAGE = True  # 시각화 이미지가 포함된 결과도 캐시 (False 이면 render="none" 요청만)
+RESULT_CACHE_DISK_DIR = None  # 디스크 계층 디렉토리 (예: str(BASE_DIR / "result" / "cache"), None 이면 사용 안 함)
+RESULT_CACHE_DISK_MAX_BYTES = 1024 * 1024 * 1024  # 디스크 계층 최대 크기
+
+# /metrics (Prometheus 텍스트 형식) 설정
+METRICS_PREFIX = "helmet"  # 지표 이름 접두사
+METRICS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # 소요 시간 히스토그램 버킷 (초)
+STREAM_FPS_SMOOTHING = 0.1  # 스트림 FPS 지수 이동 평균 계수
+
+# 로깅 설정
+LOG_LEVEL = "INFO"  # 기본 레벨 (DEBUG 이면 프레임별 감지 단계 로그 출력)
+LOG_LEVELS = {  # 로거(모듈)별 레벨
+    "main": "INFO",
+    "pairing": "INFO",
+    "gpt_streaming": "INFO",
+    "stream_session": "INFO",
+    "stream_hub": "INFO",
+    "server_main": "INFO",
+    "model_registry": "INFO",
+    "result_cache": "INFO",
+    "ultralytics": "WARNING",
+}
+LOG_FORMAT = "text"  # text | json (한 줄 JSON, extra 필드 포함)
+LOG_DEBUG_RATE = 5  # 호출 위치별 초당 최대 DEBUG 로그 수 (0 이면 제한 없음)
+LOG_THROTTLE_INTERVAL = 10.0  # 반복되는 경고(예: 프레임 수신 실패)를 같은 키별로 기록하는 최소 간격(초)
+LOG_QUEUE_SIZE = 10000  # 비동기 로그 큐 크기 (가득 차면 버림)
@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+Names = Union[Mapping[int, str], Sequence[str]]
+
+
+def _names_tuple(names: Names) -> Tuple[str, ...]:
+    """모델의 names ({번호: 이름} 또는 목록) 를 번호 순 튜플로"""
+    if isinstance(names, Mapping):
+        return tuple(names.get(i, str(i)) for i in range(max(names, default=-1) + 1))
+    return tuple(names)
+
+
+def _to_numpy(data) -> np.ndarray:
+    """텐서/배열을 float32 NumPy 배열로 한 번에 복사 (GPU 텐서는 한 번의 장치→호스트 전송)"""
+    if hasattr(data, "cpu"):
+        data = data.cpu().numpy()
+    return np.array(data, dtype=np.float32)
+
+
+class Detections:
+    """연속 NumPy 배열 기반 감지 결과 (xyxy (N, 4), 신뢰도 (N,), 클래스 번호 (N,), 출처 모델 번호 (N,))
+
+    클래스 이름과 모델 이름은 names / sources 튜플에 한 번만 두고 배열에는 번호만 저장한다.
+    필터링은 불리언 마스크(또는 인덱스 배열)로 하고, JSON 형식의 dict 목록은 API 응답 직전에 to_dicts() 로만 만든다.
+    """
+
+    __slots__ = ("xyxy", "conf", "cls", "source", "names", "sources")
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray, source: np.ndarray,
+                 names: Sequence[str], sources: Sequence[str]):
+        self.xyxy = np.ascontiguousarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.ascontiguousarray(conf, dtype=np.float32)
+        self.cls = np.ascontiguousarray(cls, dtype=np.int32)
+        self.source = np.ascontiguousarray(source, dtype=np.uint8)
+        self.names = tuple(names)
+        self.sources = tuple(sources)
+
+    @classmethod
+    def empty(cls, names: Names = (), source: str = "") -> "Detections":
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0), np.empty(0), _names_tuple(names),
+                   (source,) if source else ())
+
+    @classmethod
+    def from_boxes(cls, boxes, names: Names, source: str) -> "Detections":
+        """Ultralytics Boxes (또는 data 배열: 앞 4열 xyxy, 끝에서 두 번째 conf, 마지막 cls) 에서 한 번에 변환"""
+        data = _to_numpy(getattr(boxes, "data", boxes))
+        return cls(data[:, :4], data[:, -2], data[:, -1], np.zeros(len(data)), _names_tuple(names), (source,))
+
+    @classmethod
+    def from_results(cls, results: Iterable, names: Names, source: str) -> "Detections":
+        """Ultralytics Results 목록의 박스를 하나로 합침"""
+        parts = [cls.from_boxes(result.boxes, names, source) for result in results]
+        return cls.concat(parts) if parts else cls.empty(names, source)
+
+    @classmethod
+    def from_dicts(cls, detections: Sequence[Dict]) -> "Detections":
+        """기존 dict 형식 감지 결과 목록에서 생성 (벤치마크/호환용)"""
+        names = {}
+        sources = {}
+        for d in detections:
+            names.setdefault(d["class"], len(names))
+            sources.setdefault(d.get("model", ""), len(sources))
+        return cls(np.array([d["bbox"] for d in detections], dtype=np.float32),
+                   [d["confidence"] for d in detections],
+                   [names[d["class"]] for d in detections],
+                   [sources[d.get("model", "")] for d in detections],
+                   tuple(names), tuple(sources))
+
+    @classmethod
+    def concat(cls, parts: Sequence["Detections"]) -> "Detections":
+        """여러 감지 결과를 이어 붙임 (클래스/모델 이름 표를 합치고 번호를 다시 매김)"""
+        if len(parts) == 1:
+            return parts[0]
+        names: Dict[str, int] = {}
+        sources: Dict[str, int] = {}
+        cls_parts, source_parts = [], []
+        for part in parts:
+            cls_map = np.array([names.setdefault(name, len(names)) for name in part.names], dtype=np.int32)
+            source_map = np.array([sources.setdefault(name, len(sources)) for name in part.sources], dtype=np.uint8)
+            cls_parts.append(cls_map[part.cls] if len(part) else part.cls)
+            source_parts.append(source_map[part.source] if len(part) else part.source)
+        return cls(np.concatenate([part.xyxy for part in parts]), np.concatenate([part.conf for part in parts]),
+                   np.concatenate(cls_parts), np.concatenate(source_parts), tuple(names), tuple(sources))
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, index) -> "Detections":
+        """불리언 마스크 또는 인덱스 배열로 부분 선택"""
+        return Detections(self.xyxy[index], self.conf[index], self.cls[index], self.source[index],
+                          self.names, self.sources)
+
+    def class_mask(self, *names: str, ignore_case: bool = False) -> np.ndarray:
+        """클래스 이름이 names 중 하나인 행의 불리언 마스크"""
+        if ignore_case:
+            wanted = {name.lower() for name in names}
+            ids = [i for i, name in enumerate(self.names) if name.lower() in wanted]
+        else:
+            ids = [i for i, name in enumerate(self.names) if name in names]
+        return np.isin(self.cls, ids)
+
+    def with_class(self, mask: np.ndarray, name: str) -> "Detections":
+        """mask 행의 클래스를 name 으로 바꾼 새 결과 (이름 표에 없으면 추가)"""
+        names = self.names if name in self.names else self.names + (name,)
+        cls = self.cls.copy()
+        cls[mask] = names.index(name)
+        return Detections(self.xyxy, self.conf, cls, self.source, names, self.sources)
+
+    def translate(self, dx: float, dy: float) -> "Detections":
+        """박스를 (dx, dy) 만큼 이동한 새 결과 (크롭 좌표 → 원본 이미지 좌표)"""
+        return Detections(self.xyxy + np.array([dx, dy, dx, dy], dtype=np.float32), self.conf, self.cls,
+                          self.source, self.names, self.sources)
+
+    def rounded_xyxy(self) -> np.ndarray:
+        """JSON 과 같은 소수 둘째 자리로 반올림한 float64 박스"""
+        return np.round(self.xyxy.astype(np.float64), 2)
+
+    def rounded_conf(self) -> np.ndarray:
+        """JSON 과 같은 소수 셋째 자리로 반올림한 float64 신뢰도"""
+        return np.round(self.conf.astype(np.float64), 3)
+
+    def class_name(self, index: int) -> str:
+        return self.names[self.cls[index]]
+
+    def record(self, index: int) -> Dict:
+        """한 행을 기존 JSON 형식의 dict 로"""
+        return {
+            "bbox": np.round(self.xyxy[index].astype(np.float64), 2).tolist(),
+            "confidence": float(np.round(np.float64(self.conf[index]), 3)),
+            "class": self.names[self.cls[index]],
+            "model": self.sources[self.source[index]],
+        }
+
+    def to_dicts(self) -> List[Dict]:
+        """기존 JSON 형식의 dict 목록 (bbox 소수 둘째 자리, confidence 셋째 자리)"""
+        bboxes = self.rounded_xyxy().tolist()
+        confidences = self.rounded_conf().tolist()
+        return [
+            {"bbox": bbox, "confidence": confidence, "class": self.names[cls], "model": self.sources[source]}
+            for bbox, confidence, cls, source in zip(bboxes, confidences, self.cls.tolist(), self.source.tolist())
+        ]
+
+    def __repr__(self) -> str:
+        return f"Detections({len(self)}, names={self.names}, sources={self.sources})"
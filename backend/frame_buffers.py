@@ -0,0 +1,45 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def readonly_view(frame: np.ndarray) -> np.ndarray:
+    """복사 없이 쓰기 불가 뷰 반환 (감지 단계가 실수로 원본 프레임을 수정하지 못하도록)"""
+    view = frame.view()
+    view.flags.writeable = False
+    return view
+
+
+class FrameBuffer:
+    """스트림(연결)별로 재사용하는 렌더링 출력 버퍼
+
+    copy_of() 는 프레임 크기/형식이 같으면 이전 버퍼에 내용만 복사하고, 다를 때만 새로 할당한다.
+    반환된 버퍼는 다음 copy_of() 호출 전까지만 유효하므로 프레임을 순서대로 처리하는 스트림에서만 사용한다.
+    """
+
+    def __init__(self):
+        self._buffer: Optional[np.ndarray] = None
+        self.allocations = 0
+        self.reuses = 0
+
+    def copy_of(self, frame: np.ndarray) -> np.ndarray:
+        if self._buffer is None or self._buffer.shape != frame.shape or self._buffer.dtype != frame.dtype:
+            self._buffer = np.empty_like(frame)
+            self.allocations += 1
+        else:
+            self.reuses += 1
+        np.copyto(self._buffer, frame)
+        return self._buffer
+
+    def stats(self) -> Dict:
+        """할당/재사용 횟수와 버퍼 크기"""
+        return {
+            "allocations": self.allocations,
+            "reuses": self.reuses,
+            "bytes": self._buffer.nbytes if self._buffer is not None else 0,
+        }
+
+
+def writable_copy(frame: np.ndarray, buffer: Optional[FrameBuffer] = None) -> np.ndarray:
+    """렌더링용 쓰기 가능한 복사본 (buffer 가 있으면 재사용 버퍼, 없으면 새 배열)"""
+    return buffer.copy_of(frame) if buffer is not None else frame.copy()
@@ -1,27 +1,42 @@
-from ultralytics import YOLO
 import cv2
+import logging
 import numpy as np
 import os
-import base64
 import asyncio
 import time
+from typing import Dict, Optional
+from config import CCTV_STREAM_URL, CCTV_FRAME_INTERVAL, STREAM_SUBSCRIBER_DROP_POLICY, STREAM_MODEL
+from frame_buffers import FrameBuffer, readonly_view, writable_copy
+from inference_executor import inference_executor
+from metrics import stage_seconds
+from model_registry import model_registry
+from roi import RegionOfInterest, detect_in_roi, roi_for
+from stream_hub import StreamHub
+from stream_session import StreamSession
+from ws_protocol import EncodedFrame
+
+logger = logging.getLogger(__name__)
 
 # 결과 저장 디렉토리 생성
 os.makedirs("result", exist_ok=True)
 
-# 모델 및 설정 전역 변수 (성능 향상을 위해)
-model = None
+# 모델 및 설정 전역 변수 (모델은 레지스트리에서 처음 사용할 때 한 번 로드, 참조는 추론 호출 동안만 유지)
+model = model_registry.get(STREAM_MODEL)
 crosswalk_polygon = np.array([[2, 2], [711, 2], [711, 254], [2, 254]], dtype=np.int32)
 target_class_name = "helmet"
 target_class_index = None
+model_ready = False
+# 소스별 렌더링 출력 버퍼 (소스의 프레임은 허브 루프에서 순서대로 처리되므로 재사용 가능)
+stream_buffers: Dict[str, FrameBuffer] = {}
 
-async def process_frame(frame, model, target_class_index, crosswalk_polygon):
-    """단일 프레임 처리 함수"""
-    # 프레임 복사
-    processed_frame = frame.copy()
+def process_frame(frame, model, target_class_index, crosswalk_polygon, roi: Optional[RegionOfInterest] = None,
+                  buffer: Optional[FrameBuffer] = None):
+    """단일 프레임 처리 함수 (감지기는 관심 영역에서만 실행, buffer 가 있으면 재사용 버퍼에 그림)"""
+    # YOLO 추론 (single image, ROI 크롭 후 전체 프레임 좌표로 변환, 원본은 읽기 전용 뷰로 전달)
+    results = detect_in_roi(model, [readonly_view(frame)], roi or roi_for("cctv"))[0]
     
-    # YOLO 추론 (single image)
-    results = model.predict(source=frame, stream=False)[0]
+    # 그리기용 복사본 (감지가 끝난 뒤 한 번만)
+    processed_frame = writable_copy(frame, buffer)
     
     detection_count = 0
     
@@ -47,14 +62,14 @@ async def process_frame(frame, model, target_class_index, crosswalk_polygon):
     
     return processed_frame, detection_count
 
-async def initialize_model():
-    """모델 초기화 함수"""
-    global model, target_class_index
+def load_model():
+    """모델 로드 (프로세스당 한 번, 추론 실행기 워커에서도 호출)"""
+    global target_class_index, model_ready
     
-    if model is None:
+    if not model_ready:
         try:
             # 모델 로드
-            model = YOLO("models/best5.pt")
+            model_registry.load(STREAM_MODEL)
             
             # 타겟 클래스 인덱스 찾기
             for idx, name in model.names.items():
@@ -63,105 +78,96 @@ async def initialize_model():
                     break
                     
             if target_class_index is None:
-                print(f"경고: 클래스 '{target_class_name}'이(가) 모델 클래스에 없습니다.")
+                logger.warning("클래스 '%s'이(가) 모델 클래스에 없습니다.", target_class_name)
+            model_ready = True
         except Exception as e:
-            print(f"모델 로드 오류: {e}")
+            logger.exception("모델 로드 오류: %s", e)
             return False
     
     return True
 
-async def get_stream_frame():
-    """스트리밍 프레임을 가져오는 함수"""
+async def initialize_model():
+    """모델 초기화 함수"""
+    if model_ready:
+        return True
+    return await inference_executor.run(load_model, model="stream")
+
+def render_stream_frame(frame, source: Optional[str] = None) -> bytes:
+    """프레임 감지, 정보 표시 후 JPEG 인코딩 (추론 실행기 워커에서 실행)"""
+    load_model()
+    
+    # 프레임 처리 (소스별 ROI, 없으면 "cctv" 설정)
+    buffer = stream_buffers.get(source)
+    if buffer is None:
+        buffer = stream_buffers[source] = FrameBuffer()
+    processed_frame, detection_count = process_frame(frame, model, target_class_index, crosswalk_polygon,
+                                                     roi_for(source, "cctv"), buffer)
+    
+    # 현재 시간 표시
+    current_time = time.strftime("%Y-%m-%d %H:%M:%S")
+    cv2.putText(processed_frame, current_time, (10, 30), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    
+    # 감지 정보 표시
+    cv2.putText(processed_frame, f"Helmet detected: {detection_count}", (10, 60), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    
+    # 처리된 프레임을 JPEG로 인코딩 (base64 변환은 텍스트 모드 구독자가 있을 때 한 번만 수행)
+    _, buffer = cv2.imencode('.jpg', processed_frame)
+    return buffer.tobytes()
+
+def encode_message_frame(message: str, font_scale: float = 1) -> EncodedFrame:
+    """안내 메시지를 표시한 더미 이미지를 JPEG 로 인코딩"""
+    dummy_img = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(dummy_img, message, (50, 240), 
+               cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 255), 2)
+    _, buffer = cv2.imencode('.jpg', dummy_img)
+    return EncodedFrame(buffer.tobytes(), {"message": message})
+
+def local_video_sources():
+    """스트림을 열 수 없을 때 대체할 로컬 비디오 파일 목록 (result 폴더)"""
+    local_videos = sorted(f for f in os.listdir("result") if f.endswith(('.mp4', '.avi', '.mov')))
+    return [os.path.join("result", f) for f in local_videos[:1]]
+
+async def get_stream_frame(session: StreamSession, last_frame_id: int = 0):
+    """세션의 최신 프레임을 처리하여 (frame_id, 인코딩된 프레임) 반환"""
     # 모델 초기화 확인
     if not await initialize_model():
         # 모델 초기화 실패 시 오류 이미지 반환
-        dummy_img = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(dummy_img, "Model initialization failed", (50, 240), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        _, buffer = cv2.imencode('.jpg', dummy_img)
-        return base64.b64encode(buffer).decode('utf-8')
+        return last_frame_id, encode_message_frame("Model initialization failed")
     
-    # 실시간 스트림 URL
-    stream_url = "https://kbscctv-cache.loomex.net/lowStream/_definst_/9999_low.stream/chunklist.m3u8"
+    # 백그라운드 스레드가 읽어둔 최신 프레임 가져오기
+    frame_id, frame = await asyncio.to_thread(session.read, last_frame_id)
     
-    # 비디오 캡처 객체 생성
-    cap = cv2.VideoCapture(stream_url)
-    
-    # 스트림을 열 수 없는 경우 로컬 비디오 파일 시도
-    if not cap.isOpened():
-        print("스트리밍 URL을 열 수 없습니다. 로컬 비디오 파일로 대체합니다.")
-        
-        # 로컬 비디오 파일 경로 (result 폴더에 있는 파일 사용)
-        local_videos = [f for f in os.listdir("result") if f.endswith(('.mp4', '.avi', '.mov'))]
-        
-        if local_videos:
-            local_video_path = os.path.join("result", local_videos[0])
-            cap = cv2.VideoCapture(local_video_path)
-        
-        # 로컬 비디오도 없는 경우
-        if not cap.isOpened():
-            dummy_img = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(dummy_img, "No video source available", (50, 240), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            _, buffer = cv2.imencode('.jpg', dummy_img)
-            return base64.b64encode(buffer).decode('utf-8')
+    if frame is None:
+        # 프레임을 읽을 수 없는 경우 더미 이미지 반환
+        if session.active_source is None:
+            return last_frame_id, encode_message_frame("No video source available")
+        return last_frame_id, encode_message_frame("No frame available")
     
     try:
-        # 프레임 읽기
-        ret, frame = cap.read()
-        
-        if not ret:
-            # 프레임을 읽을 수 없는 경우 더미 이미지 반환
-            dummy_img = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(dummy_img, "No frame available", (50, 240), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            _, buffer = cv2.imencode('.jpg', dummy_img)
-            return base64.b64encode(buffer).decode('utf-8')
-        
-        # 프레임 처리
-        processed_frame, detection_count = await process_frame(frame, model, target_class_index, crosswalk_polygon)
-        
-        # 현재 시간 표시
-        current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-        cv2.putText(processed_frame, current_time, (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        
-        # 감지 정보 표시
-        cv2.putText(processed_frame, f"Helmet detected: {detection_count}", (10, 60), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        # 감지/렌더링/인코딩은 모델 전용 워커에서 실행
+        with stage_seconds.time(stage="stream_frame"):
+            jpeg = await inference_executor.run(render_stream_frame, frame, session.active_source, model="stream")
         
-        # 처리된 프레임을 JPEG로 인코딩 후 base64로 변환
-        _, buffer = cv2.imencode('.jpg', processed_frame)
-        base64_image = base64.b64encode(buffer).decode('utf-8')
-        
-        return base64_image
+        return frame_id, EncodedFrame(jpeg, {"frame_id": frame_id, "timestamp": time.time()})
     
     except Exception as e:
-        print(f"프레임 처리 오류: {e}")
-        dummy_img = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(dummy_img, f"Error: {str(e)}", (50, 240), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        _, buffer = cv2.imencode('.jpg', dummy_img)
-        return base64.b64encode(buffer).decode('utf-8')
-    
-    finally:
-        # 자원 해제
-        cap.release()
+        logger.warning("프레임 처리 오류: %s", e)
+        return frame_id, encode_message_frame(f"Error: {str(e)}", 0.7)
 
-async def start_streaming_server(websocket):
+# 소스별 단일 캡처/추론 루프를 모든 /ws/cctv 클라이언트가 공유
+cctv_hub = StreamHub(get_stream_frame, CCTV_FRAME_INTERVAL)
+
+async def start_streaming_server(websocket, stream_url: str = CCTV_STREAM_URL,
+                                 drop_policy: str = STREAM_SUBSCRIBER_DROP_POLICY, binary: bool = False):
     """WebSocket을 통한 스트리밍 서버 시작"""
     try:
-        print("CCTV 스트리밍 서버 시작")
-        while True:
-            # 프레임 가져오기
-            base64_frame = await get_stream_frame()
-            
-            # 클라이언트로 전송
-            await websocket.send_text(base64_frame)
-            
-            # 프레임 레이트 조절 (약 5 FPS - 부하 감소)
-            await asyncio.sleep(0.2)
+        logger.info("CCTV 스트리밍 서버 시작")
+        # 스트림을 열 수 없으면 로컬 비디오 파일로 대체
+        await cctv_hub.stream_to(websocket, stream_url, *local_video_sources(),
+                                drop_policy=drop_policy, binary=binary)
     except Exception as e:
-        print(f"스트리밍 오류: {e}")
+        logger.warning("스트리밍 오류: %s", e)
     finally:
-        print("CCTV 스트리밍 서버 종료")
+        logger.info("CCTV 스트리밍 서버 종료")
@@ -1,136 +1,572 @@
-from ultralytics import YOLO
+import base64
 import cv2
 import numpy as np
 import os
+import queue
+import shutil
+import subprocess
 import tempfile
 import asyncio
+import multiprocessing
+import threading
+import time
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
 from fastapi import UploadFile
+from fastapi.responses import JSONResponse
+from config import VIDEO_SAMPLING_MODES, VIDEO_SAMPLING_MODE, VIDEO_INFERENCE_STRIDE, VIDEO_MOTION_THRESHOLD, \
+    VIDEO_MOTION_MAX_GAP, VIDEO_MOTION_SAMPLE_WIDTH, VIDEO_UPLOAD_CHUNK_SIZE, VIDEO_UPLOAD_MAX_BYTES, VIDEO_PIPELINE_QUEUE_SIZE, \
+    VIDEO_UPLOAD_FORM_OVERHEAD, \
+    VIDEO_MODEL, VIDEO_PARALLEL_ENABLED, VIDEO_PARALLEL_WORKERS, VIDEO_SEGMENT_MIN_FRAMES
+from inference_executor import inference_executor
+from model_registry import model_registry
+from roi import RegionOfInterest, detect_in_roi, roi_for
 
 # 결과 저장 디렉토리 생성
 os.makedirs("result", exist_ok=True)
 
-async def process_video(file: UploadFile):
+# (x1, y1, x2, y2, conf, cls)
+Box = Tuple[int, int, int, int, float, int]
+
+# (처리한 프레임 수, 전체 프레임 수)
+ProgressCallback = Callable[[int, int], None]
+
+class VideoProcessingCancelled(Exception):
+    """비디오 처리가 취소됨"""
+
+class VideoUploadTooLarge(Exception):
+    """업로드 크기가 VIDEO_UPLOAD_MAX_BYTES 를 초과함"""
+
+class UploadSizeLimitMiddleware:
+    """지정한 경로의 요청을 Content-Length 로 먼저 검사하여 본문을 받기 전에 413 으로 거절하는 ASGI 미들웨어
+
+    멀티파트 본문은 엔드포인트 호출 전에 Starlette 가 임시 파일로 모두 받아 두므로, 엔드포인트 안의 크기 검사만으로는
+    큰 업로드의 디스크 사용과 전송 시간을 막을 수 없다. Content-Length 가 없는 요청은 save_upload 에서 검사한다.
     """
-    업로드된 비디오 파일을 처리하고 결과를 반환하는 함수
+
+    def __init__(self, app, paths: Tuple[str, ...], max_bytes: int = VIDEO_UPLOAD_MAX_BYTES,
+                 overhead: int = VIDEO_UPLOAD_FORM_OVERHEAD):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + overhead
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            length = dict(scope["headers"]).get(b"content-length", b"")
+            if length.isdigit() and int(length) > self.limit:
+                response = JSONResponse({"detail": f"업로드 크기가 제한({self.max_bytes} 바이트)을 초과합니다."},
+                                        status_code=413)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+def _copy_upload(source, path: str, max_bytes: int, chunk_size: int) -> int:
+    """파일 객체를 chunk_size 단위로 path 에 복사하고 복사한 바이트 수를 반환 (max_bytes 초과 시 VideoUploadTooLarge)"""
+    written = 0
+    with open(path, "wb") as f:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise VideoUploadTooLarge(f"업로드 크기가 제한({max_bytes} 바이트)을 초과합니다.")
+            f.write(chunk)
+    return written
+
+async def save_upload(file: UploadFile, path: str, max_bytes: int = VIDEO_UPLOAD_MAX_BYTES,
+                      chunk_size: int = VIDEO_UPLOAD_CHUNK_SIZE) -> int:
+    """업로드 파일을 chunk_size 단위로 path 에 저장하고 저장한 바이트 수를 반환
+
+    전체 내용을 메모리에 올리지 않으므로 요청당 메모리 사용량은 파일 크기와 관계없이 청크 크기로 제한된다.
+    복사는 이벤트 루프 밖의 스레드에서 하고, 끝나면 Starlette 의 스풀 임시 파일을 바로 닫아 (삭제)
+    비디오 처리 동안 같은 내용이 디스크에 두 벌 남지 않게 한다.
+    max_bytes 를 넘으면 저장하던 파일을 지우고 VideoUploadTooLarge 를 발생시킨다.
+    """
+    try:
+        if file.size is not None and file.size > max_bytes:
+            raise VideoUploadTooLarge(f"업로드 크기가 제한({max_bytes} 바이트)을 초과합니다.")
+        await file.seek(0)
+        return await asyncio.to_thread(_copy_upload, file.file, path, max_bytes, chunk_size)
+    except BaseException:
+        if os.path.exists(path):
+            os.unlink(path)
+        raise
+    finally:
+        await file.close()
+
+def detect_boxes(model, frame: np.ndarray, target_class_index: int, crosswalk_polygon: np.ndarray,
+                 roi: Optional[RegionOfInterest] = None) -> List[Box]:
+    """프레임의 관심 영역(ROI)에서 횡단보도 영역 밖의 타겟 클래스 박스 감지 (박스는 전체 프레임 좌표)"""
+    result = detect_in_roi(model, [frame], roi or roi_for("video"))[0]
+
+    boxes = []
+    for box in result.boxes:
+        cls = int(box.cls[0])
+        conf = float(box.conf[0])
+
+        if cls != target_class_index:
+            continue  # helmet 클래스만 처리
+
+        x1, y1, x2, y2 = map(int, box.xyxy[0])
+        cx = (x1 + x2) // 2
+        cy = (y1 + y2) // 2
+
+        # 중심점이 횡단보도 다각형 영역 안에 있는지 검사
+        inside = cv2.pointPolygonTest(crosswalk_polygon, (cx, cy), False)
+
+        if inside < 0:  # 영역 밖일 때만 표시
+            boxes.append((x1, y1, x2, y2, conf, cls))
+
+    return boxes
+
+def draw_boxes(frame: np.ndarray, boxes: List[Box], names: Dict[int, str]):
+    """감지 박스와 라벨을 프레임에 그림"""
+    for x1, y1, x2, y2, conf, cls in boxes:
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        label = f"{names[cls]} {conf:.2f}"
+        cv2.putText(frame, label, (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+class FrameSampler:
+    """추론할 프레임 선택 (all: 모든 프레임, stride: N 프레임마다, motion: 움직임이 클 때만)"""
+
+    def __init__(self, mode: str = VIDEO_SAMPLING_MODE, stride: int = VIDEO_INFERENCE_STRIDE,
+                 motion_threshold: float = VIDEO_MOTION_THRESHOLD, max_gap: int = VIDEO_MOTION_MAX_GAP):
+        if mode not in VIDEO_SAMPLING_MODES:
+            raise ValueError(f"지원되지 않는 샘플링 모드입니다: {mode}")
+        self.mode = mode
+        self.stride = max(1, stride)
+        self.motion_threshold = motion_threshold
+        self.max_gap = max_gap
+        self._last_inferred_index: Optional[int] = None
+        self._reference: Optional[np.ndarray] = None
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        sample_height = max(1, int(height * VIDEO_MOTION_SAMPLE_WIDTH / width))
+        small = cv2.resize(frame, (VIDEO_MOTION_SAMPLE_WIDTH, sample_height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+
+    def should_infer(self, frame_index: int, frame: np.ndarray) -> bool:
+        if self.mode == "all":
+            infer = True
+        elif self.mode == "stride":
+            infer = frame_index % self.stride == 0
+        else:
+            # 마지막으로 추론한 프레임과의 평균 밝기 차이 (0~1)
+            thumbnail = self._thumbnail(frame)
+            if self._reference is None or frame_index - self._last_inferred_index >= self.max_gap:
+                infer = True
+            else:
+                infer = np.abs(thumbnail - self._reference).mean() / 255 >= self.motion_threshold
+            if infer:
+                self._reference = thumbnail
+
+        if infer:
+            self._last_inferred_index = frame_index
+        return infer
+
+_PIPELINE_END = object()
+
+def _pipeline_put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """중단되지 않았다면 큐가 빌 때까지 기다려 항목 추가"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _pipeline_get(q: queue.Queue, stop: threading.Event):
+    """중단되면 _PIPELINE_END 반환"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _PIPELINE_END
+
+def annotate_video(input_path: str, output_path: str, model, target_class_index: int,
+                   sampler: Optional[FrameSampler] = None, frame_boxes: Optional[List[List[Box]]] = None,
+                   progress: Optional[ProgressCallback] = None, cancel_event: Optional[threading.Event] = None,
+                   start_frame: int = 0, end_frame: Optional[int] = None,
+                   roi: Optional[RegionOfInterest] = None) -> Dict:
+    """디코딩 → 추론 → 주석/인코딩 3단계를 각각의 스레드에서 실행하는 단일 패스 비디오 처리
+
+    단계 사이는 크기가 VIDEO_PIPELINE_QUEUE_SIZE 인 큐로 연결되어 메모리에 쌓이는 프레임 수가 제한된다.
+    샘플링된 프레임만 추론하고, 건너뛴 프레임에는 마지막 박스를 이어서 그린다.
+    frame_boxes 리스트가 주어지면 프레임별로 그린 박스를 추가한다 (샘플링 모드 간 재현율 비교용).
+    progress(처리한 프레임 수, 전체 프레임 수) 는 매 프레임 호출되고, cancel_event 가 설정되면
+    VideoProcessingCancelled 를 발생시킨다. 첫 주석 프레임은 처리 중에 JPEG 썸네일로 저장한다.
+    start_frame/end_frame 을 지정하면 [start_frame, end_frame) 구간만 처리한다 (세그먼트 병렬 처리용).
+    구간의 첫 프레임은 이어 그릴 이전 박스가 없으므로 샘플러와 관계없이 항상 추론한다.
+    감지기는 roi (기본: ROI_SOURCES 의 "video") 영역에서만 실행한다.
+    """
+    sampler = sampler or FrameSampler()
+    roi = roi or roi_for("video")
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise ValueError("비디오 파일을 열 수 없습니다.")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if start_frame:
+        # 이전 키프레임부터 디코딩하여 정확한 프레임 위치로 이동
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    range_frames = (total_frames if end_frame is None else end_frame) - start_frame
+
+    # 횡단보도 영역 (사각형 대신 다각형 정의)
+    # 기본값으로 전체 이미지 영역을 사용하되, 필요에 따라 조정 가능
+    crosswalk_polygon = np.array([[2, 2], [width-2, 2], [width-2, height-2], [2, height-2]], dtype=np.int32)
+
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+
+    decoded: queue.Queue = queue.Queue(maxsize=VIDEO_PIPELINE_QUEUE_SIZE)
+    inferred: queue.Queue = queue.Queue(maxsize=VIDEO_PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    stats = {"processed_frames": 0, "inferred_frames": 0, "detection_count": 0, "thumbnail": None}
+
+    def run_stage(stage: Callable[[], None]):
+        try:
+            stage()
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def decode_stage():
+        frame_index = start_frame
+        while not stop.is_set() and (end_frame is None or frame_index < end_frame):
+            if cancel_event is not None and cancel_event.is_set():
+                stop.set()
+                break
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if not _pipeline_put(decoded, (frame_index, frame), stop):
+                return
+            frame_index += 1
+        _pipeline_put(decoded, _PIPELINE_END, stop)
+
+    def infer_stage():
+        last_boxes: List[Box] = []
+        while True:
+            item = _pipeline_get(decoded, stop)
+            if item is _PIPELINE_END:
+                break
+            frame_index, frame = item
+            if sampler.should_infer(frame_index, frame) or frame_index == start_frame:
+                last_boxes = detect_boxes(model, frame, target_class_index, crosswalk_polygon, roi)
+                stats["inferred_frames"] += 1
+            # 건너뛴 프레임에는 마지막 추론 결과를 그대로 사용
+            if not _pipeline_put(inferred, (frame, last_boxes), stop):
+                return
+        _pipeline_put(inferred, _PIPELINE_END, stop)
+
+    def encode_stage():
+        while True:
+            item = _pipeline_get(inferred, stop)
+            if item is _PIPELINE_END:
+                break
+            frame, boxes = item
+            draw_boxes(frame, boxes, model.names)
+            stats["detection_count"] += len(boxes)
+            if frame_boxes is not None:
+                frame_boxes.append(boxes)
+            if stats["thumbnail"] is None:
+                # 썸네일 (첫 프레임)
+                _, thumbnail_buffer = cv2.imencode('.jpg', frame)
+                stats["thumbnail"] = thumbnail_buffer.tobytes()
+
+            out.write(frame)
+            stats["processed_frames"] += 1
+            if progress is not None:
+                progress(stats["processed_frames"], range_frames)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run_stage, args=(stage,), name=f"video-{stage.__name__}", daemon=True)
+               for stage in (decode_stage, infer_stage, encode_stage)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        stop.set()
+        # 리소스 해제
+        cap.release()
+        out.release()
+
+    if errors:
+        raise errors[0]
+    if cancel_event is not None and cancel_event.is_set():
+        raise VideoProcessingCancelled()
+
+    processing_time = time.perf_counter() - started
+    return {
+        "fps": fps,
+        "total_frames": total_frames,
+        "processed_frames": stats["processed_frames"],
+        "inferred_frames": stats["inferred_frames"],
+        "detection_count": stats["detection_count"],
+        "processing_time": processing_time,
+        "throughput_fps": stats["processed_frames"] / processing_time if processing_time > 0 else 0,
+        "thumbnail": stats["thumbnail"],
+    }
+
+def find_target_class_index(model, target_class_name: str = "helmet") -> int:
+    """클래스 인덱스 탐색 (모델에서 helmet가 몇 번인지 확인)"""
+    for idx, name in model.names.items():
+        if name == target_class_name:
+            return idx
+    raise ValueError(f"클래스 '{target_class_name}'이(가) 모델 클래스에 없습니다.")
+
+# 세그먼트 병렬 처리 프로세스 풀
+_segment_pool: Optional[ProcessPoolExecutor] = None
+_segment_pool_lock = threading.Lock()
+
+def _init_segment_worker():
+    # 워커 프로세스당 한 번 모델 로드
+    model_registry.load(VIDEO_MODEL)
+
+class _CancelFlag:
+    """프로세스 간 취소 신호 (플래그 파일 존재 여부, 세그먼트 워커가 프레임마다 확인)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def is_set(self) -> bool:
+        return os.path.exists(self.path)
+
+    def set(self):
+        open(self.path, "w").close()
+
+def _annotate_segment(input_path: str, output_path: str, start_frame: int, end_frame: int,
+                      sampling: str, stride: int, motion_threshold: float, cancel_path: str) -> Dict:
+    """워커 프로세스에서 한 세그먼트를 처리 (cancel_path 파일이 생기면 중단)"""
+    with model_registry.use(VIDEO_MODEL) as model:
+        target_class_index = find_target_class_index(model, "helmet")
+        sampler = FrameSampler(sampling, stride, motion_threshold)
+        return annotate_video(input_path, output_path, model, target_class_index, sampler,
+                              cancel_event=_CancelFlag(cancel_path), start_frame=start_frame, end_frame=end_frame)
+
+def segment_pool() -> ProcessPoolExecutor:
+    """세그먼트 처리용 프로세스 풀 (처음 사용할 때 생성하여 재사용)"""
+    global _segment_pool
+    with _segment_pool_lock:
+        if _segment_pool is None:
+            # torch 스레드가 있는 프로세스를 fork 하지 않도록 spawn 사용
+            _segment_pool = ProcessPoolExecutor(max_workers=VIDEO_PARALLEL_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"),
+                                                initializer=_init_segment_worker)
+        return _segment_pool
+
+def shutdown_segment_pool():
+    global _segment_pool
+    with _segment_pool_lock:
+        if _segment_pool is not None:
+            _segment_pool.shutdown(wait=False, cancel_futures=True)
+            _segment_pool = None
+
+def plan_segments(input_path: str, workers: int = VIDEO_PARALLEL_WORKERS,
+                  min_frames: int = VIDEO_SEGMENT_MIN_FRAMES, align: int = 1) -> List[Tuple[int, int]]:
+    """비디오를 워커 수 이하의 연속 프레임 구간 [start, end) 으로 분할 (세그먼트당 최소 min_frames)
+
+    구간 시작은 align 의 배수로 맞춘다 (stride 샘플링에서 세그먼트 첫 프레임이 추론 프레임이 되도록).
+    """
+    cap = cv2.VideoCapture(input_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+    cap.release()
+
+    align = max(1, align)
+    count = max(1, min(workers, total_frames // max(1, min_frames)))
+    bounds = sorted({total_frames * i // count // align * align for i in range(count)} | {total_frames})
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+def concat_segments(segment_paths: List[str], output_path: str, fps: float):
+    """주석이 그려진 세그먼트를 순서대로 이어 붙임 (ffmpeg 가 있으면 재인코딩 없이 복사)"""
+    if shutil.which("ffmpeg"):
+        list_path = f"{output_path}.txt"
+        with open(list_path, "w") as f:
+            f.writelines(f"file '{os.path.abspath(path)}'\n" for path in segment_paths)
+        try:
+            subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                            "-i", list_path, "-c", "copy", output_path], check=True)
+        finally:
+            os.unlink(list_path)
+        return
+
+    out = None
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if out is None:
+                    height, width = frame.shape[:2]
+                    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+                out.write(frame)
+            cap.release()
+    finally:
+        if out is not None:
+            out.release()
+
+def annotate_video_parallel(input_path: str, output_path: str, segments: List[Tuple[int, int]],
+                            sampling: str, stride: int, motion_threshold: float,
+                            progress: Optional[ProgressCallback] = None,
+                            cancel_event: Optional[threading.Event] = None) -> Dict:
+    """세그먼트를 워커 프로세스에서 병렬 처리한 뒤 순서대로 이어 붙임 (annotate_video 와 같은 통계 반환)
+
+    progress 는 세그먼트가 끝날 때마다 호출된다. 취소(또는 오류) 시 대기 중인 세그먼트는 취소하고,
+    실행 중인 세그먼트에는 취소 플래그를 보내 끝날 때까지 기다린 뒤 임시 디렉토리를 지운다.
+    stride 샘플링에서는 세그먼트 시작을 stride 에 맞추므로 순차 처리와 같은 프레임을 추론한다.
+    motion 샘플링은 세그먼트마다 기준 프레임을 새로 잡으므로 세그먼트 첫 프레임에서 추론이 추가될 수 있다.
+    """
+    started = time.perf_counter()
+    segment_dir = tempfile.mkdtemp(prefix="segments_", dir="result")
+    segment_paths = [os.path.join(segment_dir, f"segment_{i:04d}.mp4") for i in range(len(segments))]
+    total_frames = segments[-1][1]
+    cancel_flag = _CancelFlag(os.path.join(segment_dir, "cancel"))
+
+    pool = segment_pool()
+    futures = [pool.submit(_annotate_segment, input_path, path, start, end, sampling, stride, motion_threshold,
+                           cancel_flag.path)
+               for path, (start, end) in zip(segment_paths, segments)]
+    try:
+        frames_done = 0
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            if cancel_event is not None and cancel_event.is_set():
+                raise VideoProcessingCancelled()
+            for future in done:
+                frames_done += future.result()["processed_frames"]
+                if progress is not None:
+                    progress(frames_done, total_frames)
+
+        # 세그먼트 결과는 제출 순서(프레임 순서)대로 합산
+        results = [future.result() for future in futures]
+        concat_segments(segment_paths, output_path, results[0]["fps"])
+    except BaseException:
+        # 실행 중인 워커가 세그먼트 파일을 다 쓰고 나갈 때까지 기다린 뒤 정리
+        cancel_flag.set()
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        raise
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+    processing_time = time.perf_counter() - started
+    processed_frames = sum(r["processed_frames"] for r in results)
+    return {
+        "fps": results[0]["fps"],
+        "total_frames": results[0]["total_frames"],
+        "processed_frames": processed_frames,
+        "inferred_frames": sum(r["inferred_frames"] for r in results),
+        "detection_count": sum(r["detection_count"] for r in results),
+        "processing_time": processing_time,
+        "throughput_fps": processed_frames / processing_time if processing_time > 0 else 0,
+        "thumbnail": results[0]["thumbnail"],
+        "segments": len(segments),
+    }
+
+def process_video_file(input_path: str, sampling: str = VIDEO_SAMPLING_MODE, stride: int = VIDEO_INFERENCE_STRIDE,
+                       motion_threshold: float = VIDEO_MOTION_THRESHOLD, progress: Optional[ProgressCallback] = None,
+                       cancel_event: Optional[threading.Event] = None, parallel: bool = VIDEO_PARALLEL_ENABLED) -> Dict:
+    """디스크의 비디오 파일을 처리하고 결과를 반환 (동기, 실행기/작업 워커에서 호출)
+
+    parallel 이면 충분히 긴 비디오를 세그먼트로 나누어 워커 프로세스에서 병렬 처리한다.
     """
     # 고유한 파일명 생성
     unique_id = str(uuid.uuid4())
     output_filename = f"processed_{unique_id}.mp4"
     output_path = os.path.join("result", output_filename)
-    
+
+    sampler = FrameSampler(sampling, stride, motion_threshold)
+    segments = []
+    if parallel and VIDEO_PARALLEL_WORKERS > 1:
+        segments = plan_segments(input_path, align=sampler.stride if sampler.mode == "stride" else 1)
+    try:
+        if len(segments) > 1:
+            stats = annotate_video_parallel(input_path, output_path, segments, sampling, stride, motion_threshold,
+                                            progress=progress, cancel_event=cancel_event)
+        else:
+            # 레지스트리 모델 (프로세스당 한 번 로드)
+            with model_registry.use(VIDEO_MODEL) as model:
+                # 클래스 이름을 문자열로 매핑 (예시: 헬멧을 착용한 사람)
+                target_class_index = find_target_class_index(model, "helmet")
+
+                stats = annotate_video(input_path, output_path, model, target_class_index, sampler,
+                                       progress=progress, cancel_event=cancel_event)
+    except VideoProcessingCancelled:
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        raise
+    fps = stats["fps"]
+    total_frames = stats["total_frames"]
+
+    # 처리 중에 인코딩한 썸네일 (첫 프레임) 저장
+    thumbnail_path = os.path.join("result", f"thumbnail_{unique_id}.jpg")
+    if stats["thumbnail"] is not None:
+        with open(thumbnail_path, "wb") as f:
+            f.write(stats["thumbnail"])
+        thumbnail_base64 = f"data:image/jpeg;base64,{base64.b64encode(stats['thumbnail']).decode('utf-8')}"
+    else:
+        thumbnail_base64 = None
+
+    # 결과 반환
+    return {
+        "success": True,
+        "message": "비디오 처리가 완료되었습니다.",
+        "detection_count": stats["detection_count"],
+        "output_path": output_filename,
+        "thumbnail": thumbnail_base64,
+        "totalFrames": total_frames,
+        "duration": total_frames / fps if fps > 0 else 0,
+        "sampling": sampler.mode,
+        "inferredFrames": stats["inferred_frames"],
+        "processingTime": round(stats["processing_time"], 3),
+        "throughputFps": round(stats["throughput_fps"], 2),
+        "segments": stats.get("segments", 1)
+    }
+
+async def process_video(file: UploadFile, sampling: str = VIDEO_SAMPLING_MODE, stride: int = VIDEO_INFERENCE_STRIDE,
+                        motion_threshold: float = VIDEO_MOTION_THRESHOLD, parallel: bool = VIDEO_PARALLEL_ENABLED):
+    """
+    업로드된 비디오 파일을 처리하고 결과를 반환하는 함수
+    """
     # 임시 파일로 저장
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
     temp_file.close()
-    
+
     try:
-        # 업로드된 파일 내용 읽기
-        content = await file.read()
-        
-        # 임시 파일에 저장
-        with open(temp_file.name, "wb") as f:
-            f.write(content)
-        
-        # 모델 로드
-        model = YOLO("models/best5.pt")
-        
-        # 비디오 설정
-        cap = cv2.VideoCapture(temp_file.name)
-        
-        if not cap.isOpened():
-            raise ValueError("비디오 파일을 열 수 없습니다.")
-        
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        
-        # 클래스 이름을 문자열로 매핑
-        target_class_name = "helmet"  # 예시: 헬멧을 착용한 사람
-        target_class_index = None
-        
-        # 클래스 인덱스 탐색 (모델에서 helmet가 몇 번인지 확인)
-        for idx, name in model.names.items():
-            if name == target_class_name:
-                target_class_index = idx
-                break
-        
-        if target_class_index is None:
-            raise ValueError(f"클래스 '{target_class_name}'이(가) 모델 클래스에 없습니다.")
-        
-        # 횡단보도 영역 (사각형 대신 다각형 정의)
-        # 기본값으로 전체 이미지 영역을 사용하되, 필요에 따라 조정 가능
-        crosswalk_polygon = np.array([[2, 2], [width-2, 2], [width-2, height-2], [2, height-2]], dtype=np.int32)
-        
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-        
-        detection_count = 0
-        
-        # 프레임별 예측
-        for result in model.predict(source=temp_file.name, stream=True):
-            frame = result.orig_img.copy()
-            
-            frame_detections = 0
-            
-            for box in result.boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                
-                if cls != target_class_index:
-                    continue  # helmet 클래스만 처리
-                
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                cx = (x1 + x2) // 2
-                cy = (y1 + y2) // 2
-                
-                # 중심점이 횡단보도 다각형 영역 안에 있는지 검사
-                inside = cv2.pointPolygonTest(crosswalk_polygon, (cx, cy), False)
-                
-                if inside < 0:  # 영역 밖일 때만 표시
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    label = f"{model.names[cls]} {conf:.2f}"
-                    cv2.putText(frame, label, (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                    frame_detections += 1
-            
-            detection_count += frame_detections
-            out.write(frame)
-        
-        # 리소스 해제
-        cap.release()
-        out.release()
-        
-        # 썸네일 생성 (첫 프레임)
-        cap = cv2.VideoCapture(output_path)
-        ret, thumbnail_frame = cap.read()
-        cap.release()
-        
-        thumbnail_path = os.path.join("result", f"thumbnail_{unique_id}.jpg")
-        if ret:
-            cv2.imwrite(thumbnail_path, thumbnail_frame)
-            _, thumbnail_buffer = cv2.imencode('.jpg', thumbnail_frame)
-            thumbnail_base64 = f"data:image/jpeg;base64,{np.array(thumbnail_buffer).tobytes().decode('latin1')}"
-        else:
-            thumbnail_base64 = None
-        
-        # 결과 반환
-        return {
-            "success": True,
-            "message": "비디오 처리가 완료되었습니다.",
-            "detection_count": detection_count,
-            "output_path": output_filename,
-            "thumbnail": thumbnail_base64,
-            "totalFrames": total_frames,
-            "duration": total_frames / fps if fps > 0 else 0
-        }
-        
+        # 업로드된 파일을 청크 단위로 임시 파일에 저장
+        await save_upload(file, temp_file.name)
+
+        # 디코딩/추론/인코딩은 이벤트 루프 밖의 비디오 전용 풀에서 실행 (/detect, /ws 의 공용 풀과 분리)
+        return await inference_executor.run(process_video_file, temp_file.name, sampling, stride,
+                                            motion_threshold, parallel=parallel, model="video")
+
+    except VideoUploadTooLarge:
+        raise
+
     except Exception as e:
         return {
             "success": False,
             "message": f"비디오 처리 중 오류가 발생했습니다: {str(e)}"
         }
-    
+
     finally:
         # 임시 파일 삭제
         if os.path.exists(temp_file.name):
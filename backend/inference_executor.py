@@ -0,0 +1,76 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from config import INFERENCE_EXECUTOR_KIND, INFERENCE_EXECUTOR_WORKERS, INFERENCE_MODEL_WORKERS
+
+
+class InferenceExecutor:
+    """CPU 바운드 파이프라인 단계(디코딩, YOLO 추론, 시각화, 인코딩)를 이벤트 루프 밖에서 실행
+
+    일반 단계는 공용 풀에서 실행하고, 모델을 사용하는 단계는 모델 이름별 전용 풀
+    (워커 어피니티)에서 실행한다. 같은 모델 인스턴스의 추론 호출은 모델 레지스트리의
+    모델별 잠금으로 직렬화되므로 전용 풀 워커가 여러 개여도 안전하고, 프로세스 풀에서는
+    모델이 지정된 워커 프로세스에만 로드된다.
+
+    stateful 호출(연결별 RiderTracker/FrameBuffer 처럼 인자를 제자리에서 갱신하는 단계)은
+    프로세스 풀에서 인자가 복사(pickle)되어 갱신 내용이 사라지므로, 프로세스 모드에서도
+    항상 스레드 풀에서 실행한다.
+    """
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR_KIND, workers: int = INFERENCE_EXECUTOR_WORKERS,
+                 model_workers: Optional[Dict[str, int]] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"지원되지 않는 실행기 종류입니다: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.model_workers = dict(INFERENCE_MODEL_WORKERS if model_workers is None else model_workers)
+        self._pool: Optional[Executor] = None
+        self._model_pools: Dict[str, Executor] = {}
+        self._stateful_pools: Dict[str, Executor] = {}
+
+    def _create_pool(self, workers: int, name: str, kind: Optional[str] = None) -> Executor:
+        if (kind or self.kind) == "process":
+            return ProcessPoolExecutor(max_workers=workers)
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"inference-{name}")
+
+    def executor_for(self, model: Optional[str] = None, stateful: bool = False) -> Executor:
+        """모델 이름에 해당하는 전용 풀 반환 (모델이 없으면 공용 풀, 프로세스 모드의 stateful 호출은 스레드 풀)"""
+        if stateful and self.kind == "process":
+            name = model or "pipeline"
+            pool = self._stateful_pools.get(name)
+            if pool is None:
+                workers = self.model_workers.get(model, 1) if model else self.workers
+                pool = self._stateful_pools[name] = self._create_pool(workers, f"{name}-stateful", "thread")
+            return pool
+        if model is None:
+            if self._pool is None:
+                self._pool = self._create_pool(self.workers, "pipeline")
+            return self._pool
+        pool = self._model_pools.get(model)
+        if pool is None:
+            pool = self._create_pool(self.model_workers.get(model, 1), model)
+            self._model_pools[model] = pool
+        return pool
+
+    async def run(self, fn: Callable, *args, model: Optional[str] = None, stateful: bool = False, **kwargs):
+        """fn(*args, **kwargs) 를 실행기에서 실행하고 결과를 기다림
+
+        stateful 이면 fn 이 인자를 제자리에서 갱신하므로 항상 같은 프로세스(스레드 풀)에서 실행한다.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor_for(model, stateful), functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        """모든 풀 종료"""
+        pools = list(self._model_pools.values()) + list(self._stateful_pools.values())
+        for pool in pools + ([self._pool] if self._pool else []):
+            pool.shutdown(wait=wait)
+        self._model_pools.clear()
+        self._stateful_pools.clear()
+        self._pool = None
+
+
+# 프로세스 전역 실행기
+inference_executor = InferenceExecutor()
@@ -0,0 +1,117 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from config import LABEL_FONT_PATHS, LABEL_FONT_SIZE, LABEL_SPRITE_CACHE_SIZE
+
+Color = Tuple[int, int, int]
+
+
+def load_font(size: int, paths: Sequence[str] = LABEL_FONT_PATHS):
+    """후보 경로 중 처음 열리는 트루타입 글꼴 (없으면 Pillow 기본 글꼴)"""
+    for path in paths:
+        path = os.path.expandvars(path)
+        if os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError:
+                continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow 10.1 미만은 크기 지정 불가
+        return ImageFont.load_default()
+
+
+class LabelRenderer:
+    """NumPy(BGR) 프레임에 박스와 텍스트 라벨을 직접 그리는 렌더러
+
+    글꼴은 크기별로 한 번만 로드하고, 라벨(배경 상자 + 텍스트)은 (텍스트, 색, 크기)별로 한 번 렌더링한
+    스프라이트(BGR + 알파)를 캐시해 두었다가 프레임에 블릿한다. 프레임 전체의 색 변환과 PIL 복사가 없다.
+    """
+
+    def __init__(self, font_paths: Sequence[str] = LABEL_FONT_PATHS, cache_size: int = LABEL_SPRITE_CACHE_SIZE):
+        self.font_paths = tuple(font_paths)
+        self.cache_size = cache_size
+        self._fonts = {}
+        self._sprites: "OrderedDict[Tuple, Tuple[np.ndarray, Optional[np.ndarray]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def font(self, size: int):
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = load_font(size, self.font_paths)
+        return font
+
+    def sprite(self, text: str, background: Optional[Color], foreground: Color = (255, 255, 255),
+               size: int = LABEL_FONT_SIZE) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """라벨 스프라이트 (BGR 패치, 0~1 알파 (H, W, 1) 또는 불투명이면 None)
+
+        background 가 None 이면 배경 없이 텍스트만 (안티앨리어싱 가장자리는 알파로 블렌딩).
+        """
+        key = (text, background, foreground, size)
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                return sprite
+
+        sprite = self._render_sprite(text, background, foreground, size)
+        with self._lock:
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.cache_size:
+                self._sprites.popitem(last=False)
+        return sprite
+
+    def _render_sprite(self, text: str, background: Optional[Color], foreground: Color, size: int):
+        font = self.font(size)
+        left, top, right, bottom = ImageDraw.Draw(Image.new("RGBA", (1, 1))).textbbox((0, 0), text, font=font)
+        # 기존 PIL 렌더링과 같은 배치: 텍스트 너비 × (텍스트 높이 + 5) 상자, 텍스트는 (0, 0) 기준
+        width, height = max(right - left, 1), bottom - top + 5
+        fill = (0, 0, 0, 0) if background is None else background[::-1] + (255,)
+        image = Image.new("RGBA", (width, height), fill)
+        ImageDraw.Draw(image).text((0, 0), text, font=font, fill=foreground[::-1] + (255,))
+        rgba = np.asarray(image)
+        bgr = np.ascontiguousarray(rgba[:, :, 2::-1])
+        alpha = rgba[:, :, 3:]
+        if alpha.min() == 255:
+            return bgr, None
+        return bgr, alpha.astype(np.float32) / 255
+
+    def draw_label(self, img: np.ndarray, text: str, anchor: Tuple[int, int], background: Optional[Color],
+                   foreground: Color = (255, 255, 255), size: int = LABEL_FONT_SIZE):
+        """anchor (x, y) 를 라벨 상자의 왼쪽 아래로 하여 제자리에서 블릿 (프레임 밖은 잘림)"""
+        patch, alpha = self.sprite(text, background, foreground, size)
+        x, y = anchor[0], anchor[1] - patch.shape[0]
+        height, width = img.shape[:2]
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + patch.shape[1], width), min(y + patch.shape[0], height)
+        if x1 >= x2 or y1 >= y2:
+            return
+        region = img[y1:y2, x1:x2]
+        src = patch[y1 - y:y2 - y, x1 - x:x2 - x]
+        if alpha is None:
+            region[:] = src
+        else:
+            a = alpha[y1 - y:y2 - y, x1 - x:x2 - x]
+            region[:] = (src * a + region * (1 - a)).astype(np.uint8)
+
+    @staticmethod
+    def draw_box(img: np.ndarray, xyxy: Sequence[int], color: Color, thickness: int):
+        """박스 테두리를 상자 안쪽으로 그림 (PIL rectangle(width=...) 과 같은 배치)"""
+        x1, y1, x2, y2 = xyxy
+        inset = thickness // 2
+        cv2.rectangle(img, (x1 + inset, y1 + inset), (x2 - inset, y2 - inset), color, thickness)
+
+    def cache_info(self) -> dict:
+        """캐시된 스프라이트 수와 로드된 글꼴 크기"""
+        return {"sprites": len(self._sprites), "fonts": sorted(self._fonts)}
+
+
+# 프로세스 전역 렌더러
+label_renderer = LabelRenderer()
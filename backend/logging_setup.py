@@ -0,0 +1,157 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import LOG_DEBUG_RATE, LOG_FORMAT, LOG_LEVEL, LOG_LEVELS, LOG_QUEUE_SIZE, LOG_THROTTLE_INTERVAL
+
+# LogRecord 기본 속성 (나머지는 extra 로 전달된 구조화 필드)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_exception_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 로그 (시각, 레벨, 로거, 메시지, extra 필드, 예외)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """DEBUG 레코드를 호출 위치(로거, 파일, 줄)별로 초당 rate 개까지만 통과 (프레임별 로그 샘플링)
+
+    버려진 레코드 수는 다음에 통과하는 같은 위치 레코드의 suppressed 필드로 기록한다.
+    """
+
+    def __init__(self, rate: float = LOG_DEBUG_RATE):
+        super().__init__()
+        self.rate = rate
+        # 호출 위치 -> (남은 토큰, 마지막 갱신 시각, 버려진 수)
+        self._buckets: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate <= 0:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.rate, now, 0]
+            bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class LogThrottle:
+    """프레임마다 반복될 수 있는 INFO/WARNING 로그를 키별로 interval 초에 한 번만 기록
+
+    사이에 생략된 횟수는 다음 기록의 suppressed 필드로 남긴다 (DEBUG 는 DebugRateLimitFilter 가 처리).
+    """
+
+    def __init__(self, interval: float = LOG_THROTTLE_INTERVAL):
+        self.interval = interval
+        # 키 -> [마지막 기록 시각, 생략된 수]
+        self._last: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def log(self, logger: logging.Logger, level: int, key: str, msg: str, *args):
+        if not logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            state = self._last.get(key)
+            if state is not None and now - state[0] < self.interval:
+                state[1] += 1
+                return
+            suppressed = state[1] if state is not None else 0
+            self._last[key] = [now, 0]
+        logger.log(level, msg, *args, extra={"suppressed": suppressed} if suppressed else None, stacklevel=2)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 큐 핸들러"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자와 예외를 문자열로 바꿔 큐에 넣음 (포맷은 리스너 스레드에서, 예외는 메시지와 분리)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: str = LOG_LEVEL, levels: Dict[str, str] = LOG_LEVELS, fmt: str = LOG_FORMAT):
+    """루트 로거를 비차단 큐 핸들러로 구성 (stderr 출력은 QueueListener 스레드에서 수행, 여러 번 호출해도 한 번만 구성)
+
+    levels 는 로거 이름(모듈)별 레벨이다. 큐가 가득 차면 레코드를 버려 요청 처리 스레드가 막히지 않는다.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    queue_handler = _DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    queue_handler.addFilter(DebugRateLimitFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """대기 중인 레코드를 모두 출력하고 리스너 스레드 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
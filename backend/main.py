@@ -2,18 +2,40 @@ from fastapi import FastAPI, UploadFile, File, WebSocket, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import cv2
 import numpy as np
-from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
+from ultralytics.utils.ops import scale_boxes
 import json
+import logging
 from typing import List, Dict, Tuple, Optional
 import base64
 from datetime import datetime
 import asyncio
 from config import *
-from gpt_video import process_video
-from gpt_streaming import start_streaming_server
+from gpt_video import process_video, save_upload, shutdown_segment_pool, UploadSizeLimitMiddleware, VideoUploadTooLarge
+from video_jobs import VideoJobManager, COMPLETED
+from gpt_streaming import cctv_hub, start_streaming_server
+from detections import Detections
+from pairing import rider_motorcycle_pairing
+from frame_buffers import FrameBuffer, readonly_view, writable_copy
+from inference_executor import inference_executor
+from label_renderer import label_renderer
+from micro_batcher import MicroBatcher
+from metrics import StageTimer, observe_stages, queue_depth, registry as metrics_registry, requests_total, stream_fps, \
+    stream_subscribers
+from result_cache import ResultCache
+from model_registry import model_registry
+from roi import detect_in_roi, roi_for
+from rider_tracker import RiderTracker
+from ws_protocol import BINARY_SUBPROTOCOL, negotiate_subprotocol, pack_message, parse_flag, unpack_message, \
+    unpack_text_message
 import os
-from fastapi.responses import FileResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
+from logging_setup import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=API_TITLE,
@@ -21,6 +43,9 @@ app = FastAPI(
     version=API_VERSION
 )
 
+# 비디오 업로드는 본문을 받기 전에 Content-Length 로 크기 제한 확인 (CORS 보다 안쪽이라 413 에도 CORS 헤더가 붙음)
+app.add_middleware(UploadSizeLimitMiddleware, paths=("/process-video", "/jobs/video"))
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -30,125 +55,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 모델 로드
-try:
-    yolo_world_model = YOLO(YOLO_WORLD_MODEL_PATH)
-    yolov11n_model = YOLO(YOLOV11N_MODEL_PATH)
-    helmet_model = YOLO(HELMET_MODEL_PATH)
-except Exception as e:
-    print(f"Error loading models: {e}")
-    # 모델 로드 실패 시 기본 모델 사용
-    yolo_world_model = YOLO("models/yolov8s-world.pt")
-    yolov11n_model = YOLO("models/yolo11n.pt")
-    helmet_model = YOLO("models/helmet_model.pt")
-
-def rider_motorcycle_pairing(detections: List[Dict]) -> List[Dict]:
-    """라이더와 오토바이 페어링 처리"""
-    print(f"라이더-오토바이 페어링， {len(detections)} ")
-
-    # 모델이 인식한 모든 클래스를 출력
-    classes = [d["class"] for d in detections]
-    unique_classes = set(classes)
-    print(f"CLASSES: {unique_classes}")
-    print(f"CLASSES COUNT: {[(cls, classes.count(cls)) for cls in unique_classes]}")
-    
-    riders = [d for d in detections if d["class"] == "person"]
-    motorcycles = [d for d in detections if d["class"] == "motorcycle"]
-    
-    print(f"라이더: {len(riders)}  오토바이: {len(motorcycles)}")
-    
-    # 라이더가 없으면 다른 클래스를 사용하여 찾음
-    if len(riders) == 0:
-        possible_rider_classes = ["person", "rider", "human", "pedestrian"]
-        for cls in possible_rider_classes:
-            riders = [d for d in detections if d["class"].lower() == cls.lower()]
-            if len(riders) > 0:
-                print(f"라이더 클래스 '{cls}'로 찾은 {len(riders)}")
-                break
-    
-    if len(motorcycles) == 0:
-        possible_moto_classes = ["motorcycle", "motorbike", "bike", "motor"]
-        for cls in possible_moto_classes:
-            motorcycles = [d for d in detections if d["class"].lower() == cls.lower()]
-            if len(motorcycles) > 0:
-                print(f"오토바이 클래스 '{cls}'로 찾은 {len(motorcycles)}")
-                break
-    
-    # 멀리있는 오토바이를 위한 임계값 조정
-    for moto_idx, motorcycle in enumerate(motorcycles):
-        moto_width = motorcycle["bbox"][2] - motorcycle["bbox"][0]
-        moto_height = motorcycle["bbox"][3] - motorcycle["bbox"][1]
-        
-        #  멀리있는 작은 오토바이를 위한 임계값 조정
-        size_factor = 1.0
-        if max(moto_width, moto_height) < 100:  # 100픽셀 미만은 멀리있는 작은 오토바이로 판단
-            size_factor = 1.5  # 멀리있는 작은 오토바이를 위한 임계값 조정
-            print(f"   멀리있는 작은 오토바이 임계값 조정: 사이즈={moto_width:.1f}x{moto_height:.1f}, 계수={size_factor}")
-        
-        moto_threshold = RIDER_MOTORCYCLE_PAIRING_THRESHOLD * max(moto_width, moto_height) * size_factor
-    
-    pairs = []
-    paired_rider_indices = set()  # 이미 페어링된 라이더 인덱스 추적
-    
-    # 1단계: 각 오토바이에 대해 근처의 모든 라이더를 찾되, 각 라이더는 한 대의 오토바이에만 할당
-    for moto_idx, motorcycle in enumerate(motorcycles):
-        moto_center_x = (motorcycle["bbox"][0] + motorcycle["bbox"][2]) / 2
-        moto_center_y = (motorcycle["bbox"][1] + motorcycle["bbox"][3]) / 2
-        
-        moto_width = motorcycle["bbox"][2] - motorcycle["bbox"][0]
-        moto_height = motorcycle["bbox"][3] - motorcycle["bbox"][1]
-        moto_threshold = RIDER_MOTORCYCLE_PAIRING_THRESHOLD * max(moto_width, moto_height)
-        
-        # 이 오토바이와 페어링 가능한 라이더들
-        potential_riders = []
-        
-        # 모든 라이더에 대해 거리 계산
-        for rider_idx, rider in enumerate(riders):
-            # 이미 페어링된 라이더는 건너뜀
-            if rider_idx in paired_rider_indices:
-                continue
-                
-            rider_center_x = (rider["bbox"][0] + rider["bbox"][2]) / 2
-            rider_center_y = (rider["bbox"][1] + rider["bbox"][3]) / 2
-            
-            # 유클리드 거리 계산
-            distance = ((rider_center_x - moto_center_x) ** 2 + (rider_center_y - moto_center_y) ** 2) ** 0.5
-            
-            # 거리가 임계값보다 작으면 잠재적 페어링 대상
-            if distance < moto_threshold:
-                confidence = 1.0 - (distance / moto_width) if moto_width > 0 else 0.5
-                potential_riders.append({
-                    "rider_idx": rider_idx,
-                    "rider": rider,
-                    "distance": distance,
-                    "confidence": confidence
-                })
-        
-        # 거리순으로 정렬 (가까운 순)
-        potential_riders.sort(key=lambda x: x["distance"])
-        
-        # 페어링 처리 (한 오토바이에 여러 라이더 가능)
-        for rider_data in potential_riders:
-            rider_idx = rider_data["rider_idx"]
-            rider = rider_data["rider"]
-            distance = rider_data["distance"]
-            confidence = rider_data["confidence"]
-            
-            # 페어 생성
-            pair = {
-                "rider": rider,
-                "motorcycle": motorcycle,
-                "confidence": round(confidence, 3),
-                "distance": round(distance, 3)
-            }
-            pairs.append(pair)
-            
-            # 이 라이더는 이제 다른 오토바이와 페어링 불가
-            paired_rider_indices.add(rider_idx)
-            
-            print(f"오토바이 {moto_idx}와 라이더 페어링: 거리={distance:.3f}, 신뢰도={confidence:.3f}")
-    
-    return pairs
+# 모델 핸들 (레지스트리에서 처음 사용할 때 한 번 로드, 시작 시 MODEL_WARMUP 모델은 미리 로드)
+# 참조는 추론 호출 동안만 잡으므로 쉬는 동안에는 DELETE /models/{name} 으로 해제 가능
+yolov11n_model = model_registry.get("yolov11n")
+helmet_model = model_registry.get("helmet")
 
 def rider_crop(img: np.ndarray, rider: Dict) -> Tuple[np.ndarray, List[int]]:
     """라이더 부분만 크롭"""
@@ -169,17 +79,80 @@ def rider_crop(img: np.ndarray, rider: Dict) -> Tuple[np.ndarray, List[int]]:
     
     return cropped_img, crop_coords
 
-def helmet_result_aggregation(helmet_detections: List[Dict]) -> Dict:
+def helmet_letterbox() -> LetterBox:
+    """헬멧 모델 predictor 의 pre_transform 과 같은 설정(imgsz, rect, stride)의 Ultralytics LetterBox"""
+    backend = getattr(getattr(helmet_model, "predictor", None), "model", None)
+    if backend is None:
+        # 아직 predictor 가 없으면 torch/dynamic 내보내기와 같은 rect 레터박스
+        return LetterBox(HELMET_BATCH_IMGSZ, auto=True, stride=32)
+    backend_format = getattr(backend, "format", "pt" if getattr(backend, "pt", False) else "")
+    rect = backend_format == "pt" or (getattr(backend, "dynamic", False) and backend_format != "imx")
+    return LetterBox(HELMET_BATCH_IMGSZ, auto=rect, stride=int(backend.stride))
+
+def helmet_inference(crops: List[np.ndarray]) -> List[Detections]:
+    """라이더 크롭을 헬멧 모델에 통과시켜 크롭별 감지 결과 반환 (크롭 좌표계)"""
+    if not crops:
+        return []
+    
+    if not HELMET_BATCH_INFERENCE:
+        # 크롭별 개별 추론
+        return [Detections.from_results(helmet_model(crop, imgsz=HELMET_BATCH_IMGSZ), helmet_model.names, "helmet_model")
+                for crop in crops]
+    
+    # 개별 추론과 같은 rect 레터박스를 미리 적용하고, 레터박스 결과 크기가 같은 크롭끼리 배치로 추론
+    # (같은 크기 입력에는 Ultralytics 전처리가 다시 적용되어도 그대로라 개별 추론과 같은 텐서가 들어감)
+    letterbox = helmet_letterbox()
+    boxed_crops = [letterbox(image=crop) for crop in crops]
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for index, boxed in enumerate(boxed_crops):
+        groups.setdefault(boxed.shape, []).append(index)
+    
+    crop_boxes: List[Optional[Detections]] = [None] * len(crops)
+    for indices in groups.values():
+        for start in range(0, len(indices), HELMET_BATCH_MAX_SIZE):
+            chunk = indices[start:start + HELMET_BATCH_MAX_SIZE]
+            batch_results = helmet_model([boxed_crops[i] for i in chunk], imgsz=HELMET_BATCH_IMGSZ)
+            
+            for index, result in zip(chunk, batch_results):
+                boxes = Detections.from_boxes(result.boxes, helmet_model.names, "helmet_model")
+                # 레터박스 좌표 → 크롭 좌표 (개별 추론의 후처리와 같은 scale_boxes, 클리핑 포함)
+                scale_boxes(boxed_crops[index].shape[:2], boxes.xyxy, crops[index].shape[:2])
+                crop_boxes[index] = boxes
+    
+    return crop_boxes
+
+def helmet_detections_from_boxes(boxes: Detections, crop_coords: List[int], crop_height: int, is_distant: bool) -> Detections:
+    """크롭 좌표계의 헬멧 모델 박스를 원본 이미지 좌표의 감지 결과로 변환"""
+    # 멀리있는 물체에는 더 낮은 신뢰도 임계값 사용
+    helmet_threshold = CONFIDENCE_THRESHOLD * (0.7 if is_distant else 1.0)
+    # 신뢰도 임계값 조정 (헬멧 감지 향상)
+    helmet_confidence_threshold = CONFIDENCE_THRESHOLD * 0.85
+    
+    # 멀리있는 물체 특수 처리: 크롭 상단 30% 영역의 item 은 헬멧일 가능성이 높음
+    if is_distant:
+        rel_y_pos = boxes.xyxy[:, 1] / max(crop_height, 1)
+        reclassify = boxes.class_mask("item") & (boxes.conf > helmet_threshold) & (rel_y_pos < 0.3)
+        if reclassify.any():
+            boxes = boxes.with_class(reclassify, "helmet")
+            logger.debug("멀리있는 물체 재분류: item -> helmet, 위치=%s", np.round(rel_y_pos[reclassify], 2).tolist())
+    
+    # 신뢰도 필터 후 원본 이미지 좌표로 변환
+    return boxes[boxes.conf > helmet_confidence_threshold].translate(crop_coords[0], crop_coords[1])
+
+def helmet_result_aggregation(helmet_detections: Detections) -> Dict:
     """헬멧 감지 결과 집계"""
-    helmets = [d for d in helmet_detections if d["class"] == "helmet"]
-    no_helmets = [d for d in helmet_detections if d["class"] == "no_helmet"]
-    items = [d for d in helmet_detections if d["class"] == "item"]
+    helmets = helmet_detections.class_mask("helmet")
+    no_helmets = helmet_detections.class_mask("no_helmet")
+    items = helmet_detections.class_mask("item")
     
-    print(f"      감지된 객체: {[d['class'] for d in helmet_detections]}")
-    print(f"      헬멧 객체 수: {len(helmets)}, 노헬멧 객체 수: {len(no_helmets)}")
+    logger.debug("헬멧 집계: 감지 %d개 (헬멧 %d, 노헬멧 %d, 아이템 %d)",
+                 len(helmet_detections), helmets.sum(), no_helmets.sum(), items.sum())
     
-    max_helmet_conf = max([h["confidence"] for h in helmets]) if helmets else 0
-    max_no_helmet_conf = max([nh["confidence"] for nh in no_helmets]) if no_helmets else 0
+    # 응답 JSON 과 같은 반올림 값으로 판단
+    confidences = helmet_detections.rounded_conf()
+    bboxes = helmet_detections.rounded_xyxy()
+    max_helmet_conf = float(confidences[helmets].max()) if helmets.any() else 0
+    max_no_helmet_conf = float(confidences[no_helmets].max()) if no_helmets.any() else 0
     
     # 결과 판단
     has_helmet = max_helmet_conf > HELMET_RESULT_AGGREGATION_THRESHOLD
@@ -189,16 +162,16 @@ def helmet_result_aggregation(helmet_detections: List[Dict]) -> Dict:
     item_on_head = False
     helmet_like_item = None
     
-    if items and not (has_helmet or no_helmet_detected):
+    if items.any() and not (has_helmet or no_helmet_detected):
         # 아이템 중 가장 높은 신뢰도를 가진 것을 선택
-        items_sorted = sorted(items, key=lambda x: x["confidence"], reverse=True)
+        item_indices = np.flatnonzero(items)
+        items_sorted = item_indices[np.argsort(-confidences[item_indices], kind="stable")]
         
         for item in items_sorted:
             # 물체의 위치와 비율 특성을 계산
-            item_y1 = item["bbox"][1]
-            item_y2 = item["bbox"][3]
+            item_x1, item_y1, item_x2, item_y2 = bboxes[item].tolist()
             item_height = item_y2 - item_y1
-            item_width = item["bbox"][2] - item["bbox"][0]
+            item_width = item_x2 - item_x1
             
             # 헬멧 형태 분석을 위한 추가 지표
             aspect_ratio = item_width / item_height if item_height > 0 else 0
@@ -208,7 +181,8 @@ def helmet_result_aggregation(helmet_detections: List[Dict]) -> Dict:
             # 멀리있는 작은 물체를 판단
             is_distant = item_height < 40
             
-            print(f"      아이템 분석: 높이={item_height:.1f}, 비율={aspect_ratio:.2f}, 상대위치={relative_y_pos:.2f}, 면적={area:.1f}")
+            logger.debug("아이템 분석: 높이=%.1f, 비율=%.2f, 상대위치=%.2f, 면적=%.1f",
+                         item_height, aspect_ratio, relative_y_pos, area)
             
             # 헬멧 형태 분석 - 매우 엄격한 기준 적용
             # 상대 위치가 0.3 미만이어야 함 (상단 30% 이내)
@@ -222,28 +196,29 @@ def helmet_result_aggregation(helmet_detections: List[Dict]) -> Dict:
                     # 헬멧의 최소 크기 요구사항
                     (item_height > 35 or is_distant) and
                     # 신뢰도 요구사항
-                    item["confidence"] > 0.65
+                    confidences[item] > 0.65
                 )
                 
                 if is_helmet_shaped:
                     item_on_head = True
                     helmet_like_item = item
-                    print(f"      헬멧 가능성 높음: 높이={item_height:.1f}, 비율={aspect_ratio:.2f}, 상대위치={relative_y_pos:.2f}")
+                    logger.debug("헬멧 가능성 높음: 높이=%.1f, 비율=%.2f, 상대위치=%.2f",
+                                 item_height, aspect_ratio, relative_y_pos)
                     break
                 else:
-                    print(f"      헬멧 형태 불충분: 비율={aspect_ratio:.2f}, 면적={area:.1f}")
+                    logger.debug("헬멧 형태 불충분: 비율=%.2f, 면적=%.1f", aspect_ratio, area)
             else:
-                print(f"      위치 부적합: 상대위치={relative_y_pos:.2f} (0.3 미만이어야 함)")
+                logger.debug("위치 부적합: 상대위치=%.2f (0.3 미만이어야 함)", relative_y_pos)
     
     # 향상된 판단 로직
-    if len(helmet_detections) > 0 and len(helmets) == 0 and len(no_helmets) == 0:
-        if item_on_head and helmet_like_item:
+    if len(helmet_detections) > 0 and not helmets.any() and not no_helmets.any():
+        if item_on_head and helmet_like_item is not None:
             # 헬멧 형태와 높은 신뢰도를 가진 아이템만 헬멧으로 인정
-            print("      헬멧 가능성: 헬멧 형태의 물체가 머리 위에 위치")
+            logger.debug("헬멧 가능성: 헬멧 형태의 물체가 머리 위에 위치")
             status = "helmet"
             message = "안전: 헬멧을 착용한 오토바이 운전자가 감지되었습니다."
         else:
-            print("      헬멧으로 인정되지 않는 물체 감지 -> 미착용으로 처리")
+            logger.debug("헬멧으로 인정되지 않는 물체 감지 -> 미착용으로 처리")
             status = "no_helmet"
             message = "경고: 헬멧을 착용하지 않은 오토바이 운전자가 감지되었습니다!"
     elif has_helmet:
@@ -265,35 +240,10 @@ def helmet_result_aggregation(helmet_detections: List[Dict]) -> Dict:
         "detections": helmet_detections
     }
 
-def helmet_label_visualization(img: np.ndarray, results: Dict) -> np.ndarray:
-    """감지 결과 시각화"""
-    img_copy = img.copy()
+def helmet_label_visualization(img: np.ndarray, results: Dict, buffer: Optional[FrameBuffer] = None) -> np.ndarray:
+    """감지 결과 시각화 (박스와 캐시된 라벨 스프라이트를 프레임에 직접 그림, buffer 가 있으면 재사용 버퍼에 그림)"""
+    img_copy = writable_copy(img, buffer)
     
-    # PIL 변환을 통한 한글 텍스트 처리
-    from PIL import Image, ImageDraw, ImageFont
-    import os
-    
-    # OpenCV BGR → RGB 변환
-    img_rgb = cv2.cvtColor(img_copy, cv2.COLOR_BGR2RGB)
-    pil_img = Image.fromarray(img_rgb)
-    draw = ImageDraw.Draw(pil_img)
-    
-    # 글꼴 설정
-    try:
-        font_path = os.path.join(os.environ['WINDIR'], 'Fonts', 'malgun.ttf')
-        if not os.path.exists(font_path):
-            font_path = os.path.join(os.environ['WINDIR'], 'Fonts', 'gulim.ttc')
-        
-        label_font = ImageFont.truetype(font_path, 20)
-        warning_font = ImageFont.truetype(font_path, 16)  # 경고 글꼴 크기 축소
-        header_font = ImageFont.truetype(font_path, 28)
-    except Exception as e:
-        print(f"폰트 로드 오류: {e}")
-        label_font = ImageFont.load_default()
-        warning_font = ImageFont.load_default()
-        header_font = ImageFont.load_default()
-    
-        
     # 헬멧 착용/미착용 라이더 표시
     for pair in results.get("rider_pairs", []):
         helmet_result = pair.get("helmet_result", {})
@@ -303,166 +253,160 @@ def helmet_label_visualization(img: np.ndarray, results: Dict) -> np.ndarray:
         x1, y1, x2, y2 = map(int, rider["bbox"])
         
         if status in ["no_helmet", "helmet_not_worn"]:
-            # 미착용 라이더 - 빨간색 테두리
-            draw.rectangle([(x1, y1), (x2, y2)], outline=(255, 0, 0), width=LABEL_THICKNESS * 2)
-            
-            warning_text = "no-helmet"
-            text_color = (255, 0, 0)  # 빨간색
-            
-            text_bbox = draw.textbbox((0, 0), warning_text, font=warning_font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-            
-            draw.rectangle([(x1, y1 - text_height - 5), (x1 + text_width, y1)], fill=text_color)
-            draw.text((x1, y1 - text_height - 5), warning_text, font=warning_font, fill=(255, 255, 255))
+            # 미착용 라이더 - 빨간색 테두리와 라벨
+            label_renderer.draw_box(img_copy, (x1, y1, x2, y2), (0, 0, 255), LABEL_THICKNESS * 2)
+            label_renderer.draw_label(img_copy, "no-helmet", (x1, y1), (0, 0, 255))
             
         elif status == "helmet":
-            # 착용 라이더 - 녹색 테두리
-            draw.rectangle([(x1, y1), (x2, y2)], outline=(0, 255, 0), width=LABEL_THICKNESS * 2)
-            
-            safety_text = "helmet"
-            text_color = (0, 155, 0)  # 녹색
-            
-            text_bbox = draw.textbbox((0, 0), safety_text, font=warning_font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-            
-            draw.rectangle([(x1, y1 - text_height - 5), (x1 + text_width, y1)], fill=text_color)
-            draw.text((x1, y1 - text_height - 5), safety_text, font=warning_font, fill=(255, 255, 255))
+            # 착용 라이더 - 녹색 테두리와 라벨
+            label_renderer.draw_box(img_copy, (x1, y1, x2, y2), (0, 255, 0), LABEL_THICKNESS * 2)
+            label_renderer.draw_label(img_copy, "helmet", (x1, y1), (0, 155, 0))
+    
+    return img_copy
+
+def detect_first_stage(imgs: List[np.ndarray]) -> List:
+    """YOLO11n 모델로 여러 이미지를 한 번의 배치로 감지하여 이미지별 결과 반환
+
+    ROI_SOURCES 의 "upload" 설정이 있으면 관심 영역만 지정한 입력 크기로 감지하고 박스는 전체 이미지 좌표로 변환한다.
+    """
+    return detect_in_roi(yolov11n_model, imgs, roi_for("upload"))
+
+def helmet_box_visualization(img: np.ndarray, results: Dict, buffer: Optional[FrameBuffer] = None) -> np.ndarray:
+    """라이더 박스만 시각화 (PIL 텍스트 렌더링 없이 OpenCV 로 직접 그림, buffer 가 있으면 재사용 버퍼에 그림)"""
+    img_copy = writable_copy(img, buffer)
     
-    # PIL 이미지를 OpenCV 형식으로 변환
-    img_copy = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+    for pair in results.get("rider_pairs", []):
+        status = pair.get("helmet_result", {}).get("status", "")
+        x1, y1, x2, y2 = map(int, pair.get("rider", {})["bbox"])
+        
+        if status in ["no_helmet", "helmet_not_worn"]:
+            cv2.rectangle(img_copy, (x1, y1), (x2, y2), (0, 0, 255), LABEL_THICKNESS * 2)
+        elif status == "helmet":
+            cv2.rectangle(img_copy, (x1, y1), (x2, y2), (0, 255, 0), LABEL_THICKNESS * 2)
     
     return img_copy
 
-def process_detection(img: np.ndarray) -> Dict:
-    """이미지 감지 처리 및 결과 반환"""
-    # 1. 입력 이미지 처리
-    print("1. 이미지 처리")
-    input_img = img.copy()
+def process_detection(img: np.ndarray, first_stage_result=None, render: str = DEFAULT_RENDER_MODE,
+                      tracker: Optional[RiderTracker] = None, frame_buffer: Optional[FrameBuffer] = None) -> Dict:
+    """이미지 감지 처리 및 결과 반환
+
+    first_stage_result 가 주어지면 (마이크로 배치 등에서 미리 계산된 YOLO11n 결과)
+    초기 감지를 건너뛴다. render 가 "none" 이면 시각화를 생략하고 visualized_img 는 None,
+    "boxes" 이면 라벨 텍스트 없이 박스만 그린다. tracker 가 주어지면 (스트림별 RiderTracker)
+    라이더에 트랙 ID 를 부여하고 최근 헬멧 판정을 재사용한다.
+    감지 단계는 입력의 읽기 전용 뷰를 사용하고, 시각화할 때만 복사한다 (frame_buffer 가 있으면
+    연결별 재사용 버퍼에 복사하며, 반환된 visualized_img 는 다음 프레임 처리 전까지만 유효).
+    결과의 stage_seconds 는 단계별 소요 시간(초)이다.
+    """
+    timer = StageTimer()
+    
+    # 1. 입력 이미지 처리 (복사 없이 읽기 전용 뷰)
+    input_img = readonly_view(img)
     
     # 2. YOLO11n모델로 초기 감지 (只使用yolo11n模型)
-    print("2. YOLO11n 모델로 초기 감지")
-    yolov11n_results = yolov11n_model(input_img)
-    print(f"   YOLO11n 결과: {len(yolov11n_results)}")
-    
-    # 결과 통합
-    all_detections = []
-    
-    # YOLOv11n 결과 처리
-    print("   YOLOv11n 결과 처리")
-    for result in yolov11n_results:
-        boxes = result.boxes
-        for box in boxes:
-            x1, y1, x2, y2 = box.xyxy[0].tolist()
-            conf = box.conf[0].item()
-            cls = box.cls[0].item()
-            class_name = yolov11n_model.names[int(cls)]
-            
-            # 신뢰도 임계값 조정 (원거리 객체 감지 향상)
-            distance_adjusted_threshold = CONFIDENCE_THRESHOLD * 0.8
-            
-            # "person"및"motorcycle" 클래스만 처리 (신뢰도 임계값 낮춤)
-            if conf > distance_adjusted_threshold and class_name in ["person", "motorcycle"]:
-                detection = {
-                    "bbox": [round(x, 2) for x in [x1, y1, x2, y2]],
-                    "confidence": round(conf, 3),
-                    "class": class_name,
-                    "model": "yolov11n"
-                }
-                all_detections.append(detection)
-    
-    print(f"   감지된 객체 수: {len(all_detections)}")
-    print(f"   감지된 클래스: {set(d['class'] for d in all_detections)}")
+    if first_stage_result is None:
+        with timer.stage("first_stage"):
+            yolov11n_results = detect_first_stage([input_img])
+    else:
+        yolov11n_results = [first_stage_result]
+    
+    # YOLOv11n 결과 처리 (박스 텐서를 한 번에 NumPy 배열로 옮긴 뒤 마스크로 필터링)
+    first_stage = Detections.from_results(yolov11n_results, yolov11n_model.names, "yolov11n")
+    
+    # 신뢰도 임계값 조정 (원거리 객체 감지 향상)
+    distance_adjusted_threshold = CONFIDENCE_THRESHOLD * 0.8
+    
+    # "person"및"motorcycle" 클래스만 처리 (신뢰도 임계값 낮춤)
+    keep = (first_stage.conf > distance_adjusted_threshold) & first_stage.class_mask("person", "motorcycle")
+    first_stage = first_stage[keep]
+    
+    logger.debug("YOLO11n 초기 감지: %d개", len(first_stage))
     
     # 3. 라이더와 오토바이 페어링
-    rider_pairs = rider_motorcycle_pairing(all_detections)
+    with timer.stage("pairing"):
+        rider_pairs = rider_motorcycle_pairing(first_stage)
     
-    # 결과 저장
+    # 결과 저장 (all_detections 는 초기 감지 + 헬멧 감지를 마지막에 합침, API 응답 직전에 dict 목록으로 변환)
+    all_detections = [first_stage]
     results = {
         "timestamp": datetime.now().isoformat(),
-        "all_detections": all_detections,
+        "all_detections": None,
         "rider_pairs": [],
         "helmet_results": []
     }
     
+    # 트래커가 있으면 라이더별 트랙 ID 부여 (스트림 단위로 헬멧 판정 재사용)
+    tracks = tracker.update([pair["rider"] for pair in rider_pairs]) if tracker is not None else [None] * len(rider_pairs)
+    
     # 4. 각 라이더에 대해 처리
-    print("4. 라이더-오토바이 페어링")
-    for pair_index, pair in enumerate(rider_pairs):
-        print(f"   {pair_index+1}번째 라이더-오토바이 페어링")
+    cropped_pairs = []
+    pair_entries = []
+    for pair_index, (pair, track) in enumerate(zip(rider_pairs, tracks)):
         rider = pair["rider"]
         motorcycle = pair["motorcycle"]
         
-        print(f"   라이더 정보: bbox={rider['bbox']}, confidence={rider['confidence']}")
-        print(f"   오토바이 정보: bbox={motorcycle['bbox']}, confidence={motorcycle['confidence']}")
+        logger.debug("%d번째 페어: 라이더 bbox=%s (%.3f), 오토바이 bbox=%s (%.3f)", pair_index + 1,
+                     rider["bbox"], rider["confidence"], motorcycle["bbox"], motorcycle["confidence"])
+        
+        # 최근에 판정한 트랙은 헬멧 모델을 다시 돌리지 않고 캐시된 판정 재사용
+        if track is not None and not track.needs_check(tracker.frame_index):
+            tracker.helmet_reuses += 1
+            pair_entries.append((pair, track, None))
+            continue
         
         # 5. 라이더 부분 크롭
-        print("   5. 라이더 부분 크롭")
         try:
-            rider_img, crop_coords = rider_crop(input_img, rider)
-            print(f"      크롭 성공: 구역={crop_coords}, 크롭 이미지 크기={rider_img.shape}")
-            
-            # 6. 헬멧 모델로 헬멧 감지
-            
-            print("   6. 헬멧 모델로 헬멧 감지")
-            
-            # 判断是否为远距离小物体
-            is_distant = (rider["bbox"][2] - rider["bbox"][0]) < 100  # 小于100像素宽度视为远距离
-
-            # 针对远距离物体使用更低的置信度阈值
-            helmet_threshold = CONFIDENCE_THRESHOLD * (0.7 if is_distant else 1.0)
-
-            helmet_results = helmet_model(rider_img)
-            
-            # 헬멧 감지 결과를 저장할 리스트
-            helmet_detections = []
-            
-            # Helmet 모델 결과 처리
-            print("   Helmet 모델 결과 처리")
-            for result in helmet_results:
-                boxes = result.boxes
-                for box in boxes:
-                    # 크롭된 이미지 내의 좌표
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    conf = box.conf[0].item()
-                    cls = box.cls[0].item()
-                    class_name = helmet_model.names[int(cls)]
-                    
-                    # 远距离物体特殊处理
-                    if is_distant and class_name == "item" and conf > helmet_threshold:
-                        # 计算物体在头部的相对位置
-                        rel_y_pos = (y1 - rider_crop_y1) / max((rider_crop_y2 - rider_crop_y1), 1)
-                        
-                        # 如果物体在头部上方，很可能是头盔
-                        if rel_y_pos < 0.3:  # 位于头部上方30%区域
-                            class_name = "helmet"  # 将item重新分类为helmet
-                            print(f"      远距离物体重新分类: item -> helmet, 位置={rel_y_pos:.2f}")
-                    
-                    # 신뢰도 임계값 조정 (헬멧 감지 향상)
-                    helmet_confidence_threshold = CONFIDENCE_THRESHOLD * 0.85
-                    
-                    if conf > helmet_confidence_threshold:
-                        # 원본 이미지 좌표로 변환
-                        orig_x1 = crop_coords[0] + x1
-                        orig_y1 = crop_coords[1] + y1
-                        orig_x2 = crop_coords[0] + x2
-                        orig_y2 = crop_coords[1] + y2
-                        
-                        detection = {
-                            "bbox": [round(x, 2) for x in [orig_x1, orig_y1, orig_x2, orig_y2]],
-                            "confidence": round(conf, 3),
-                            "class": class_name,
-                            "model": "helmet_model"
-                        }
-                        helmet_detections.append(detection)
-                        all_detections.append(detection)
-            
-            print(f"      {len(helmet_detections)}개의 헬멧 관련 객체 감지")
-            
-            # 7. 헬멧 결과 집계
-            print("   7. 헬멧 결과 집계")
-            helmet_result = helmet_result_aggregation(helmet_detections)
-            print(f"      결과 상태: {helmet_result['status']}")
+            with timer.stage("crop"):
+                rider_img, crop_coords = rider_crop(input_img, rider)
+            logger.debug("크롭: 구역=%s, 크기=%s", crop_coords, rider_img.shape)
+            entry = (pair, track, (rider_img, crop_coords))
+            cropped_pairs.append(entry)
+            pair_entries.append(entry)
+        except Exception as e:
+            logger.exception("라이더 처리 중 오류: %s", e)
+    
+    # 6. 헬멧 모델로 헬멧 감지 (모든 크롭을 한 번에 배치 처리)
+    logger.debug("헬멧 모델 감지: 크롭 %d개", len(cropped_pairs))
+    crop_boxes = {}
+    try:
+        with timer.stage("helmet"):
+            batch_boxes = helmet_inference([crop[0] for _, _, crop in cropped_pairs])
+        crop_boxes = {id(entry): boxes for entry, boxes in zip(cropped_pairs, batch_boxes)}
+        if tracker is not None:
+            tracker.helmet_checks += len(cropped_pairs)
+    except Exception as e:
+        logger.exception("헬멧 모델 추론 중 오류: %s", e)
+    
+    for entry in pair_entries:
+        pair, track, crop = entry
+        rider = pair["rider"]
+        motorcycle = pair["motorcycle"]
+        try:
+            if crop is None:
+                # 캐시된 트랙 판정 재사용
+                helmet_result = track.smoothed_result(cached=True)
+                crop_coords = None
+            else:
+                if id(entry) not in crop_boxes:
+                    continue
+                rider_img, crop_coords = crop
+                
+                # 멀리있는 작은 라이더 판단 (너비 100픽셀 미만)
+                is_distant = (rider["bbox"][2] - rider["bbox"][0]) < 100
+                
+                # 헬멧 감지 결과를 원본 이미지 좌표로 변환
+                helmet_detections = helmet_detections_from_boxes(crop_boxes[id(entry)], crop_coords, rider_img.shape[0], is_distant)
+                all_detections.append(helmet_detections)
+                
+                # 7. 헬멧 결과 집계
+                with timer.stage("aggregation"):
+                    helmet_result = helmet_result_aggregation(helmet_detections)
+                
+                # 트랙의 최근 판정들과 투표하여 보정
+                if track is not None:
+                    track.add_verdict(helmet_result, tracker.frame_index)
+                    helmet_result = track.smoothed_result(cached=False)
+            logger.debug("페어 결과: 라이더 bbox=%s, %s", rider["bbox"], helmet_result["status"])
             
             # 페어 결과 저장
             pair_result = {
@@ -471,12 +415,17 @@ def process_detection(img: np.ndarray) -> Dict:
                 "helmet_result": helmet_result,
                 "crop_coords": crop_coords
             }
+            if track is not None:
+                pair_result["track_id"] = track.track_id
             results["rider_pairs"].append(pair_result)
             results["helmet_results"].append(helmet_result)
         except Exception as e:
-            print(f"   라이더 처리 중 오류: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("라이더 처리 중 오류: %s", e)
+    
+    results["all_detections"] = Detections.concat(all_detections)
+    
+    if tracker is not None:
+        results["track_summary"] = tracker.summary()
     
     # 경고 메시지 설정
     warning_message = ""
@@ -489,53 +438,294 @@ def process_detection(img: np.ndarray) -> Dict:
     
     results["warning"] = warning_message
     
-    # 8. 라벨 시각화
-    visualized_img = helmet_label_visualization(input_img, results)
+    # 8. 라벨 시각화 (render 모드에 따라 생략 가능)
+    with timer.stage("visualization"):
+        if render == "full":
+            visualized_img = helmet_label_visualization(input_img, results, frame_buffer)
+        elif render == "boxes":
+            visualized_img = helmet_box_visualization(input_img, results, frame_buffer)
+        else:
+            visualized_img = None
     results["visualized_img"] = visualized_img
+    results["stage_seconds"] = timer.stages
     
     return results
 
+def image_size(img: np.ndarray) -> Tuple[int, int]:
+    return img.shape[:2]
+
+# 동시 /detect, /ws 요청의 YOLO11n 초기 감지를 묶어 처리하는 스케줄러
+# 크기가 같은 이미지끼리만 한 배치로 추론 (크기가 섞이면 레터박스가 달라져 결과가 함께 모인 요청에 따라 바뀜)
+detector_batcher = MicroBatcher(detect_first_stage, model="yolov11n", group_key=image_size)
+
+# 동일 이미지 재요청용 /detect 결과 캐시
+result_cache = ResultCache()
+
+# 비디오 백그라운드 작업 관리자 (/jobs/video)
+video_jobs = VideoJobManager()
+
+@app.on_event("startup")
+async def warmup_models():
+    # 자주 쓰는 모델을 미리 로드하고 워밍업 추론 (첫 요청의 콜드 스타트 제거)
+    await asyncio.to_thread(model_registry.warmup, MODEL_WARMUP)
+
+@app.on_event("startup")
+async def resume_video_jobs():
+    # 재시작 전에 끝나지 않은 작업 재개
+    video_jobs.resume()
+
+@app.on_event("shutdown")
+async def shutdown_inference_executor():
+    await detector_batcher.stop()
+    inference_executor.shutdown(wait=False)
+    video_jobs.shutdown(wait=False)
+    shutdown_segment_pool()
+
 @app.get("/")
 async def root():
     return {"message": "Helmet Detection API is running"}
 
+def decode_image(contents: bytes) -> Optional[np.ndarray]:
+    """인코딩된 이미지 바이트를 BGR 이미지로 디코딩"""
+    nparr = np.frombuffer(contents, np.uint8)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+def encode_image_jpeg(img: np.ndarray) -> bytes:
+    """이미지를 JPEG 바이트로 인코딩"""
+    _, buffer = cv2.imencode('.jpg', img)
+    return buffer.tobytes()
+
+def encode_image_base64(img: np.ndarray) -> str:
+    """이미지를 JPEG 로 인코딩하여 base64 문자열로 변환"""
+    return base64.b64encode(encode_image_jpeg(img)).decode('utf-8')
+
+def serialize_detections(result: Dict) -> Dict:
+    """결과의 Detections 배열을 기존 JSON 형식(dict 목록)으로 변환 (API 응답 직전에만 호출)"""
+    result["all_detections"] = result["all_detections"].to_dicts()
+    for helmet_result in result["helmet_results"]:
+        if isinstance(helmet_result["detections"], Detections):
+            helmet_result["detections"] = helmet_result["detections"].to_dicts()
+    return result
+
+async def run_detection_pipeline(contents: bytes, binary: bool = False, render: str = DEFAULT_RENDER_MODE,
+                                 tracker: Optional[RiderTracker] = None, timings: bool = False,
+                                 frame_buffer: Optional[FrameBuffer] = None) -> Dict:
+    """디코딩 → 감지 → 인코딩 단계를 추론 실행기에서 실행 (이벤트 루프 비차단)
+
+    binary 이면 result["image"] 는 base64 문자열 대신 JPEG 바이트이다.
+    render 가 "none" 이면 시각화와 인코딩을 생략하고 result["image"] 는 None 이다.
+    단계별 소요 시간은 /metrics 히스토그램에 기록하고, timings 이면 result["timings"] 에 ms 단위로 포함한다.
+    frame_buffer 는 연결별 시각화 재사용 버퍼이다 (인코딩이 끝난 뒤 반환하므로 다음 프레임에서 다시 사용 가능).
+    """
+    if render not in RENDER_MODES:
+        raise ValueError(f"Invalid render mode: {render}")
+    
+    timer = StageTimer()
+    with timer.stage("decode"):
+        img = await inference_executor.run(decode_image, contents)
+    
+    if img is None:
+        raise ValueError("Invalid image data")
+    
+    # YOLO11n 초기 감지는 동시 요청과 묶어 배치로 처리 (배치 대기 시간 포함)
+    first_stage_result = None
+    if MICRO_BATCH_ENABLED:
+        with timer.stage("first_stage"):
+            first_stage_result = await detector_batcher.submit(img)
+    
+    # 감지 처리 (모델 전용 워커)
+    # 트래커/프레임 버퍼는 제자리에서 갱신되므로 프로세스 실행기에서도 스레드에서 실행
+    result = await inference_executor.run(process_detection, img, first_stage_result, render, tracker, frame_buffer,
+                                          model="detection", stateful=tracker is not None or frame_buffer is not None)
+    timer.stages.update(result.pop("stage_seconds"))
+    with timer.stage("serialize"):
+        serialize_detections(result)
+    
+    # 이미지를 base64(또는 JPEG 바이트) 형식으로 변환, 결과에서 이미지 객체 제거 (JSON 직렬화 불가)
+    visualized_img = result.pop("visualized_img")
+    if visualized_img is None:
+        result["image"] = None
+    else:
+        encode = encode_image_jpeg if binary else encode_image_base64
+        with timer.stage("encode"):
+            result["image"] = await inference_executor.run(encode, visualized_img)
+    
+    observe_stages(timer.stages)
+    if timings:
+        result["timings"] = {name: round(seconds * 1000, 3) for name, seconds in timer.stages.items()}
+        result["timings"]["total"] = round(sum(timer.stages.values()) * 1000, 3)
+    
+    return result
+
+def stamped_json(body: bytes, timestamp: str) -> bytes:
+    """timestamp 를 뺀 직렬화된 결과 JSON 객체 맨 앞에 timestamp 필드를 붙임 (캐시 적중 시 다시 파싱하지 않음)"""
+    rest = body[1:]
+    return b'{"timestamp":' + json.dumps(timestamp).encode("utf-8") + (rest if rest == b"}" else b"," + rest)
+
 @app.post("/detect")
-async def detect_helmet(file: UploadFile = File(...)):
+async def detect_helmet(file: UploadFile = File(...), render: str = DEFAULT_RENDER_MODE, timings: bool = False):
+    if render not in RENDER_MODES:
+        requests_total.inc(endpoint="detect", status="bad_request")
+        raise HTTPException(status_code=400, detail=f"render 는 {', '.join(RENDER_MODES)} 중 하나여야 합니다.")
     try:
         # 업로드된 이미지 읽기
         contents = await file.read()
-        nparr = np.fromstring(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if img is None:
-            raise HTTPException(status_code=400, detail="Invalid image file")
         
-        # 감지 처리
-        result = process_detection(img)
+        # 같은 이미지/설정/render 의 직렬화된 결과가 캐시에 있으면 감지 없이 반환 (단계별 시간 요청은 항상 실행)
+        cacheable = RESULT_CACHE_ENABLED and not timings and (RESULT_CACHE_STORE_IMAGE or render == "none")
+        if cacheable:
+            key = result_cache.key(contents, render)
+            cached = result_cache.lookup(key)
+            if cached is None and result_cache.disk_enabled:
+                cached = await asyncio.to_thread(result_cache.load, key)
+            if cached is not None:
+                requests_total.inc(endpoint="detect", status="cached")
+                return Response(content=stamped_json(cached, datetime.now().isoformat()),
+                                media_type="application/json", headers={"X-Cache": "HIT"})
         
-        # 이미지를 base64 형식으로 변환
-        _, buffer = cv2.imencode('.jpg', result["visualized_img"])
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
-        
-        # 결과에서 이미지 객체 제거 (JSON 직렬화 불가)
-        del result["visualized_img"]
-        result["image"] = img_base64
+        try:
+            result = await run_detection_pipeline(contents, render=render, timings=timings)
+        except ValueError:
+            requests_total.inc(endpoint="detect", status="bad_request")
+            raise HTTPException(status_code=400, detail="Invalid image file")
         
-        return result
-    
+        requests_total.inc(endpoint="detect", status="ok")
+        if not cacheable:
+            return result
+        # 캐시에는 timestamp 를 뺀 결과를 저장하고 응답할 때마다 현재 시각을 붙임
+        timestamp = result.pop("timestamp")
+        body = json.dumps(jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        result_cache.put(key, body)
+        if result_cache.disk_enabled:
+            await asyncio.to_thread(result_cache.store, key, body)
+        return Response(content=stamped_json(body, timestamp), media_type="application/json",
+                        headers={"X-Cache": "MISS"})
+    
+    except HTTPException:
+        raise
     except Exception as e:
+        requests_total.inc(endpoint="detect", status="error")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/process-video")
-async def process_video_endpoint(file: UploadFile = File(...)):
-    """비디오 파일을 처리하고 결과를 반환하는 엔드포인트"""
+@app.get("/models")
+async def list_models():
+    """레지스트리 모델의 로드 여부, 참조 수, 로드/워밍업 시간, 메모리 사용량"""
+    return model_registry.status()
+
+@app.delete("/models/{name}")
+async def unload_model(name: str):
+    """사용 중이지 않은 모델의 가중치 해제 (다음 사용 시 다시 로드)"""
+    try:
+        unloaded = model_registry.unload(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="모델을 찾을 수 없습니다.")
+    if not unloaded:
+        raise HTTPException(status_code=409, detail="사용 중인 모델은 해제할 수 없습니다.")
+    return model_registry.status()
+
+def collect_queue_depths() -> Dict[Tuple[str, ...], float]:
+    """/metrics 수집 시점의 대기열 길이"""
+    return {
+        ("micro_batch",): detector_batcher.metrics()["queue_depth"],
+        ("video_jobs",): video_jobs.queued_count(),
+        ("stream_subscribers",): sum(stats["queued"] for stats in cctv_hub.stats().values()),
+    }
+
+queue_depth.set_function(collect_queue_depths)
+stream_fps.set_function(lambda: {(source,): stats["fps"] for source, stats in cctv_hub.stats().items()})
+stream_subscribers.set_function(lambda: {(source,): stats["subscribers"] for source, stats in cctv_hub.stats().items()})
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus 텍스트 형식 지표 (단계별 소요 시간, 모델별 추론 수, 대기열 길이, 스트림 FPS)"""
+    return PlainTextResponse(metrics_registry.render(), media_type=metrics_registry.content_type)
+
+@app.get("/metrics/batching")
+async def batching_metrics():
+    """YOLO11n 마이크로 배치 지표"""
+    return detector_batcher.metrics()
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """/detect 결과 캐시 적중/미스 수, 항목 수와 크기"""
+    return result_cache.metrics()
+
+@app.delete("/metrics/cache")
+async def clear_result_cache():
+    """/detect 결과 캐시(메모리 계층) 비우기"""
+    result_cache.clear()
+    return result_cache.metrics()
+
+def validate_video_request(file: UploadFile, sampling: str):
+    """업로드 비디오 형식과 샘플링 모드 검사"""
     if not file.filename.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
         raise HTTPException(status_code=400, detail="지원되지 않는 비디오 형식입니다. MP4, AVI, MOV 또는 MKV 파일만 허용됩니다.")
+    if sampling not in VIDEO_SAMPLING_MODES:
+        raise HTTPException(status_code=400, detail=f"sampling 은 {', '.join(VIDEO_SAMPLING_MODES)} 중 하나여야 합니다.")
+
+@app.post("/process-video")
+async def process_video_endpoint(file: UploadFile = File(...), sampling: str = VIDEO_SAMPLING_MODE,
+                                 stride: int = VIDEO_INFERENCE_STRIDE, motion_threshold: float = VIDEO_MOTION_THRESHOLD,
+                                 parallel: bool = VIDEO_PARALLEL_ENABLED):
+    """비디오 파일을 처리하고 결과를 반환하는 엔드포인트
+
+    sampling: all (모든 프레임 추론), stride (stride 프레임마다), motion (프레임 차이가 motion_threshold 이상일 때)
+    parallel: 긴 비디오를 세그먼트로 나누어 워커 프로세스에서 병렬 처리
+    """
+    validate_video_request(file, sampling)
     
     # gpt_video.py의 process_video 함수 호출
-    result = await process_video(file)
+    try:
+        result = await process_video(file, sampling, stride, motion_threshold, parallel)
+    except VideoUploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     return result
 
+@app.post("/jobs/video")
+async def create_video_job(file: UploadFile = File(...), sampling: str = VIDEO_SAMPLING_MODE,
+                           stride: int = VIDEO_INFERENCE_STRIDE, motion_threshold: float = VIDEO_MOTION_THRESHOLD,
+                           parallel: bool = VIDEO_PARALLEL_ENABLED):
+    """비디오 처리 작업을 등록하고 즉시 작업 ID 를 반환하는 엔드포인트 (/process-video 의 비동기 버전)"""
+    validate_video_request(file, sampling)
+    
+    job_id = video_jobs.new_job_id()
+    input_path = video_jobs.new_input_path(job_id, file.filename)
+    try:
+        await save_upload(file, input_path)
+    except VideoUploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    params = {"sampling": sampling, "stride": stride, "motion_threshold": motion_threshold, "parallel": parallel}
+    video_jobs.submit(job_id, file.filename, input_path, params)
+    return video_jobs.status(job_id)
+
+def get_job_or_404(job_id: str) -> Dict:
+    job = video_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_video_job(job_id: str):
+    """작업 상태, 진행률(framesDone / totalFrames), ETA(초)"""
+    return get_job_or_404(job_id)
+
+@app.delete("/jobs/{job_id}")
+async def cancel_video_job(job_id: str):
+    """대기 중이거나 실행 중인 작업 취소"""
+    get_job_or_404(job_id)
+    if not video_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="이미 끝난 작업은 취소할 수 없습니다.")
+    return video_jobs.status(job_id)
+
+@app.get("/jobs/{job_id}/result")
+async def get_video_job_result(job_id: str):
+    """완료된 작업의 결과 (/process-video 응답과 같은 형식)"""
+    job = get_job_or_404(job_id)
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"작업이 완료되지 않았습니다. (status: {job['status']})")
+    return video_jobs.store.get(job_id)["result"]
+
 @app.get("/video/{filename}")
 async def get_video(filename: str):
     """처리된 비디오 파일을 제공하는 엔드포인트"""
@@ -545,65 +735,84 @@ async def get_video(filename: str):
     
     return FileResponse(video_path)
 
+async def send_ws_message(websocket: WebSocket, binary: bool, message: Dict, payload: bytes = b""):
+    """연결 모드에 맞춰 JSON 텍스트 또는 바이너리 메시지 전송"""
+    if binary:
+        await websocket.send_bytes(pack_message(message, payload))
+    else:
+        await websocket.send_text(json.dumps(message))
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
+    # 서브프로토콜 협상: helmet.binary.v1 이면 JPEG 바이트 + 메타데이터 헤더, 아니면 base64 텍스트
+    subprotocol = negotiate_subprotocol(websocket)
+    binary = subprotocol == BINARY_SUBPROTOCOL
+    await websocket.accept(subprotocol=subprotocol)
+    # 연결 기본 렌더링 모드 (메시지별 render 플래그로 변경 가능)
+    default_render = websocket.query_params.get("render", DEFAULT_RENDER_MODE)
+    # 단계별 소요 시간 포함 여부 (메시지별 timings 플래그로 변경 가능, 메시지마다 parse_flag 로 해석)
+    default_timings = websocket.query_params.get("timings", "false")
+    # 연결(스트림)별 라이더 추적기: 프레임 간 헬멧 판정 재사용 및 라이더 단위 집계
+    tracker = RiderTracker() if WS_RIDER_TRACKING else None
+    # 연결별 시각화 출력 버퍼 (프레임마다 새로 할당하지 않음)
+    frame_buffer = FrameBuffer()
     try:
         while True:
-            data = await websocket.receive_text()
             try:
-                # 수신된 base64 이미지 데이터 처리
-                img_data = base64.b64decode(data.split(',')[1])
-                nparr = np.fromstring(img_data, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
-                if img is None:
-                    raise ValueError("Invalid image data")
-                
-                # 감지 처리
-                result = process_detection(img)
-                
-                # 이미지를 base64 형식으로 변환
-                _, buffer = cv2.imencode('.jpg', result["visualized_img"])
-                img_base64 = base64.b64encode(buffer).decode('utf-8')
+                # 잘못된 메시지 (JSON 객체가 아닌 메타데이터, image 누락, 잘못된 data-URL, 불리언이 아닌 timings) 는
+                # ValueError 로 오류 응답
+                if binary:
+                    # 수신된 바이너리 메시지에서 JPEG 바이트 추출
+                    metadata, img_data = unpack_message(await websocket.receive_bytes())
+                else:
+                    # 수신된 base64 이미지 데이터 처리 (JSON {"image": data-URL, "render": ...} 형식도 허용)
+                    metadata, img_data = unpack_text_message(await websocket.receive_text())
+                render = metadata.get("render", default_render)
+                timings = parse_flag(metadata.get("timings", default_timings), "timings")
                 
-                # 결과에서 이미지 객체 제거 (JSON 직렬화 불가)
-                del result["visualized_img"]
-                result["image"] = img_base64
+                # 감지 처리 (이벤트 루프를 막지 않도록 추론 실행기에서 실행)
+                result = await run_detection_pipeline(img_data, binary=binary, render=render, tracker=tracker,
+                                                      timings=timings, frame_buffer=frame_buffer)
+                requests_total.inc(endpoint="ws", status="ok")
                 
-                # 감지 결과 전송
-                await websocket.send_text(json.dumps(result))
+                # 감지 결과 전송 (바이너리 모드에서는 이미지를 헤더 뒤 JPEG 바이트로 전송)
+                payload = (result.pop("image") or b"") if binary else b""
+                await send_ws_message(websocket, binary, result, payload)
                 
                 # 헬멧 미착용 감지 시 추가 경고 전송
                 if result["warning"].startswith("경고"):
                     await asyncio.sleep(0.5)  # 경고 메시지 독립 표시를 위한 지연
-                    await websocket.send_text(json.dumps({
+                    await send_ws_message(websocket, binary, {
                         "alert": True,
                         "message": result["warning"]
-                    }))
+                    })
             
             except ValueError as ve:
-                await websocket.send_text(json.dumps({
+                requests_total.inc(endpoint="ws", status="bad_request")
+                await send_ws_message(websocket, binary, {
                     "error": str(ve)
-                }))
+                })
             
             # 연결 유지를 위한 주기적인 ping
             await asyncio.sleep(WS_PING_INTERVAL)
             
     except Exception as e:
-        print(f"WebSocket Error: {e}")
+        logger.warning("WebSocket 오류: %s", e)
     finally:
         await websocket.close()
 
 @app.websocket("/ws/cctv")
 async def cctv_stream_endpoint(websocket: WebSocket):
     """CCTV 스트리밍을 위한 WebSocket 엔드포인트"""
-    await websocket.accept()
+    subprotocol = negotiate_subprotocol(websocket)
+    await websocket.accept(subprotocol=subprotocol)
     try:
-        # gpt_streaming.py의 start_streaming_server 함수 호출
-        await start_streaming_server(websocket)
+        # gpt_streaming.py의 start_streaming_server 함수 호출 (같은 소스의 클라이언트는 추론 결과를 공유)
+        drop_policy = websocket.query_params.get("drop_policy", STREAM_SUBSCRIBER_DROP_POLICY)
+        await start_streaming_server(websocket, drop_policy=drop_policy,
+                                     binary=subprotocol == BINARY_SUBPROTOCOL)
     except Exception as e:
-        print(f"CCTV 스트리밍 오류: {e}")
+        logger.warning("CCTV 스트리밍 오류: %s", e)
     finally:
         await websocket.close()
 
@@ -0,0 +1,204 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import METRICS_BUCKETS, METRICS_PREFIX
+
+LabelValues = Tuple[str, ...]
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Prometheus 텍스트 형식으로 내보내는 지표 (라벨 값 조합별 시계열)"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, str, float]]:
+        """(이름 접미사, 라벨 값, 추가 라벨, 값) 목록"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """단조 증가 카운터 (이름은 _total 로 끝남)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [("", key, "", value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """현재 값 게이지 (set() 으로 기록하거나, 수집 시 호출할 함수를 set_function() 으로 등록)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], Dict[LabelValues, float]]):
+        """수집 시 {라벨 값 튜플: 값} 을 반환하는 함수 등록"""
+        self._function = function
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        if self._function is not None:
+            try:
+                values.update(self._function())
+            except Exception as e:
+                logger.warning("지표 수집 오류 (%s): %s", self.name, e)
+        return [("", key, "", value) for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    """누적 버킷 히스토그램 (초 단위)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = METRICS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 -> (버킷별 개수(+Inf 포함), 합계)
+        self._values: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록의 소요 시간 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    samples.append(("_bucket", key, f'le="{_format_value(bound)}"', cumulative))
+                samples.append(("_sum", key, "", total))
+                samples.append(("_count", key, "", cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """등록된 지표를 Prometheus 텍스트 형식(0.0.4)으로 내보냄"""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """요청 하나의 단계별 소요 시간(초) 기록 (같은 단계를 여러 번 실행하면 합산)"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+
+# 프로세스 전역 지표
+registry = MetricsRegistry()
+stage_seconds = registry.register(Histogram(
+    "stage_duration_seconds", "감지 파이프라인 단계별 소요 시간", ("stage",)))
+model_inferences = registry.register(Counter(
+    "model_inferences_total", "모델별 추론 호출 수", ("model",)))
+model_inference_seconds = registry.register(Histogram(
+    "model_inference_duration_seconds", "모델별 추론 호출 소요 시간 (잠금 대기 제외)", ("model",)))
+requests_total = registry.register(Counter(
+    "requests_total", "엔드포인트별 처리 요청 수", ("endpoint", "status")))
+queue_depth = registry.register(Gauge(
+    "queue_depth", "대기열 길이", ("queue",)))
+stream_fps = registry.register(Gauge(
+    "stream_fps", "CCTV 스트림 소스별 브로드캐스트 FPS", ("source",)))
+stream_subscribers = registry.register(Gauge(
+    "stream_subscribers", "CCTV 스트림 소스별 구독자 수", ("source",)))
+
+
+def observe_stages(stages: Dict[str, float]):
+    """단계별 소요 시간을 단계 히스토그램에 기록"""
+    for name, seconds in stages.items():
+        stage_seconds.observe(seconds, stage=name)
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS
+from inference_executor import inference_executor
+
+
+class MicroBatcher:
+    """동시 요청을 모아 한 번의 배치 추론으로 처리하는 스케줄러
+
+    첫 요청이 도착한 뒤 최대 max_wait_ms 동안, 또는 max_batch_size 개가 모일 때까지
+    요청을 모아 infer_batch(items) 를 호출하고 각 호출자에게 자신의 결과를 돌려준다.
+    group_key 가 있으면 모은 요청을 키가 같은 것끼리 나눠 그룹마다 한 번씩 호출한다
+    (예: 이미지 크기. 크기가 섞인 배치는 Ultralytics 가 rect 레터박스 대신 정사각형으로 패딩하여
+    같은 요청이라도 함께 모인 다른 요청에 따라 결과가 달라진다).
+    배치 추론은 추론 실행기의 모델 전용 워커에서 실행된다.
+    """
+
+    def __init__(self, infer_batch: Callable[[List], List], model: str,
+                 max_batch_size: int = MICRO_BATCH_MAX_SIZE, max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS,
+                 group_key: Optional[Callable[[Any], Hashable]] = None):
+        self.infer_batch = infer_batch
+        self.model = model
+        self.group_key = group_key
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # 배치별 지표
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes: Counter = Counter()
+        self.total_wait_ms = 0.0
+        self.total_inference_ms = 0.0
+        self.last_batch: Dict = {}
+
+    async def submit(self, item):
+        """항목을 다음 배치에 추가하고 해당 항목의 결과를 기다림"""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _collect(self) -> List:
+        """첫 항목 이후 대기 시간 또는 최대 배치 크기까지 항목 수집"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _groups(self, batch: List) -> List[List]:
+        """group_key 가 같은 항목끼리 도착 순서대로 나눔"""
+        if self.group_key is None:
+            return [batch]
+        groups: Dict[Hashable, List] = {}
+        for entry in batch:
+            groups.setdefault(self.group_key(entry[0]), []).append(entry)
+        return list(groups.values())
+
+    async def _run(self):
+        while True:
+            for group in self._groups(await self._collect()):
+                await self._infer(group)
+
+    async def _infer(self, batch: List):
+        items = [item for item, _, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await inference_executor.run(self.infer_batch, items, model=self.model)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        inference_ms = (time.perf_counter() - started) * 1000
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+        self._record(batch, started, inference_ms)
+
+    def _record(self, batch: List, started: float, inference_ms: float):
+        wait_ms = sum((started - queued_at) * 1000 for _, _, queued_at in batch) / len(batch)
+        self.batches += 1
+        self.items += len(batch)
+        self.batch_sizes[len(batch)] += 1
+        self.total_wait_ms += wait_ms
+        self.total_inference_ms += inference_ms
+        self.last_batch = {
+            "size": len(batch),
+            "avg_wait_ms": round(wait_ms, 3),
+            "inference_ms": round(inference_ms, 3),
+        }
+
+    def metrics(self) -> Dict:
+        """누적 배치 지표"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 3) if self.batches else 0,
+            "avg_wait_ms": round(self.total_wait_ms / self.batches, 3) if self.batches else 0,
+            "avg_inference_ms": round(self.total_inference_ms / self.batches, 3) if self.batches else 0,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "last_batch": self.last_batch,
+        }
@@ -0,0 +1,269 @@
+import importlib.util
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import psutil
+from ultralytics import YOLO
+
+from config import MODEL_BACKEND_CHOICES, MODEL_BACKEND_STRICT, MODEL_BACKENDS, MODEL_EXPORT_ON_DEMAND, MODEL_PATHS, \
+    MODEL_PRECISION_CHOICES, MODEL_PRECISIONS, MODEL_WARMUP_IMGSZ
+from metrics import model_inference_seconds, model_inferences
+from quantization import export_variant, variant_path
+
+logger = logging.getLogger(__name__)
+
+# 백엔드별 런타임 패키지 (requirements-backends.txt)
+_BACKEND_PACKAGES = {"onnx": ("onnxruntime",), "openvino": ("openvino",)}
+
+
+class ModelEntry:
+    """레지스트리에 등록된 가중치 파일 하나의 상태"""
+
+    def __init__(self, name: str, path: str, backend: str = "torch", precision: str = "fp32"):
+        if backend not in MODEL_BACKEND_CHOICES:
+            raise ValueError(f"지원되지 않는 추론 백엔드입니다: {backend}")
+        if precision not in MODEL_PRECISION_CHOICES:
+            raise ValueError(f"지원되지 않는 정밀도입니다: {precision}")
+        self.name = name
+        self.path = path
+        self.backend = backend
+        self.precision = precision
+        self.active_backend: Optional[str] = None
+        self.active_precision: Optional[str] = None
+        # 설정한 백엔드/정밀도 대신 torch FP32 로 대체한 이유 (대체하지 않았으면 None)
+        self.fallback_reason: Optional[str] = None
+        self.model = None
+        self.refs = 0
+        self.calls = 0
+        self.load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.parameter_bytes = 0
+        self.rss_delta_bytes = 0
+        self.loaded_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.load_lock = threading.Lock()
+        # 같은 모델 인스턴스를 여러 스레드가 동시에 추론하지 않도록 직렬화
+        self.inference_lock = threading.RLock()
+
+
+class SharedModel:
+    """레지스트리 모델 핸들 (처음 사용할 때 로드, 추론 호출은 모델별 잠금으로 직렬화)
+
+    YOLO 객체처럼 호출하거나 predict() 를 사용할 수 있고, names 등 다른 속성은 모델에 그대로 위임한다.
+    추론 호출 동안에는 참조를 잡으므로, 모듈 전역 핸들은 get() 으로 만들어 호출 사이에 해제될 수 있게 한다.
+    """
+
+    def __init__(self, registry: "ModelRegistry", name: str):
+        self._registry = registry
+        self._name = name
+
+    def _infer(self, method: Optional[str], args, kwargs):
+        # 호출하는 동안만 참조를 잡아 추론 중인 모델은 해제되지 않음 (호출 사이에는 해제 가능)
+        self._registry.retain(self._name)
+        try:
+            entry = self._registry.load(self._name)
+            with entry.inference_lock:
+                entry.calls += 1
+                entry.last_used = time.time()
+                model_inferences.inc(model=self._name)
+                target = entry.model if method is None else getattr(entry.model, method)
+                with model_inference_seconds.time(model=self._name):
+                    return target(*args, **kwargs)
+        finally:
+            self._registry.release(self._name)
+
+    def __call__(self, *args, **kwargs):
+        return self._infer(None, args, kwargs)
+
+    def predict(self, *args, **kwargs):
+        return self._infer("predict", args, kwargs)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self._registry.load(self._name).model, attr)
+
+
+def _missing_packages(backend: str) -> List[str]:
+    return [package for package in _BACKEND_PACKAGES.get(backend, ()) if importlib.util.find_spec(package) is None]
+
+
+def open_model(name: str, path: str, backend: str, precision: str = "fp32", strict: bool = MODEL_BACKEND_STRICT):
+    """백엔드/정밀도에 맞는 모델을 열어 (모델, 실제 백엔드, 실제 정밀도, 대체 이유) 반환
+
+    onnx/openvino 변형 파일이 없으면 MODEL_EXPORT_ON_DEMAND 일 때 .pt 에서 내보내거나 양자화하고,
+    실패하면 (런타임 미설치, 보정 이미지 없음 등) torch FP32 로 대체하고 그 이유를 함께 반환한다.
+    strict 이면 대체하지 않고 RuntimeError 를 낸다.
+    """
+    if not os.path.exists(path):
+        # 경로가 없으면 작업 디렉토리 기준 기본 경로 사용
+        path = os.path.join("models", os.path.basename(path))
+
+    if backend != "torch":
+        try:
+            missing = _missing_packages(backend)
+            if missing:
+                raise ImportError(f"{', '.join(missing)} 패키지가 설치되지 않았습니다 "
+                                  f"(pip install -r requirements-backends.txt)")
+            artifact = variant_path(path, backend, precision)
+            if not os.path.exists(artifact):
+                if not MODEL_EXPORT_ON_DEMAND:
+                    raise FileNotFoundError(f"내보낸 모델 파일이 없습니다: {artifact}")
+                logger.info("모델 내보내기: %s → %s %s", name, backend, precision)
+                artifact = export_variant(path, backend, precision)
+            return YOLO(artifact, task="detect"), backend, precision, None
+        except Exception as e:
+            fallback = f"{backend} {precision} 로드 실패: {e}"
+    elif precision != "fp32":
+        fallback = f"torch 백엔드는 {precision} 을 지원하지 않음"
+    else:
+        return YOLO(path), "torch", "fp32", None
+
+    if strict:
+        raise RuntimeError(f"{name}: {fallback}")
+    logger.error("%s: %s, torch fp32 로 대체", name, fallback)
+    return YOLO(path), "torch", "fp32", fallback
+
+
+def _parameter_bytes(model) -> int:
+    """모델 파라미터와 버퍼가 차지하는 메모리 (PyTorch 모델이 아니면 0)"""
+    module = getattr(model, "model", None)
+    if not hasattr(module, "parameters"):
+        return 0
+    tensors = itertools.chain(module.parameters(), module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelRegistry:
+    """가중치 파일을 프로세스당 한 번만, 처음 사용할 때 로드하는 모델 레지스트리
+
+    acquire()/release() (또는 use()) 로 참조 수를 관리하며, 참조가 없는 모델만 unload() 할 수 있다.
+    """
+
+    def __init__(self, paths: Dict[str, str] = MODEL_PATHS, backends: Dict[str, str] = MODEL_BACKENDS,
+                 precisions: Dict[str, str] = MODEL_PRECISIONS):
+        self._entries = {name: ModelEntry(name, path, backends.get(name, "torch"), precisions.get(name, "fp32"))
+                         for name, path in paths.items()}
+        self._refs_lock = threading.Lock()
+
+    def _entry(self, name: str) -> ModelEntry:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+        return entry
+
+    def is_loaded(self, name: str) -> bool:
+        return self._entry(name).model is not None
+
+    def load(self, name: str) -> ModelEntry:
+        """모델이 로드되지 않았으면 로드 (동시에 호출되어도 한 번만 로드)"""
+        entry = self._entry(name)
+        if entry.model is not None:
+            return entry
+        with entry.load_lock:
+            if entry.model is None:
+                process = psutil.Process()
+                rss_before = process.memory_info().rss
+                started = time.perf_counter()
+                model, entry.active_backend, entry.active_precision, entry.fallback_reason = open_model(
+                    name, entry.path, entry.backend, entry.precision)
+                entry.load_ms = (time.perf_counter() - started) * 1000
+                entry.rss_delta_bytes = process.memory_info().rss - rss_before
+                entry.parameter_bytes = _parameter_bytes(model)
+                entry.loaded_at = time.time()
+                entry.model = model
+                logger.info("모델 로드: %s [%s %s] (%.0fms)", name, entry.active_backend, entry.active_precision,
+                            entry.load_ms)
+        return entry
+
+    def get(self, name: str) -> SharedModel:
+        """참조 수를 늘리지 않는 모델 핸들"""
+        self._entry(name)
+        return SharedModel(self, name)
+
+    def retain(self, name: str):
+        """참조 수 증가 (release 로 되돌림)"""
+        entry = self._entry(name)
+        with self._refs_lock:
+            entry.refs += 1
+
+    def acquire(self, name: str) -> SharedModel:
+        """참조 수를 늘리고 모델 핸들 반환 (로드는 처음 사용할 때)"""
+        self.retain(name)
+        return SharedModel(self, name)
+
+    def release(self, name: str):
+        entry = self._entry(name)
+        with self._refs_lock:
+            entry.refs = max(0, entry.refs - 1)
+
+    @contextmanager
+    def use(self, name: str):
+        """with 블록 동안 참조를 유지하는 모델 핸들"""
+        model = self.acquire(name)
+        try:
+            yield model
+        finally:
+            self.release(name)
+
+    def unload(self, name: str) -> bool:
+        """참조가 없는 모델의 가중치를 해제"""
+        entry = self._entry(name)
+        with entry.load_lock, self._refs_lock, entry.inference_lock:
+            if entry.refs > 0:
+                return False
+            entry.model = None
+            entry.loaded_at = None
+            entry.parameter_bytes = 0
+            entry.rss_delta_bytes = 0
+        return True
+
+    def warmup(self, names: Iterable[str], imgsz: int = MODEL_WARMUP_IMGSZ):
+        """모델을 로드하고 빈 이미지로 한 번 추론하여 첫 요청의 지연을 줄임"""
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        for name in names:
+            try:
+                started = time.perf_counter()
+                self.get(name)(dummy)
+                self._entry(name).warmup_ms = (time.perf_counter() - started) * 1000
+            except Exception as e:
+                if MODEL_BACKEND_STRICT:
+                    raise
+                logger.warning("모델 워밍업 실패: %s: %s", name, e)
+
+    def status(self) -> Dict:
+        """모델별 로드 여부, 참조 수, 로드/워밍업 시간, 메모리 사용량, 실제 백엔드 (설정과 다르면 fallback_reason)"""
+        models = []
+        for entry in self._entries.values():
+            models.append({
+                "name": entry.name,
+                "path": entry.path,
+                "backend": entry.backend,
+                "active_backend": entry.active_backend,
+                "precision": entry.precision,
+                "active_precision": entry.active_precision,
+                "fallback_reason": entry.fallback_reason,
+                "resident": entry.model is not None,
+                "refs": entry.refs,
+                "calls": entry.calls,
+                "load_ms": round(entry.load_ms, 1) if entry.load_ms is not None else None,
+                "warmup_ms": round(entry.warmup_ms, 1) if entry.warmup_ms is not None else None,
+                "parameter_mb": round(entry.parameter_bytes / 1024 ** 2, 2),
+                "rss_delta_mb": round(entry.rss_delta_bytes / 1024 ** 2, 2),
+                "loaded_at": entry.loaded_at,
+                "last_used": entry.last_used,
+            })
+        return {
+            "process_rss_mb": round(psutil.Process().memory_info().rss / 1024 ** 2, 2),
+            "models": models,
+        }
+
+
+# 프로세스 전역 레지스트리
+model_registry = ModelRegistry()
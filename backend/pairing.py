@@ -0,0 +1,99 @@
+import logging
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from config import DISTANT_MOTORCYCLE_SIZE, DISTANT_MOTORCYCLE_SIZE_FACTOR, MOTORCYCLE_RIDER_CAPACITY, \
+    RIDER_MOTORCYCLE_PAIRING_THRESHOLD
+from detections import Detections
+
+logger = logging.getLogger(__name__)
+
+
+def rider_motorcycle_pairing(detections: Detections) -> List[Dict]:
+    """라이더와 오토바이 페어링 처리 (페어가 된 라이더/오토바이만 dict 로 변환)"""
+    # 모델이 인식한 클래스별 개수 (DEBUG 일 때만 집계)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("라이더-오토바이 페어링: 감지 %d개, 클래스별 %s", len(detections),
+                     dict(Counter(detections.names[c] for c in detections.cls.tolist())))
+
+    riders = detections[detections.class_mask("person")]
+    motorcycles = detections[detections.class_mask("motorcycle")]
+
+    logger.debug("라이더: %d, 오토바이: %d", len(riders), len(motorcycles))
+
+    # 라이더가 없으면 다른 클래스를 사용하여 찾음
+    if len(riders) == 0:
+        possible_rider_classes = ["person", "rider", "human", "pedestrian"]
+        for cls in possible_rider_classes:
+            riders = detections[detections.class_mask(cls, ignore_case=True)]
+            if len(riders) > 0:
+                logger.debug("라이더 클래스 '%s'로 찾은 수: %d", cls, len(riders))
+                break
+
+    if len(motorcycles) == 0:
+        possible_moto_classes = ["motorcycle", "motorbike", "bike", "motor"]
+        for cls in possible_moto_classes:
+            motorcycles = detections[detections.class_mask(cls, ignore_case=True)]
+            if len(motorcycles) > 0:
+                logger.debug("오토바이 클래스 '%s'로 찾은 수: %d", cls, len(motorcycles))
+                break
+
+    if not len(riders) or not len(motorcycles):
+        return []
+
+    # 응답 JSON 과 같은 반올림 좌표로 계산
+    rider_boxes = riders.rounded_xyxy()
+    moto_boxes = motorcycles.rounded_xyxy()
+
+    # 라이더 × 오토바이 중심점 거리 행렬 (R, M)
+    rider_centers = (rider_boxes[:, :2] + rider_boxes[:, 2:]) / 2
+    moto_centers = (moto_boxes[:, :2] + moto_boxes[:, 2:]) / 2
+    distances = np.linalg.norm(rider_centers[:, None, :] - moto_centers[None, :, :], axis=2)
+
+    # 오토바이 크기에 비례하는 임계값 (멀리있는 작은 오토바이는 임계값 완화)
+    moto_widths = moto_boxes[:, 2] - moto_boxes[:, 0]
+    moto_sizes = np.maximum(moto_widths, moto_boxes[:, 3] - moto_boxes[:, 1])
+    size_factors = np.where(moto_sizes < DISTANT_MOTORCYCLE_SIZE, DISTANT_MOTORCYCLE_SIZE_FACTOR, 1.0)
+    thresholds = RIDER_MOTORCYCLE_PAIRING_THRESHOLD * moto_sizes * size_factors
+    feasible = distances < thresholds[None, :]
+
+    # 페어링 가능한 후보가 있는 라이더/오토바이만 할당 문제에 포함
+    rider_idx = np.flatnonzero(feasible.any(axis=1))
+    moto_idx = np.flatnonzero(feasible.any(axis=0))
+    if len(rider_idx) == 0:
+        return []
+
+    # 최적 할당 (헝가리안): 오토바이 열을 탑승 정원만큼 복제하여 동승자 허용
+    # 불가능한 조합은 모든 가능한 거리 합보다 큰 비용으로 두어 페어 수를 먼저 최대화
+    sub_distances = distances[np.ix_(rider_idx, moto_idx)]
+    sub_feasible = feasible[np.ix_(rider_idx, moto_idx)]
+    infeasible_cost = sub_distances[sub_feasible].sum() + 1.0
+    cost = np.where(sub_feasible, sub_distances, infeasible_cost)
+    cost = np.repeat(cost, MOTORCYCLE_RIDER_CAPACITY, axis=1)
+    assigned_rows, assigned_cols = linear_sum_assignment(cost)
+    assigned_motos = assigned_cols // MOTORCYCLE_RIDER_CAPACITY
+
+    keep = sub_feasible[assigned_rows, assigned_motos]
+    pair_riders = rider_idx[assigned_rows[keep]]
+    pair_motos = moto_idx[assigned_motos[keep]]
+    pair_distances = distances[pair_riders, pair_motos]
+
+    # 오토바이 순서, 같은 오토바이 안에서는 가까운 순으로 정렬
+    order = np.lexsort((pair_distances, pair_motos))
+
+    pairs = []
+    for r, m, distance in zip(pair_riders[order], pair_motos[order], pair_distances[order]):
+        moto_width = moto_widths[m]
+        confidence = 1.0 - (distance / moto_width) if moto_width > 0 else 0.5
+        pairs.append({
+            "rider": riders.record(r),
+            "motorcycle": motorcycles.record(m),
+            "confidence": round(float(confidence), 3),
+            "distance": round(float(distance), 3)
+        })
+        logger.debug("오토바이 %d와 라이더 페어링: 거리=%.3f, 신뢰도=%.3f", m, distance, confidence)
+
+    return pairs
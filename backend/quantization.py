@@ -0,0 +1,214 @@
+"""
+양자화 모델 변형(FP16 / INT8) 생성
+
+- onnx: INT8 은 onnxruntime 동적 양자화(가중치만) 또는 로컬 이미지 폴더로 보정한 정적 양자화,
+  FP16 은 onnxconverter-common 변환
+- openvino: Ultralytics 내보내기 (half=True, 또는 int8=True + 로컬 이미지 폴더 보정)
+
+필요한 패키지 (onnx, onnxruntime, onnxconverter-common, openvino, nncf):
+    pip install -r requirements-quantization.txt
+
+모델 레지스트리가 변형 파일이 없을 때 처음 로드하면서 호출하며, 미리 만들어 둘 수도 있다.
+backend 디렉토리에서 실행:
+    python -m quantization --models yolov11n helmet --backend onnx --precision int8
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import shutil
+import tempfile
+from typing import List
+
+import cv2
+import numpy as np
+import yaml
+from ultralytics import YOLO
+
+from config import LETTERBOX_COLOR, MODEL_EXPORT_IMGSZ, MODEL_PATHS, MODEL_PRECISION_CHOICES, QUANT_CALIBRATION_DIR, \
+    QUANT_CALIBRATION_IMAGES, QUANT_INT8_MODE
+
+_PRECISION_SUFFIX = {"fp32": "", "fp16": "_fp16", "int8": "_int8"}
+
+# 백엔드/정밀도별 필요한 모듈 (requirements-quantization.txt)
+_REQUIRED_MODULES = {
+    ("onnx", "fp32"): ("onnx", "onnxruntime"),
+    ("onnx", "fp16"): ("onnx", "onnxruntime", "onnxconverter_common"),
+    ("onnx", "int8"): ("onnx", "onnxruntime"),
+    ("openvino", "fp32"): ("openvino",),
+    ("openvino", "fp16"): ("openvino",),
+    ("openvino", "int8"): ("openvino", "nncf"),
+}
+
+
+def variant_path(path: str, backend: str, precision: str = "fp32") -> str:
+    """백엔드/정밀도별 모델 파일 경로 (예: helmet_model_int8.onnx, helmet_model_fp16_openvino_model)"""
+    stem, _ = os.path.splitext(path)
+    suffix = _PRECISION_SUFFIX[precision]
+    if backend == "onnx":
+        return f"{stem}{suffix}.onnx"
+    if backend == "openvino":
+        return f"{stem}{suffix}_openvino_model"
+    return path
+
+
+def calibration_images(folder: str = QUANT_CALIBRATION_DIR, limit: int = QUANT_CALIBRATION_IMAGES) -> List[str]:
+    """보정에 사용할 이미지 경로 목록"""
+    paths = sorted(p for p in glob.glob(os.path.join(folder, "*"))
+                   if p.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")))
+    if not paths:
+        raise FileNotFoundError(f"보정 이미지가 없습니다: {folder}")
+    return paths[:limit]
+
+
+def preprocess(img: np.ndarray, imgsz: int) -> np.ndarray:
+    """Ultralytics 입력과 같은 전처리 (레터박스, BGR→RGB, NCHW, 0~1 float32)"""
+    height, width = img.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_h, new_w = round(height * ratio), round(width * ratio)
+    resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, left = (imgsz - new_h) // 2, (imgsz - new_w) // 2
+    boxed = cv2.copyMakeBorder(resized, top, imgsz - new_h - top, left, imgsz - new_w - left,
+                               cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return np.ascontiguousarray(boxed[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255
+
+
+class ImageFolderCalibrationReader:
+    """onnxruntime 정적 양자화용 보정 데이터 (이미지 폴더를 한 장씩 전처리하여 제공)"""
+
+    def __init__(self, input_name: str, paths: List[str], imgsz: int):
+        self.input_name = input_name
+        self.paths = paths
+        self.imgsz = imgsz
+        self._iterator = iter(paths)
+
+    def get_next(self):
+        for path in self._iterator:
+            img = cv2.imread(path)
+            if img is not None:
+                return {self.input_name: preprocess(img, self.imgsz)}
+        return None
+
+    def rewind(self):
+        self._iterator = iter(self.paths)
+
+
+def _copy_onnx_metadata(source_path: str, target_path: str):
+    """Ultralytics 가 읽는 ONNX 메타데이터(names, stride, imgsz 등)를 변환된 모델에 복사"""
+    import onnx
+
+    source = onnx.load(source_path, load_external_data=False)
+    target = onnx.load(target_path)
+    del target.metadata_props[:]
+    target.metadata_props.extend(source.metadata_props)
+    onnx.save(target, target_path)
+
+
+def quantize_onnx_int8(fp32_path: str, output_path: str, mode: str = QUANT_INT8_MODE,
+                       calibration_dir: str = QUANT_CALIBRATION_DIR, imgsz: int = MODEL_EXPORT_IMGSZ):
+    """FP32 ONNX 모델을 INT8 로 양자화 (dynamic: 가중치만, static: 보정 이미지로 활성값 범위 계산)"""
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    if mode == "dynamic":
+        quantize_dynamic(fp32_path, output_path, weight_type=QuantType.QUInt8)
+    elif mode == "static":
+        import onnxruntime
+
+        session = onnxruntime.InferenceSession(fp32_path, providers=["CPUExecutionProvider"])
+        reader = ImageFolderCalibrationReader(session.get_inputs()[0].name, calibration_images(calibration_dir), imgsz)
+        quantize_static(fp32_path, output_path, reader, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    else:
+        raise ValueError(f"지원되지 않는 INT8 양자화 방식입니다: {mode}")
+    _copy_onnx_metadata(fp32_path, output_path)
+
+
+def convert_onnx_fp16(fp32_path: str, output_path: str):
+    """FP32 ONNX 모델의 가중치/연산을 FP16 으로 변환 (입출력은 FP32 유지)"""
+    import onnx
+    from onnxconverter_common import float16
+
+    onnx.save(float16.convert_float_to_float16(onnx.load(fp32_path), keep_io_types=True), output_path)
+    _copy_onnx_metadata(fp32_path, output_path)
+
+
+def _calibration_dataset_yaml(model: YOLO, calibration_dir: str, workdir: str) -> str:
+    """Ultralytics INT8 보정용 데이터셋 설정 (라벨 없는 이미지 폴더)"""
+    data_path = os.path.join(workdir, "calibration.yaml")
+    with open(data_path, "w") as f:
+        yaml.safe_dump({"path": os.path.abspath(calibration_dir), "train": ".", "val": ".",
+                        "names": dict(model.names)}, f, allow_unicode=True)
+    return data_path
+
+
+def export_openvino(path: str, precision: str, calibration_dir: str = QUANT_CALIBRATION_DIR,
+                    imgsz: int = MODEL_EXPORT_IMGSZ) -> str:
+    """OpenVINO 변형을 내보내고 variant_path 위치로 이동
+
+    Ultralytics 는 .pt 옆에 정밀도와 관계없이 같은 이름으로 내보내므로 임시 디렉토리에서 내보낸다.
+    """
+    target = variant_path(path, "openvino", precision)
+    workdir = tempfile.mkdtemp(prefix="export_")
+    try:
+        model = YOLO(shutil.copy(path, workdir))
+        kwargs = {}
+        if precision == "fp16":
+            kwargs["half"] = True
+        elif precision == "int8":
+            kwargs.update(int8=True, data=_calibration_dataset_yaml(model, calibration_dir, workdir))
+        exported = model.export(format="openvino", imgsz=imgsz, dynamic=True, **kwargs)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        shutil.move(str(exported), target)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return target
+
+
+def require_modules(backend: str, precision: str):
+    """변형을 만드는 데 필요한 패키지가 없으면 설치 방법과 함께 ImportError"""
+    missing = [module for module in _REQUIRED_MODULES.get((backend, precision), ())
+               if importlib.util.find_spec(module) is None]
+    if missing:
+        raise ImportError(f"{backend} {precision} 변형에 필요한 패키지가 없습니다: {', '.join(missing)} "
+                          f"(pip install -r requirements-quantization.txt)")
+
+
+def export_variant(path: str, backend: str, precision: str = "fp32") -> str:
+    """.pt 가중치에서 백엔드/정밀도 변형을 만들고 경로 반환 (배치/입력 크기가 바뀌어도 되도록 dynamic)"""
+    if precision not in MODEL_PRECISION_CHOICES:
+        raise ValueError(f"지원되지 않는 정밀도입니다: {precision}")
+    require_modules(backend, precision)
+
+    if backend == "onnx":
+        fp32_path = variant_path(path, "onnx")
+        if not os.path.exists(fp32_path):
+            fp32_path = str(YOLO(path).export(format="onnx", imgsz=MODEL_EXPORT_IMGSZ, dynamic=True))
+        if precision == "fp32":
+            return fp32_path
+        target = variant_path(path, "onnx", precision)
+        if precision == "int8":
+            quantize_onnx_int8(fp32_path, target)
+        else:
+            convert_onnx_fp16(fp32_path, target)
+        return target
+
+    if backend == "openvino":
+        return export_openvino(path, precision)
+
+    raise ValueError(f"내보낼 수 없는 백엔드입니다: {backend}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=["yolov11n", "helmet"])
+    parser.add_argument("--backend", choices=["onnx", "openvino"], default="onnx")
+    parser.add_argument("--precision", choices=MODEL_PRECISION_CHOICES, default="int8")
+    args = parser.parse_args()
+
+    for name in args.models:
+        print(f"{name}: {export_variant(MODEL_PATHS[name], args.backend, args.precision)}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import config
+from config import MODEL_PATHS, RESULT_CACHE_DISK_DIR, RESULT_CACHE_DISK_MAX_BYTES, RESULT_CACHE_MAX_BYTES, \
+    RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# 저장 값 형식 (바뀌면 이전 디스크 항목은 사용되지 않음): 2 = timestamp 를 뺀 JSON
+CACHE_FORMAT = 2
+
+
+def config_version() -> str:
+    """설정 값과 모델 가중치 파일(크기, 수정 시각)의 해시 (바뀌면 이전 캐시 항목은 사용되지 않음)"""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"format={CACHE_FORMAT};".encode())
+    for name in sorted(vars(config)):
+        if name.isupper():
+            digest.update(f"{name}={getattr(config, name)!r};".encode())
+    for path in sorted(MODEL_PATHS.values()):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """업로드 바이트의 해시로 직렬화된 감지 결과(timestamp 를 뺀 JSON 바이트)를 저장하는 LRU/TTL 캐시
+
+    메모리 계층은 항목 수와 바이트 크기로 제한하고, disk_dir 이 있으면 메모리에서 밀려난 항목도
+    디스크 계층(키별 파일, 수정 시각으로 TTL 판단)에서 찾는다. 디스크 입출력은 호출자가 스레드에서 실행한다.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 ttl: Optional[float] = RESULT_CACHE_TTL, disk_dir: Optional[str] = RESULT_CACHE_DISK_DIR,
+                 disk_max_bytes: int = RESULT_CACHE_DISK_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.version = config_version()
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        # 누적 지표
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(entry.stat().st_size for entry in os.scandir(disk_dir) if entry.is_file())
+
+    @property
+    def disk_enabled(self) -> bool:
+        return bool(self.disk_dir)
+
+    def key(self, contents: bytes, *variant: str) -> str:
+        """업로드 바이트 + 설정/모델 버전 + 요청 옵션(render 등) 키"""
+        digest = hashlib.blake2b(contents, digest_size=16).hexdigest()
+        return "-".join((self.version, *variant, digest))
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        """메모리 계층 조회 (디스크 계층을 쓰지 않으면 실패 시 miss 로 집계)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expired += 1
+            if not self.disk_enabled:
+                self.misses += 1
+        return None
+
+    def load(self, key: str) -> Optional[bytes]:
+        """디스크 계층 조회 (찾으면 메모리 계층으로 올림)"""
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                self._delete_file(path)
+                with self._lock:
+                    self.expired += 1
+                    self.misses += 1
+                return None
+            with open(path, "rb") as f:
+                value = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._insert(key, value, stored_at)
+        return value
+
+    def put(self, key: str, value: bytes):
+        """메모리 계층에 저장 (디스크 계층은 store 로 별도 기록)"""
+        with self._lock:
+            self._insert(key, value, time.time())
+
+    def store(self, key: str, value: bytes):
+        """디스크 계층에 기록하고 용량을 넘으면 오래된 파일부터 삭제"""
+        path = self._disk_path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(value)
+            # 같은 키의 파일을 덮어쓰면 이전 파일 크기는 용량에서 뺌
+            try:
+                previous = os.path.getsize(path)
+            except OSError:
+                previous = 0
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("결과 캐시 디스크 기록 실패: %s", e)
+            return
+        with self._lock:
+            self._disk_bytes += len(value) - previous
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._prune_disk()
+
+    def _insert(self, key: str, value: bytes, stored_at: float):
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, stored_at)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _delete_file(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+
+    def _prune_disk(self):
+        # 용량의 90% 이하가 될 때까지 수정 시각이 오래된 파일부터 삭제
+        files = sorted((entry for entry in os.scandir(self.disk_dir) if entry.is_file()),
+                       key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+        for entry in files:
+            if total <= self.disk_max_bytes * 0.9:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        """메모리 계층 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self) -> Dict:
+        """누적 캐시 지표"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "disk_dir": self.disk_dir,
+                "disk_bytes": self._disk_bytes if self.disk_enabled else 0,
+            }
@@ -0,0 +1,176 @@
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from config import (
+    HELMET_RECHECK_INTERVAL,
+    HELMET_STABLE_VERDICTS,
+    HELMET_VOTE_WINDOW,
+    TRACK_HIGH_CONFIDENCE,
+    TRACK_IOU_THRESHOLD,
+    TRACK_MAX_MISSES,
+)
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """(N, 4) × (M, 4) xyxy 박스의 IoU 행렬 (N, M)"""
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class RiderTrack:
+    """프레임 간 동일 라이더와 그 헬멧 판정 이력"""
+
+    def __init__(self, track_id: int, bbox: List[float]):
+        self.track_id = track_id
+        self.bbox = list(bbox)
+        self.misses = 0
+        self.hits = 1
+        self.last_checked_frame: Optional[int] = None
+        self.verdicts: deque = deque(maxlen=HELMET_VOTE_WINDOW)
+        self.last_result: Optional[Dict] = None
+        self._messages: Dict[str, str] = {}
+
+    def needs_check(self, frame_index: int) -> bool:
+        """헬멧 모델로 다시 판정해야 하는지 (판정 없음, K 프레임 경과, 최근 판정이 안정되지 않음)
+
+        헬멧 미감지 대체 판정이나 머리 위 item 판정은 신뢰도가 0 이므로, 신뢰도 대신
+        최근 HELMET_STABLE_VERDICTS 번의 판정이 모두 같은지로 재사용 여부를 정한다.
+        """
+        if self.last_checked_frame is None or not self.verdicts:
+            return True
+        if frame_index - self.last_checked_frame >= HELMET_RECHECK_INTERVAL:
+            return True
+        recent = list(self.verdicts)[-HELMET_STABLE_VERDICTS:]
+        return len(recent) < HELMET_STABLE_VERDICTS or len({status for status, _ in recent}) > 1
+
+    def add_verdict(self, helmet_result: Dict, frame_index: int):
+        """helmet_result_aggregation 결과를 판정 이력에 추가"""
+        status = helmet_result["status"]
+        confidence = helmet_result["helmet_confidence"] if status == "helmet" else helmet_result["no_helmet_confidence"]
+        self.verdicts.append((status, confidence))
+        self.last_checked_frame = frame_index
+        self.last_result = helmet_result
+        self._messages[status] = helmet_result["message"]
+
+    @property
+    def status(self) -> Optional[str]:
+        """최근 판정들의 신뢰도 가중 투표 결과"""
+        if not self.verdicts:
+            return None
+        votes = Counter()
+        for status, confidence in self.verdicts:
+            votes[status] += max(confidence, 1e-3)
+        return votes.most_common(1)[0][0]
+
+    def smoothed_result(self, cached: bool) -> Dict:
+        """투표로 보정한 헬멧 결과 (캐시 재사용 시 이전 프레임의 박스는 제외)"""
+        status = self.status
+        result = dict(self.last_result)
+        result["status"] = status
+        result["message"] = self._messages.get(status, result["message"])
+        result["helmet_on_head"] = status == "helmet"
+        result["cached"] = cached
+        if cached:
+            result["detections"] = []
+        return result
+
+
+class RiderTracker:
+    """IoU 기반 라이더 추적기 (ByteTrack 방식의 고/저 신뢰도 2단계 매칭)
+
+    스트림(연결)마다 하나씩 만들어 프레임 순서대로 update() 를 호출한다.
+    """
+
+    def __init__(self, iou_threshold: float = TRACK_IOU_THRESHOLD, max_misses: int = TRACK_MAX_MISSES,
+                 high_confidence: float = TRACK_HIGH_CONFIDENCE):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.high_confidence = high_confidence
+        self.frame_index = 0
+        self.tracks: List[RiderTrack] = []
+        self._next_id = 1
+        self._finished_status: Counter = Counter()
+        self.helmet_checks = 0
+        self.helmet_reuses = 0
+
+    def _match(self, track_indices: List[int], det_indices: List[int], iou: np.ndarray) -> List[tuple]:
+        """IoU 행렬의 부분 집합에 대해 최적 할당 후 임계값 이상인 쌍만 반환"""
+        if not track_indices or not det_indices:
+            return []
+        sub_iou = iou[np.ix_(track_indices, det_indices)]
+        rows, cols = linear_sum_assignment(-sub_iou)
+        return [(track_indices[r], det_indices[c]) for r, c in zip(rows, cols) if sub_iou[r, c] >= self.iou_threshold]
+
+    def update(self, riders: List[Dict]) -> List[RiderTrack]:
+        """현재 프레임의 라이더 감지 결과로 트랙을 갱신하고, 라이더별 트랙 반환"""
+        self.frame_index += 1
+        assigned: List[Optional[RiderTrack]] = [None] * len(riders)
+
+        if riders and self.tracks:
+            det_boxes = np.array([r["bbox"] for r in riders], dtype=np.float64)
+            track_boxes = np.array([t.bbox for t in self.tracks], dtype=np.float64)
+            iou = iou_matrix(track_boxes, det_boxes)
+
+            high = [i for i, r in enumerate(riders) if r["confidence"] >= self.high_confidence]
+            low = [i for i, r in enumerate(riders) if r["confidence"] < self.high_confidence]
+
+            # 1차: 고신뢰도 감지와 매칭, 2차: 남은 트랙을 저신뢰도 감지와 매칭
+            matches = self._match(list(range(len(self.tracks))), high, iou)
+            matched_tracks = {t for t, _ in matches}
+            remaining = [t for t in range(len(self.tracks)) if t not in matched_tracks]
+            matches += self._match(remaining, low, iou)
+
+            for t, d in matches:
+                track = self.tracks[t]
+                track.bbox = list(riders[d]["bbox"])
+                track.misses = 0
+                track.hits += 1
+                assigned[d] = track
+
+        # 매칭되지 않은 트랙은 미검출 횟수 증가, 한도를 넘으면 종료
+        matched = {id(t) for t in assigned if t is not None}
+        alive = []
+        for track in self.tracks:
+            if id(track) not in matched:
+                track.misses += 1
+            if track.misses > self.max_misses:
+                if track.status is not None:
+                    self._finished_status[track.status] += 1
+                continue
+            alive.append(track)
+        self.tracks = alive
+
+        # 매칭되지 않은 감지는 새 트랙으로 시작
+        for d, rider in enumerate(riders):
+            if assigned[d] is None:
+                track = RiderTrack(self._next_id, rider["bbox"])
+                self._next_id += 1
+                self.tracks.append(track)
+                assigned[d] = track
+
+        return assigned
+
+    def summary(self) -> Dict:
+        """라이더(트랙) 단위 누적 집계"""
+        status_counts = Counter(self._finished_status)
+        for track in self.tracks:
+            if track.status is not None:
+                status_counts[track.status] += 1
+        return {
+            "riders": self._next_id - 1,
+            "active_riders": len(self.tracks),
+            "helmet": status_counts.get("helmet", 0),
+            "no_helmet": status_counts.get("no_helmet", 0),
+            "helmet_checks": self.helmet_checks,
+            "helmet_reuses": self.helmet_reuses,
+        }
@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from config import LETTERBOX_COLOR, ROI_MASK_OUTSIDE, ROI_SOURCES
+from tiling import detect_tiled
+
+
+class RegionOfInterest:
+    """감지기를 실행할 관심 영역 (0~1 정규화 다각형) 과 감지기 입력 크기
+
+    crop() 은 다각형의 외접 사각형만 잘라내고 (mask_outside 이면 다각형 밖을 채움),
+    map_xyxy() 는 크롭 좌표의 박스를 전체 프레임 좌표로 되돌린다.
+    polygon 이 None 이면 전체 프레임을 그대로 사용한다. tiled 이면 크롭을 겹치는 타일로 나눠 감지한다.
+    """
+
+    def __init__(self, polygon: Optional[Sequence[Sequence[float]]] = None, imgsz: Optional[int] = None,
+                 mask_outside: bool = ROI_MASK_OUTSIDE, tiled: bool = False):
+        self.polygon = np.array(polygon, dtype=np.float64) if polygon is not None else None
+        self.imgsz = imgsz
+        self.tiled = tiled
+        self.mask_outside = mask_outside
+        # 프레임 크기별 (외접 사각형, 마스크) 캐시
+        self._cache: Dict[Tuple[int, int], Tuple[Tuple[int, int, int, int], Optional[np.ndarray]]] = {}
+
+    @property
+    def full_frame(self) -> bool:
+        return self.polygon is None
+
+    def predict_kwargs(self) -> Dict:
+        """모델 호출 시 추가할 인자 (입력 크기)"""
+        return {"imgsz": self.imgsz} if self.imgsz else {}
+
+    def _region(self, height: int, width: int):
+        region = self._cache.get((height, width))
+        if region is None:
+            points = np.round(self.polygon * [width, height]).astype(np.int32)
+            x, y, w, h = cv2.boundingRect(points)
+            x1, y1 = max(x, 0), max(y, 0)
+            x2, y2 = min(x + w, width), min(y + h, height)
+            mask = None
+            if self.mask_outside:
+                mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+                cv2.fillPoly(mask, [points - [x1, y1]], 1)
+                mask = mask.astype(bool)
+            region = ((x1, y1, x2, y2), mask)
+            self._cache[(height, width)] = region
+        return region
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """관심 영역 크롭과 (x, y) 오프셋 반환"""
+        if self.full_frame:
+            return frame, (0, 0)
+        (x1, y1, x2, y2), mask = self._region(*frame.shape[:2])
+        crop = frame[y1:y2, x1:x2]
+        if mask is not None:
+            crop = crop.copy()
+            crop[~mask] = LETTERBOX_COLOR
+        return crop, (x1, y1)
+
+    @staticmethod
+    def map_xyxy(xyxy, offset: Tuple[int, int]):
+        """(N, 4+) 박스 배열/텐서의 앞 4열을 제자리에서 전체 프레임 좌표로 이동"""
+        x, y = offset
+        if x or y:
+            xyxy[:, 0:4:2] += x
+            xyxy[:, 1:4:2] += y
+        return xyxy
+
+
+# 소스별 ROI 캐시
+_regions: Dict[str, RegionOfInterest] = {}
+
+
+def roi_for(*sources: Optional[str]) -> RegionOfInterest:
+    """ROI_SOURCES 에 설정된 첫 번째 소스의 ROI (없으면 전체 프레임)"""
+    for source in sources:
+        if source is not None and source in ROI_SOURCES:
+            region = _regions.get(source)
+            if region is None:
+                settings = ROI_SOURCES[source]
+                region = RegionOfInterest(settings.get("polygon"), settings.get("imgsz"),
+                                          tiled=settings.get("tiled", False))
+                _regions[source] = region
+            return region
+    return _regions.setdefault("", RegionOfInterest())
+
+
+def detect_in_roi(model, frames: List[np.ndarray], roi: RegionOfInterest, **kwargs) -> List:
+    """관심 영역만 감지기에 통과시키고 결과 박스를 전체 프레임 좌표로 변환한 Ultralytics 결과 목록"""
+    if not frames:
+        return []
+    crops, offsets = zip(*(roi.crop(frame) for frame in frames))
+    if roi.tiled:
+        results = detect_tiled(model, list(crops), **kwargs)
+    else:
+        results = list(model(list(crops), **roi.predict_kwargs(), **kwargs))
+    if roi.full_frame:
+        return results
+    for frame, result, offset in zip(frames, results, offsets):
+        # 추론 모드 텐서는 제자리 수정이 불가하므로 복사본을 이동
+        data = result.boxes.data
+        data = data.clone() if hasattr(data, "clone") else data.copy()
+        result.boxes.data = roi.map_xyxy(data, offset)
+        result.orig_shape = result.boxes.orig_shape = frame.shape[:2]
+    return results
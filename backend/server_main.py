@@ -1,9 +1,19 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 import cv2
-import base64
 import numpy as np
 from typing import Optional
 import asyncio
+import logging
+from config import CCTV_STREAM_URL, STREAM_SUBSCRIBER_DROP_POLICY
+from logging_setup import LogThrottle, setup_logging
+from stream_hub import StreamHub
+from stream_session import StreamSession
+from ws_protocol import BINARY_SUBPROTOCOL, EncodedFrame, negotiate_subprotocol
+
+setup_logging()
+logger = logging.getLogger(__name__)
+# 읽기 시간 초과마다 반복되는 경고는 일정 간격으로만 기록
+log_throttle = LogThrottle()
 
 app = FastAPI()
 
@@ -34,7 +44,10 @@ webcam = WebcamStream()
 
 @app.websocket("/ws/webcam")
 async def webcam_endpoint(websocket: WebSocket):
-    await websocket.accept()
+    # 서브프로토콜 협상: helmet.binary.v1 이면 JPEG 바이트 + 메타데이터 헤더, 아니면 base64 텍스트
+    subprotocol = negotiate_subprotocol(websocket)
+    await websocket.accept(subprotocol=subprotocol)
+    binary = subprotocol == BINARY_SUBPROTOCOL
     
     try:
         # 웹캠 시작
@@ -43,50 +56,54 @@ async def webcam_endpoint(websocket: WebSocket):
             await websocket.close()
             return
 
+        frame_id = 0
         while True:
             ret, frame = cap.read()
             if not ret:
                 break
 
-            # 이미지를 base64로 인코딩
+            # 이미지를 JPEG 로 인코딩
             _, buffer = cv2.imencode('.jpg', frame)
-            encoded_frame = base64.b64encode(buffer).decode('utf-8')
+            frame_id += 1
             
             # 클라이언트로 스트림 전송
-            await websocket.send_text(encoded_frame)
+            await EncodedFrame(buffer.tobytes(), {"frame_id": frame_id}).send(websocket, binary)
             
             # 프레임 레이트 조절 (30 FPS)
             await asyncio.sleep(1/30)
             
     except WebSocketDisconnect:
-        print("클라이언트 연결 종료")
+        logger.info("클라이언트 연결 종료")
     finally:
         cap.release()
 
+async def encode_stream_frame(session: StreamSession, last_frame_id: int):
+    """세션의 최신 프레임을 JPEG 로 인코딩"""
+    frame_id, frame = await asyncio.to_thread(session.read, last_frame_id)
+    if frame is None:
+        log_throttle.log(logger, logging.WARNING, f"stream_read:{session.active_source}",
+                         "영상 수신 실패: %s", session.active_source)
+        return last_frame_id, None
+    _, buffer = cv2.imencode('.jpg', frame)
+    return frame_id, EncodedFrame(buffer.tobytes(), {"frame_id": frame_id})
+
+# 소스별 단일 캡처/인코딩 루프를 모든 /ws/stream 클라이언트가 공유
+stream_hub = StreamHub(encode_stream_frame)
+
 @app.websocket("/ws/stream")
 async def websocket_endpoint(websocket: WebSocket):
     # 클라이언트 연결
-    await websocket.accept()
+    subprotocol = negotiate_subprotocol(websocket)
+    await websocket.accept(subprotocol=subprotocol)
     
     # CCTV 실시간 스트리밍 URL (예시)
-    url = "https://kbscctv-cache.loomex.net/lowStream/_definst_/9999_low.stream/chunklist.m3u8"
-    cap = cv2.VideoCapture(url)
-
-    if not cap.isOpened():
-        print("스트림 열기 실패")
-        return
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("영상 수신 실패")
-            break
-
-        # 이미지를 base64로 인코딩
-        _, buffer = cv2.imencode('.jpg', frame)
-        encoded_frame = base64.b64encode(buffer).decode('utf-8')
-
-        # 클라이언트로 이미지를 전송
-        await websocket.send_text(encoded_frame)
+    url = CCTV_STREAM_URL
+    drop_policy = websocket.query_params.get("drop_policy", STREAM_SUBSCRIBER_DROP_POLICY)
 
-    cap.release()
+    try:
+        await stream_hub.stream_to(websocket, url, drop_policy=drop_policy,
+                                   binary=subprotocol == BINARY_SUBPROTOCOL)
+    except WebSocketDisconnect:
+        logger.info("클라이언트 연결 종료")
+    except Exception as e:
+        logger.warning("스트림 오류: %s", e)
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from config import STREAM_FPS_SMOOTHING, STREAM_SUBSCRIBER_DROP_POLICY, STREAM_SUBSCRIBER_QUEUE_SIZE
+from stream_session import StreamSession, acquire_session, release_session
+from ws_protocol import EncodedFrame
+
+logger = logging.getLogger(__name__)
+
+# 느린 구독자 처리 정책
+DROP_OLDEST = "drop_oldest"  # 가장 오래된 대기 프레임을 버리고 새 프레임 추가
+DROP_NEWEST = "drop_newest"  # 대기열이 가득 차면 새 프레임을 버림
+DISCONNECT = "disconnect"    # 대기열이 가득 차면 구독 해제
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+# (세션, 마지막 프레임 ID) -> (새 프레임 ID, 전송할 프레임), 프레임이 None 이면 전송하지 않음
+FrameProcessor = Callable[[StreamSession, int], Awaitable[Tuple[int, Optional[EncodedFrame]]]]
+
+
+class Subscriber:
+    """구독자별 제한된 전송 대기열"""
+
+    def __init__(self, drop_policy: str = STREAM_SUBSCRIBER_DROP_POLICY,
+                 queue_size: int = STREAM_SUBSCRIBER_QUEUE_SIZE):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"지원되지 않는 드롭 정책입니다: {drop_policy}")
+        self.drop_policy = drop_policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, payload) -> bool:
+        """페이로드를 대기열에 넣고, 구독을 유지해야 하면 True 반환"""
+        if self.closed:
+            return False
+        if self.queue.full():
+            self.dropped += 1
+            if self.drop_policy == DROP_NEWEST:
+                return True
+            if self.drop_policy == DISCONNECT:
+                self.close()
+                return False
+            self.queue.get_nowait()
+        self.queue.put_nowait(payload)
+        return True
+
+    def close(self):
+        """대기 중인 get() 을 깨우고 구독 종료 표시"""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self):
+        """다음 페이로드 반환, 구독이 종료되면 None"""
+        payload = await self.queue.get()
+        return None if self.closed else payload
+
+
+class StreamBroadcast:
+    """소스 하나에 대한 단일 캡처/추론 루프와 구독자 목록"""
+
+    def __init__(self, sources: Tuple[str, ...], processor: FrameProcessor, interval: float):
+        self.sources = sources
+        self.processor = processor
+        self.interval = interval
+        self.subscribers: Set[Subscriber] = set()
+        self.frames_broadcast = 0
+        # 브로드캐스트 FPS (프레임 간격의 지수 이동 평균)
+        self.fps = 0.0
+        self._last_broadcast: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscriber in list(self.subscribers):
+            subscriber.close()
+
+    def _update_fps(self):
+        now = time.monotonic()
+        if self._last_broadcast is not None and now > self._last_broadcast:
+            fps = 1.0 / (now - self._last_broadcast)
+            self.fps = fps if not self.fps else self.fps + STREAM_FPS_SMOOTHING * (fps - self.fps)
+        self._last_broadcast = now
+
+    async def _run(self):
+        session = acquire_session(*self.sources)
+        logger.info("스트림 허브 시작: %s", self.sources[0])
+        try:
+            last_frame_id = 0
+            while True:
+                # 소스당 한 번만 디코딩/추론/인코딩
+                last_frame_id, payload = await self.processor(session, last_frame_id)
+                if payload is not None:
+                    self.frames_broadcast += 1
+                    self._update_fps()
+                    for subscriber in list(self.subscribers):
+                        if not subscriber.offer(payload):
+                            self.subscribers.discard(subscriber)
+                if self.interval:
+                    await asyncio.sleep(self.interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("스트림 허브 오류 (%s): %s", self.sources[0], e)
+            for subscriber in list(self.subscribers):
+                subscriber.close()
+        finally:
+            release_session(session)
+            logger.info("스트림 허브 종료: %s", self.sources[0])
+
+
+class StreamHub:
+    """소스 URL 별로 캡처/추론을 한 번만 수행하고 모든 구독 소켓에 브로드캐스트"""
+
+    def __init__(self, processor: FrameProcessor, interval: float = 0):
+        self.processor = processor
+        self.interval = interval
+        self._broadcasts: Dict[str, StreamBroadcast] = {}
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, source: str, *fallback_sources: str,
+                        drop_policy: str = STREAM_SUBSCRIBER_DROP_POLICY) -> Subscriber:
+        """소스 구독, 첫 구독자이면 브로드캐스트 루프 시작"""
+        subscriber = Subscriber(drop_policy)
+        async with self._lock:
+            broadcast = self._broadcasts.get(source)
+            if broadcast is None or not broadcast.is_alive:
+                broadcast = StreamBroadcast((source,) + fallback_sources, self.processor, self.interval)
+                self._broadcasts[source] = broadcast
+                broadcast.start()
+            broadcast.subscribers.add(subscriber)
+        return subscriber
+
+    async def unsubscribe(self, source: str, subscriber: Subscriber):
+        """구독 해제, 마지막 구독자이면 브로드캐스트 루프 종료"""
+        async with self._lock:
+            broadcast = self._broadcasts.get(source)
+            if broadcast is None:
+                return
+            broadcast.subscribers.discard(subscriber)
+            if broadcast.subscribers:
+                return
+            del self._broadcasts[source]
+        await broadcast.stop()
+
+    async def stream_to(self, websocket, source: str, *fallback_sources: str,
+                        drop_policy: str = STREAM_SUBSCRIBER_DROP_POLICY, binary: bool = False):
+        """구독한 프레임(EncodedFrame)을 WebSocket 으로 전송 (연결이 끊기거나 구독이 해제될 때까지)
+
+        binary 이면 바이너리 프로토콜 메시지로, 아니면 base64 텍스트로 전송한다.
+        """
+        subscriber = await self.subscribe(source, *fallback_sources, drop_policy=drop_policy)
+        try:
+            while True:
+                payload = await subscriber.get()
+                if payload is None:
+                    break
+                await payload.send(websocket, binary)
+        finally:
+            await self.unsubscribe(source, subscriber)
+
+    def stats(self) -> Dict[str, Dict]:
+        """소스별 구독자 수, 브로드캐스트 FPS, 대기 프레임 수와 드롭 통계"""
+        return {
+            source: {
+                "subscribers": len(broadcast.subscribers),
+                "frames_broadcast": broadcast.frames_broadcast,
+                "fps": round(broadcast.fps, 2),
+                "queued": sum(s.queue.qsize() for s in broadcast.subscribers),
+                "dropped": sum(s.dropped for s in broadcast.subscribers),
+            }
+            for source, broadcast in self._broadcasts.items()
+        }
@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import (
+    STREAM_RECONNECT_INITIAL_DELAY,
+    STREAM_RECONNECT_MAX_DELAY,
+    STREAM_READ_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StreamSession:
+    """스트림별 장기 실행 디코더 세션
+
+    캡처 객체를 한 번만 열고 백그라운드 스레드에서 계속 프레임을 읽어
+    최신 프레임 슬롯 하나에만 보관한다. 소비자가 가져가기 전에 새 프레임이
+    도착하면 이전 프레임은 버려진다 (dropped_frames 로 집계).
+    연결이 끊기면 지수 백오프로 재연결하고, 로컬 파일은 끝에서 처음으로 되감아
+    반복 재생하므로 HLS 소스 대신 로컬 비디오로 테스트할 수 있다.
+    """
+
+    def __init__(self, sources: List[str], loop_files: bool = True,
+                 reconnect_initial_delay: float = STREAM_RECONNECT_INITIAL_DELAY,
+                 reconnect_max_delay: float = STREAM_RECONNECT_MAX_DELAY):
+        self.sources = list(sources)
+        self.loop_files = loop_files
+        self.reconnect_initial_delay = reconnect_initial_delay
+        self.reconnect_max_delay = reconnect_max_delay
+
+        self.active_source: Optional[str] = None
+        self.dropped_frames = 0
+        self.reconnects = 0
+
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_id = 0
+        self._frame_consumed = True
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """백그라운드 읽기 스레드 시작"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"stream-session:{self.sources[0]}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """읽기 스레드 종료 및 캡처 해제"""
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def read(self, last_frame_id: int = 0, timeout: float = STREAM_READ_TIMEOUT) -> Tuple[int, Optional[np.ndarray]]:
+        """last_frame_id 보다 새로운 최신 프레임을 기다려 (frame_id, frame) 반환
+
+        timeout 안에 새 프레임이 없으면 (last_frame_id, None) 을 반환한다.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._frame_id <= last_frame_id and not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return last_frame_id, None
+                self._cond.wait(remaining)
+            if self._frame_id <= last_frame_id:
+                return last_frame_id, None
+            self._frame_consumed = True
+            return self._frame_id, self._frame
+
+    def _publish(self, frame: np.ndarray):
+        with self._cond:
+            if not self._frame_consumed:
+                self.dropped_frames += 1
+            self._frame = frame
+            self._frame_id += 1
+            self._frame_consumed = False
+            self._cond.notify_all()
+
+    def _open(self) -> Optional[cv2.VideoCapture]:
+        """소스 목록을 순서대로 시도하여 열린 캡처 반환"""
+        for source in self.sources:
+            cap = cv2.VideoCapture(source)
+            if cap.isOpened():
+                if source != self.active_source:
+                    logger.info("스트림 소스 연결: %s", source)
+                self.active_source = source
+                return cap
+            cap.release()
+            logger.warning("스트림 소스를 열 수 없습니다: %s", source)
+        return None
+
+    def _run(self):
+        delay = self.reconnect_initial_delay
+        while not self._stop_event.is_set():
+            cap = self._open()
+            if cap is None:
+                # 지수 백오프 후 재연결
+                self._stop_event.wait(delay)
+                delay = min(delay * 2, self.reconnect_max_delay)
+                continue
+
+            try:
+                frames = self._read_loop(cap)
+            finally:
+                cap.release()
+
+            # 프레임을 하나 이상 읽었을 때만 백오프 초기화 (열리지만 첫 읽기부터 실패하는 소스는 계속 늘림)
+            if frames:
+                delay = self.reconnect_initial_delay
+            if not self._stop_event.is_set():
+                self.reconnects += 1
+                logger.info("스트림 재연결 시도 (%d회): %s", self.reconnects, self.active_source)
+                self._stop_event.wait(delay)
+                delay = min(delay * 2, self.reconnect_max_delay)
+
+    def _read_loop(self, cap: cv2.VideoCapture) -> int:
+        """읽기에 실패하거나 중지될 때까지 프레임을 게시하고 읽은 프레임 수 반환"""
+        frames = 0
+        is_file = os.path.isfile(self.active_source)
+        # 로컬 파일은 디코딩 속도가 아닌 원본 FPS 로 재생
+        fps = cap.get(cv2.CAP_PROP_FPS) if is_file else 0
+        frame_interval = 1.0 / fps if fps and fps > 0 else 0
+        next_frame_at = time.monotonic()
+
+        while not self._stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                if is_file and self.loop_files and cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+                    ret, frame = cap.read()
+                if not ret:
+                    logger.warning("영상 수신 실패: %s", self.active_source)
+                    return frames
+
+            self._publish(frame)
+            frames += 1
+
+            if frame_interval:
+                next_frame_at += frame_interval
+                sleep_for = next_frame_at - time.monotonic()
+                if sleep_for > 0:
+                    self._stop_event.wait(sleep_for)
+                else:
+                    next_frame_at = time.monotonic()
+        return frames
+
+
+# 소스별 공유 세션 (참조 카운트로 수명 관리)
+_sessions: Dict[Tuple[str, ...], StreamSession] = {}
+_session_refs: Dict[Tuple[str, ...], int] = {}
+_sessions_lock = threading.Lock()
+
+
+def acquire_session(*sources: str) -> StreamSession:
+    """소스 목록에 대한 세션을 가져오거나 생성하여 시작"""
+    key = tuple(sources)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = StreamSession(list(sources))
+            _sessions[key] = session
+            _session_refs[key] = 0
+        _session_refs[key] += 1
+        session.start()
+        return session
+
+
+def release_session(session: StreamSession):
+    """세션 참조 해제, 마지막 참조가 사라지면 세션 종료"""
+    key = tuple(session.sources)
+    with _sessions_lock:
+        if _sessions.get(key) is not session:
+            return
+        _session_refs[key] -= 1
+        if _session_refs[key] > 0:
+            return
+        del _sessions[key]
+        del _session_refs[key]
+    session.stop()
+
+
+if __name__ == "__main__":
+    # 로컬 반복 비디오 파일 또는 HLS URL 로 세션 동작 확인
+    import sys
+
+    from logging_setup import setup_logging
+
+    setup_logging()
+    session = acquire_session(*sys.argv[1:])
+    last_id, received, started = 0, 0, time.monotonic()
+    try:
+        while time.monotonic() - started < 10:
+            last_id, frame = session.read(last_id)
+            if frame is not None:
+                received += 1
+        elapsed = time.monotonic() - started
+        print(f"소스: {session.active_source}, 수신 {received}프레임 ({received / elapsed:.1f} FPS), "
+              f"버려진 프레임 {session.dropped_frames}, 재연결 {session.reconnects}회")
+    finally:
+        release_session(session)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend 모듈(config, main 등)을 최상위 모듈로 가져오도록 backend 디렉토리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
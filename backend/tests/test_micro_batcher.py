@@ -0,0 +1,77 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+def image_size(img: np.ndarray):
+    return img.shape[:2]
+
+
+def padded_infer(calls):
+    """Ultralytics 처럼 크기가 섞인 배치는 가장 큰 변의 정사각형으로 패딩한 뒤 추론하는 가짜 모델"""
+    def infer(imgs):
+        calls.append([img.shape[:2] for img in imgs])
+        if len({img.shape for img in imgs}) == 1:
+            side = None
+        else:
+            side = max(max(img.shape[:2]) for img in imgs)
+        # 입력 크기(패딩 포함)에 따라 값이 달라지는 결과
+        return [(img.sum(), side or img.shape[:2]) for img in imgs]
+    return infer
+
+
+async def submit_all(batcher, imgs):
+    try:
+        return await asyncio.gather(*(batcher.submit(img) for img in imgs))
+    finally:
+        await batcher.stop()
+
+
+def frames():
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, shape, dtype=np.uint8)
+            for shape in [(360, 640, 3), (480, 480, 3), (360, 640, 3), (720, 1280, 3), (480, 480, 3)]]
+
+
+def test_batched_output_equals_solo_output():
+    imgs = frames()
+    solo = [padded_infer([])([img])[0] for img in imgs]
+
+    calls = []
+    batcher = MicroBatcher(padded_infer(calls), model="test", max_batch_size=len(imgs), max_wait_ms=50,
+                           group_key=image_size)
+    batched = asyncio.run(submit_all(batcher, imgs))
+
+    assert batched == solo
+    # 크기가 섞인 호출은 없어야 함
+    assert all(len(set(shapes)) == 1 for shapes in calls)
+    assert sorted(len(shapes) for shapes in calls) == [1, 2, 2]
+
+
+def test_mixed_shapes_change_results_without_grouping():
+    imgs = frames()
+    solo = [padded_infer([])([img])[0] for img in imgs]
+    batcher = MicroBatcher(padded_infer([]), model="test", max_batch_size=len(imgs), max_wait_ms=50)
+    assert asyncio.run(submit_all(batcher, imgs)) != solo
+
+
+def test_batched_yolo_boxes_equal_solo_boxes():
+    torch = pytest.importorskip("torch")
+    ultralytics = pytest.importorskip("ultralytics")
+    torch.manual_seed(0)
+    model = ultralytics.YOLO("yolo11n.yaml")
+
+    def detect(batch):
+        return [result.boxes.data.cpu() for result in model(batch, conf=0.0, verbose=False)]
+
+    imgs = frames()[:3]
+    solo = [detect([img])[0] for img in imgs]
+    batcher = MicroBatcher(detect, model="test", max_batch_size=len(imgs), max_wait_ms=50, group_key=image_size)
+    batched = asyncio.run(submit_all(batcher, imgs))
+
+    for a, b in zip(solo, batched):
+        assert a.shape == b.shape
+        assert torch.allclose(a, b, atol=1e-3)
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("ultralytics")
+
+import model_registry
+from model_registry import ModelRegistry
+
+
+class FakeModel:
+    names = {0: "helmet"}
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.refs_during_call = None
+
+    def __call__(self, *args, **kwargs):
+        self.refs_during_call = self.registry.status()["models"][0]["refs"]
+        return []
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ModelRegistry({"helmet": "models/helmet.pt"}, {}, {})
+    monkeypatch.setattr(model_registry, "open_model",
+                        lambda name, path, backend, precision: (FakeModel(registry), "torch", "fp32", None))
+    return registry
+
+
+def refs(registry):
+    return registry.status()["models"][0]["refs"]
+
+
+def test_handle_holds_ref_only_during_inference(registry):
+    handle = registry.get("helmet")
+    assert refs(registry) == 0
+
+    handle("frame")
+    model = registry.load("helmet").model
+    assert model.refs_during_call == 1
+    assert refs(registry) == 0
+    assert registry.unload("helmet")
+    assert not registry.is_loaded("helmet")
+
+    # 해제 후 다음 호출에서 다시 로드
+    handle("frame")
+    assert registry.is_loaded("helmet")
+
+
+def test_acquired_handle_blocks_unload_until_released(registry):
+    registry.acquire("helmet")("frame")
+    assert not registry.unload("helmet")
+    registry.release("helmet")
+    assert registry.unload("helmet")
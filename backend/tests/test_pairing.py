@@ -0,0 +1,87 @@
+from config import DISTANT_MOTORCYCLE_SIZE, DISTANT_MOTORCYCLE_SIZE_FACTOR, MOTORCYCLE_RIDER_CAPACITY, \
+    RIDER_MOTORCYCLE_PAIRING_THRESHOLD
+from detections import Detections
+from pairing import rider_motorcycle_pairing
+
+
+def box(cx: float, cy: float, w: float, h: float):
+    return [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2]
+
+
+def detection(class_name: str, bbox):
+    return {"bbox": bbox, "confidence": 0.9, "class": class_name, "model": "yolov11n"}
+
+
+def pair(*detections):
+    return rider_motorcycle_pairing(Detections.from_dicts(list(detections)))
+
+
+def paired_boxes(pairs):
+    return [(p["rider"]["bbox"], p["motorcycle"]["bbox"]) for p in pairs]
+
+
+# 200px 오토바이: 페어링 거리 임계값 0.6 * 200 = 120px
+MOTO = box(500, 500, 200, 200)
+
+
+def test_two_riders_share_one_motorcycle():
+    driver = box(500, 480, 60, 150)
+    passenger = box(500, 440, 60, 150)
+    pairs = pair(detection("motorcycle", MOTO), detection("person", passenger), detection("person", driver))
+
+    assert MOTORCYCLE_RIDER_CAPACITY == 2
+    # 가까운 라이더부터
+    assert paired_boxes(pairs) == [(driver, MOTO), (passenger, MOTO)]
+
+
+def test_third_rider_is_rejected():
+    near, middle, far = box(500, 490, 60, 150), box(500, 450, 60, 150), box(500, 410, 60, 150)
+    pairs = pair(detection("motorcycle", MOTO), detection("person", far), detection("person", near),
+                 detection("person", middle))
+
+    assert len(pairs) == MOTORCYCLE_RIDER_CAPACITY
+    assert [p["rider"]["bbox"] for p in pairs] == [near, middle]
+
+
+def test_small_motorcycle_uses_relaxed_threshold():
+    size = DISTANT_MOTORCYCLE_SIZE - 20
+    small = box(500, 500, size, size)
+    relaxed = RIDER_MOTORCYCLE_PAIRING_THRESHOLD * size * DISTANT_MOTORCYCLE_SIZE_FACTOR
+    base = RIDER_MOTORCYCLE_PAIRING_THRESHOLD * size
+
+    # 기본 임계값보다 멀지만 완화된 임계값 안쪽의 라이더는 페어링
+    inside = box(500, 500 - (base + relaxed) / 2, 30, 60)
+    assert paired_boxes(pair(detection("motorcycle", small), detection("person", inside))) == [(inside, small)]
+
+    # 완화된 임계값 밖은 페어링하지 않음
+    outside = box(500, 500 - relaxed - 5, 30, 60)
+    assert pair(detection("motorcycle", small), detection("person", outside)) == []
+
+
+def test_size_factor_does_not_apply_to_large_motorcycles():
+    base = RIDER_MOTORCYCLE_PAIRING_THRESHOLD * 200
+    rider = box(500, 500 - base - 5, 60, 150)
+    assert pair(detection("motorcycle", MOTO), detection("person", rider)) == []
+
+
+def test_competing_motorcycles_get_nearest_rider():
+    # 먼저 나온 오토바이도 임계값 안이지만, 라이더는 더 가까운 두 번째 오토바이와 페어링
+    first = box(500, 500, 200, 200)
+    second = box(620, 500, 200, 200)
+    rider = box(590, 480, 60, 150)
+    pairs = pair(detection("motorcycle", first), detection("motorcycle", second), detection("person", rider))
+
+    assert paired_boxes(pairs) == [(rider, second)]
+
+
+def test_assignment_maximizes_pairs_over_nearest_choice():
+    # 정원을 채운 가까운 오토바이 대신 멀지만 가능한 오토바이로 세 번째 라이더를 보냄
+    first = box(500, 500, 200, 200)
+    second = box(650, 500, 200, 200)
+    riders = [box(560, 480, 60, 150), box(560, 470, 60, 150), box(575, 475, 60, 150)]
+    pairs = pair(detection("motorcycle", first), detection("motorcycle", second),
+                 *(detection("person", r) for r in riders))
+
+    assert len(pairs) == 3
+    per_motorcycle = [sum(p["motorcycle"]["bbox"] == m for p in pairs) for m in (first, second)]
+    assert max(per_motorcycle) <= MOTORCYCLE_RIDER_CAPACITY
@@ -0,0 +1,47 @@
+from config import HELMET_RECHECK_INTERVAL, HELMET_STABLE_VERDICTS
+from rider_tracker import RiderTracker, RiderTrack
+
+RIDER = {"bbox": [100.0, 100.0, 200.0, 300.0], "confidence": 0.9}
+
+
+def verdict(status: str, confidence: float = 0.0):
+    return {
+        "status": status,
+        "helmet_confidence": confidence if status == "helmet" else 0.0,
+        "no_helmet_confidence": confidence if status == "no_helmet" else 0.0,
+        "message": status,
+    }
+
+
+def run_stream(statuses):
+    """같은 위치의 라이더가 계속 보이는 스트림에서 헬멧 모델을 실행한 프레임 번호 목록"""
+    tracker = RiderTracker()
+    checked = []
+    for status in statuses:
+        (track,) = tracker.update([RIDER])
+        if track.needs_check(tracker.frame_index):
+            checked.append(tracker.frame_index)
+            track.add_verdict(verdict(status), tracker.frame_index)
+    return checked
+
+
+def test_stable_zero_confidence_verdict_is_reused_until_interval():
+    for status in ("no_helmet", "helmet"):
+        checked = run_stream([status] * (HELMET_STABLE_VERDICTS + HELMET_RECHECK_INTERVAL + 1))
+        stable_at = HELMET_STABLE_VERDICTS
+        assert checked == list(range(1, stable_at + 1)) + [stable_at + HELMET_RECHECK_INTERVAL]
+
+
+def test_disagreeing_verdicts_are_rechecked_next_frame():
+    track = RiderTrack(1, RIDER["bbox"])
+    track.add_verdict(verdict("helmet", 0.9), 1)
+    track.add_verdict(verdict("no_helmet"), 2)
+    assert track.needs_check(3)
+
+    for frame in range(3, 3 + HELMET_STABLE_VERDICTS):
+        track.add_verdict(verdict("no_helmet"), frame)
+    assert not track.needs_check(3 + HELMET_STABLE_VERDICTS)
+
+
+def test_new_track_is_checked():
+    assert RiderTrack(1, RIDER["bbox"]).needs_check(1)
@@ -0,0 +1,60 @@
+import numpy as np
+
+import stream_session
+from stream_session import StreamSession
+
+
+class FakeCapture:
+    """열리지만 reads 에 정한 결과만 돌려주는 캡처 (없으면 읽기 실패)"""
+
+    def __init__(self, reads):
+        self.reads = list(reads)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.reads and self.reads.pop(0):
+            return True, np.zeros((2, 2, 3), dtype=np.uint8)
+        return False, None
+
+    def get(self, prop):
+        return 0
+
+    def release(self):
+        pass
+
+
+class RecordingEvent:
+    """wait 호출 시간을 기록하고 limit 번 이후 중지"""
+
+    def __init__(self, limit):
+        self.waits = []
+        self.limit = limit
+
+    def is_set(self):
+        return len(self.waits) >= self.limit
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        return self.is_set()
+
+
+def run_session(monkeypatch, captures, limit):
+    captures = iter(captures)
+    monkeypatch.setattr(stream_session.cv2, "VideoCapture", lambda source: next(captures))
+    session = StreamSession(["rtsp://dead"], reconnect_initial_delay=0.5, reconnect_max_delay=8)
+    session._stop_event = RecordingEvent(limit)
+    session._run()
+    return session._stop_event.waits
+
+
+def test_open_but_unreadable_source_backs_off(monkeypatch):
+    waits = run_session(monkeypatch, (FakeCapture([]) for _ in range(6)), limit=6)
+    assert waits == [0.5, 1, 2, 4, 8, 8]
+
+
+def test_delay_resets_after_a_frame_is_read(monkeypatch):
+    captures = [FakeCapture([]), FakeCapture([]), FakeCapture([True]), FakeCapture([])]
+    waits = run_session(monkeypatch, captures, limit=4)
+    assert waits == [0.5, 1, 0.5, 1]
@@ -0,0 +1,31 @@
+import pytest
+
+from ws_protocol import pack_message, parse_flag, unpack_message, unpack_text_message
+
+
+@pytest.mark.parametrize("value", [True, 1, "1", "true", "True", "yes"])
+def test_parse_flag_true(value):
+    assert parse_flag(value, "timings") is True
+
+
+@pytest.mark.parametrize("value", [False, 0, "0", "false", "FALSE", "no"])
+def test_parse_flag_false(value):
+    assert parse_flag(value, "timings") is False
+
+
+@pytest.mark.parametrize("value", ["maybe", "", 2, None, [], {}])
+def test_parse_flag_rejects_non_boolean(value):
+    with pytest.raises(ValueError, match="Invalid timings flag"):
+        parse_flag(value, "timings")
+
+
+def test_binary_metadata_timings_string_false_is_false():
+    metadata, payload = unpack_message(pack_message({"timings": "false"}, b"jpeg"))
+    assert payload == b"jpeg"
+    assert parse_flag(metadata["timings"], "timings") is False
+
+
+@pytest.mark.parametrize("message", ['{"render": "none"}', '{"image": 3}', "no-comma"])
+def test_malformed_text_message_raises_value_error(message):
+    with pytest.raises(ValueError):
+        unpack_text_message(message)
@@ -0,0 +1,91 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from config import TILE_INCLUDE_FULL_FRAME, TILE_NMS_METRIC, TILE_NMS_THRESHOLD, TILE_OVERLAP, TILE_SIZE
+from detections import _to_numpy
+
+
+@lru_cache(maxsize=32)
+def tile_windows(height: int, width: int, tile_size: int = TILE_SIZE,
+                 overlap: float = TILE_OVERLAP) -> Tuple[Tuple[int, int, int, int], ...]:
+    """프레임을 덮는 겹치는 타일 좌표 (x1, y1, x2, y2), 마지막 타일은 프레임 안쪽으로 당겨 크기를 유지"""
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length: int) -> List[int]:
+        if length <= tile_size:
+            return [0]
+        return list(range(0, length - tile_size, step)) + [length - tile_size]
+
+    return tuple((x, y, min(x + tile_size, width), min(y + tile_size, height))
+                 for y in starts(height) for x in starts(width))
+
+
+def overlap_matrix(boxes: np.ndarray, metric: str = TILE_NMS_METRIC) -> np.ndarray:
+    """(N, 4) 박스 쌍의 겹침 행렬 (iou: 교집합/합집합, ios: 교집합/작은 박스 면적)"""
+    x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    if metric == "ios":
+        denominator = np.minimum(area[:, None], area[None, :])
+    else:
+        denominator = area[:, None] + area[None, :] - inter
+    return inter / np.maximum(denominator, 1e-9)
+
+
+def class_nms(data: np.ndarray, threshold: float = TILE_NMS_THRESHOLD, metric: str = TILE_NMS_METRIC) -> np.ndarray:
+    """클래스별 NMS (Ultralytics 박스 배열: 앞 4열 xyxy, 끝에서 두 번째 conf, 마지막 cls)"""
+    if len(data) < 2:
+        return data
+    data = data[np.argsort(-data[:, -2])]
+    overlap = overlap_matrix(data[:, :4], metric)
+    same_class = data[:, -1][:, None] == data[:, -1][None, :]
+    suppress = np.triu(same_class & (overlap >= threshold), k=1)
+
+    keep = np.ones(len(data), dtype=bool)
+    for i in range(len(data)):
+        if keep[i]:
+            keep[suppress[i]] = False
+    return data[keep]
+
+
+def detect_tiled(model, frames: List[np.ndarray], tile_size: int = TILE_SIZE, overlap: float = TILE_OVERLAP,
+                 include_full_frame: bool = TILE_INCLUDE_FULL_FRAME, **kwargs) -> List:
+    """겹치는 타일로 나눈 프레임을 한 번의 배치로 감지하고 타일 간 NMS 로 합친 Ultralytics 결과 목록
+
+    모든 프레임의 타일(그리고 include_full_frame 이면 축소한 전체 프레임)을 tile_size 입력으로 한 번에
+    추론하여, 전체 프레임 추론에서 놓치는 멀리 있는 작은 객체도 원본 해상도로 감지한다.
+    """
+    crops, owners, offsets = [], [], []
+    for index, frame in enumerate(frames):
+        windows = tile_windows(*frame.shape[:2], tile_size, overlap)
+        for x1, y1, x2, y2 in windows:
+            crops.append(frame[y1:y2, x1:x2])
+            owners.append(index)
+            offsets.append((x1, y1))
+        if include_full_frame and len(windows) > 1:
+            crops.append(frame)
+            owners.append(index)
+            offsets.append((0, 0))
+
+    results = list(model(crops, imgsz=tile_size, **kwargs)) if crops else []
+
+    merged = [[] for _ in frames]
+    base = [None] * len(frames)
+    for result, owner, (x, y) in zip(results, owners, offsets):
+        data = _to_numpy(result.boxes.data)
+        data[:, 0:4:2] += x
+        data[:, 1:4:2] += y
+        merged[owner].append(data)
+        if base[owner] is None:
+            base[owner] = result
+
+    # 프레임마다 첫 타일의 결과 객체에 합친 박스를 담아 반환
+    for frame, result, parts in zip(frames, base, merged):
+        result.boxes.data = class_nms(np.concatenate(parts))
+        result.orig_shape = result.boxes.orig_shape = frame.shape[:2]
+    return base
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import VIDEO_JOB_DB_PATH, VIDEO_JOB_DIR, VIDEO_JOB_PROGRESS_INTERVAL, VIDEO_JOB_WORKERS
+from gpt_video import VideoProcessingCancelled, process_video_file
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobStore:
+    """비디오 작업 상태를 보관하는 로컬 SQLite 저장소 (재시작 후에도 유지)"""
+
+    def __init__(self, path: str = VIDEO_JOB_DB_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    input_path TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    frames_done INTEGER NOT NULL DEFAULT 0,
+                    total_frames INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    error TEXT
+                )
+            """)
+
+    def create(self, job_id: str, filename: str, input_path: str, params: Dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO video_jobs (id, status, filename, input_path, params, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, filename, input_path, json.dumps(params), time.time()),
+            )
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE video_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM video_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, statuses: Optional[List[str]] = None) -> List[Dict]:
+        query, args = "SELECT * FROM video_jobs", ()
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+            args = tuple(statuses)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at", args).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class VideoJobManager:
+    """업로드된 비디오를 제한된 워커 풀에서 백그라운드로 처리하는 작업 관리자"""
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = VIDEO_JOB_WORKERS):
+        self.store = store or JobStore()
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._cancel_events: Dict[str, threading.Event] = {}
+        os.makedirs(VIDEO_JOB_DIR, exist_ok=True)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="video-job")
+        return self._pool
+
+    def new_input_path(self, job_id: str, filename: str) -> str:
+        """작업 입력 파일 경로 (처리가 끝날 때까지 보관하여 재시작 시 재처리)"""
+        return os.path.join(VIDEO_JOB_DIR, f"{job_id}{os.path.splitext(filename)[1] or '.mp4'}")
+
+    def submit(self, job_id: str, filename: str, input_path: str, params: Dict) -> str:
+        """작업 등록 후 즉시 작업 ID 반환"""
+        self.store.create(job_id, filename, input_path, params)
+        self._enqueue(job_id, input_path, params)
+        return job_id
+
+    def _enqueue(self, job_id: str, input_path: str, params: Dict):
+        self._cancel_events[job_id] = threading.Event()
+        self._executor().submit(self._run, job_id, input_path, params)
+
+    def resume(self):
+        """재시작 전에 끝나지 않은 작업을 다시 대기열에 추가"""
+        for job in self.store.list([QUEUED, RUNNING]):
+            if os.path.exists(job["input_path"]):
+                self.store.update(job["id"], status=QUEUED, frames_done=0, started_at=None)
+                self._enqueue(job["id"], job["input_path"], job["params"])
+            else:
+                self.store.update(job["id"], status=FAILED, finished_at=time.time(),
+                                  error="입력 파일이 없어 작업을 재개할 수 없습니다.")
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 중이거나 실행 중인 작업 취소"""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATES:
+            return False
+        event = self._cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+        if job["status"] == QUEUED:
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        return True
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """진행률(처리 프레임 / totalFrames)과 ETA 를 포함한 작업 상태"""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        frames_done, total_frames = job["frames_done"], job["total_frames"]
+        eta = None
+        if job["status"] == RUNNING and job["started_at"] and frames_done and total_frames:
+            elapsed = time.time() - job["started_at"]
+            eta = round(elapsed / frames_done * max(total_frames - frames_done, 0), 1)
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "filename": job["filename"],
+            "framesDone": frames_done,
+            "totalFrames": total_frames,
+            "progress": round(frames_done / total_frames, 4) if total_frames else 0,
+            "eta": eta,
+            "createdAt": job["created_at"],
+            "startedAt": job["started_at"],
+            "finishedAt": job["finished_at"],
+            "error": job["error"],
+        }
+
+    def queued_count(self) -> int:
+        """대기 중인 작업 수"""
+        return len(self.store.list([QUEUED]))
+
+    def _run(self, job_id: str, input_path: str, params: Dict):
+        cancel_event = self._cancel_events[job_id]
+        try:
+            if cancel_event.is_set():
+                return
+            self.store.update(job_id, status=RUNNING, started_at=time.time())
+
+            last_update = [0.0]
+
+            def progress(frames_done: int, total_frames: int):
+                # DB 쓰기는 일정 간격으로만
+                now = time.monotonic()
+                if now - last_update[0] >= VIDEO_JOB_PROGRESS_INTERVAL or frames_done == total_frames:
+                    last_update[0] = now
+                    self.store.update(job_id, frames_done=frames_done, total_frames=total_frames)
+
+            result = process_video_file(input_path, progress=progress, cancel_event=cancel_event, **params)
+            self.store.update(job_id, status=COMPLETED, finished_at=time.time(), result=result,
+                              frames_done=result["totalFrames"], total_frames=result["totalFrames"])
+        except VideoProcessingCancelled:
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, finished_at=time.time(),
+                              error=f"비디오 처리 중 오류가 발생했습니다: {str(e)}")
+        finally:
+            self._cancel_events.pop(job_id, None)
+            if os.path.exists(input_path):
+                os.unlink(input_path)
+
+    def shutdown(self, wait: bool = False):
+        """실행 중인 작업에 취소를 알리지 않고 풀 종료 (다음 시작 시 resume 으로 재개)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    @staticmethod
+    def new_job_id() -> str:
+        return str(uuid.uuid4())
@@ -0,0 +1,110 @@
+"""
+WebSocket 바이너리 프레임 프로토콜
+
+클라이언트가 서브프로토콜 "helmet.binary.v1" 을 요청하면 base64 data-URL/JSON 텍스트
+대신 바이너리 메시지를 주고받는다. 요청하지 않은 클라이언트는 기존 텍스트 모드를 유지한다.
+
+메시지 형식 (네트워크 바이트 순서):
+    [4바이트 헤더 길이 N][N바이트 UTF-8 JSON 메타데이터][JPEG 바이트 (없을 수 있음)]
+"""
+import base64
+import json
+import struct
+from typing import Dict, Optional, Tuple
+
+BINARY_SUBPROTOCOL = "helmet.binary.v1"
+
+_HEADER_LENGTH = struct.Struct("!I")
+
+_TRUE_FLAGS = ("1", "true", "yes")
+_FALSE_FLAGS = ("0", "false", "no")
+
+
+def negotiate_subprotocol(websocket) -> Optional[str]:
+    """클라이언트가 요청한 서브프로토콜 중 지원하는 것을 반환 (없으면 텍스트 모드)"""
+    requested = websocket.scope.get("subprotocols") or []
+    return BINARY_SUBPROTOCOL if BINARY_SUBPROTOCOL in requested else None
+
+
+def parse_flag(value, name: str) -> bool:
+    """쿼리 문자열/메시지 메타데이터의 불리언 플래그 (JSON 불리언, 0/1, "1"/"true"/"yes", "0"/"false"/"no")"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if value.lower() in _TRUE_FLAGS:
+            return True
+        if value.lower() in _FALSE_FLAGS:
+            return False
+    elif isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"Invalid {name} flag: {value!r}")
+
+
+def pack_message(metadata: Dict, payload: bytes = b"") -> bytes:
+    """메타데이터 헤더와 JPEG 바이트를 하나의 바이너리 메시지로 결합"""
+    header = json.dumps(metadata, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER_LENGTH.pack(len(header)) + header + payload
+
+
+def unpack_message(message: bytes) -> Tuple[Dict, bytes]:
+    """바이너리 메시지를 (메타데이터, JPEG 바이트) 로 분리"""
+    if len(message) < _HEADER_LENGTH.size:
+        raise ValueError("Invalid binary message")
+    (header_length,) = _HEADER_LENGTH.unpack_from(message)
+    header_end = _HEADER_LENGTH.size + header_length
+    if header_end > len(message):
+        raise ValueError("Invalid binary message header length")
+    metadata = json.loads(message[_HEADER_LENGTH.size:header_end]) if header_length else {}
+    if not isinstance(metadata, dict):
+        raise ValueError("Binary message metadata must be a JSON object")
+    return metadata, message[header_end:]
+
+
+def unpack_text_message(data: str) -> Tuple[Dict, bytes]:
+    """텍스트 메시지 (base64 data-URL 또는 JSON {"image": data-URL, ...}) 를 (메타데이터, 이미지 바이트) 로 분리"""
+    metadata = {}
+    if data.startswith("{"):
+        metadata = json.loads(data)
+        if not isinstance(metadata, dict):
+            raise ValueError("Text message must be a JSON object")
+        data = metadata.pop("image", None)
+        if not isinstance(data, str):
+            raise ValueError('Text message JSON must contain an "image" data-URL string')
+    _, comma, encoded = data.partition(",")
+    if not comma:
+        raise ValueError("Invalid image data URL")
+    return metadata, base64.b64decode(encoded)
+
+
+class EncodedFrame:
+    """한 번 인코딩한 JPEG 프레임을 텍스트/바이너리 구독자 모두에게 전달하기 위한 래퍼
+
+    base64 텍스트와 바이너리 메시지는 처음 요청될 때 한 번만 만들어 캐시한다.
+    """
+
+    __slots__ = ("jpeg", "metadata", "_text", "_binary")
+
+    def __init__(self, jpeg: bytes, metadata: Optional[Dict] = None):
+        self.jpeg = jpeg
+        self.metadata = metadata or {}
+        self._text: Optional[str] = None
+        self._binary: Optional[bytes] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = base64.b64encode(self.jpeg).decode("utf-8")
+        return self._text
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = pack_message(self.metadata, self.jpeg)
+        return self._binary
+
+    async def send(self, websocket, binary: bool):
+        """연결 모드에 맞는 형식으로 전송"""
+        if binary:
+            await websocket.send_bytes(self.binary)
+        else:
+            await websocket.send_text(self.text)